@@ -30,3 +30,114 @@ class Config:
     # in their environment (e.g., in a .env file). This avoids passing invalid
     # DSNs to psycopg2 when the app expects PostgreSQL.
     DATABASE_URL = os.getenv("DATABASE_URL")
+
+    # ==========================
+    # Connection Pool
+    # ==========================
+    # Sized per worker process: each gunicorn worker owns its own pool.
+    DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 1))
+    DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+    DB_POOL_IDLE_TIMEOUT = int(os.getenv("DB_POOL_IDLE_TIMEOUT", 300))  # seconds
+    DB_POOL_MAX_LIFETIME = int(os.getenv("DB_POOL_MAX_LIFETIME", 3600))  # seconds
+    DB_POOL_ACQUIRE_TIMEOUT = int(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", 30))  # seconds
+    DB_POOL_HEALTH_CHECK = os.getenv("DB_POOL_HEALTH_CHECK", "true").lower() == "true"
+
+    # ==========================
+    # Background Jobs
+    # ==========================
+    # Run the scheduler inside the web process. Alternatively run `python manage.py worker`.
+    SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "false").lower() == "true"
+    RESERVATION_EXPIRY_INTERVAL = int(os.getenv("RESERVATION_EXPIRY_INTERVAL", 60))  # seconds
+    RESERVATION_EXPIRY_BATCH_SIZE = int(os.getenv("RESERVATION_EXPIRY_BATCH_SIZE", 500))
+    OVERDUE_MARK_INTERVAL = int(os.getenv("OVERDUE_MARK_INTERVAL", 300))  # seconds
+    OVERDUE_MARK_CHUNK_SIZE = int(os.getenv("OVERDUE_MARK_CHUNK_SIZE", 1000))
+    IDEMPOTENCY_PURGE_INTERVAL = int(os.getenv("IDEMPOTENCY_PURGE_INTERVAL", 3600))  # seconds
+    IDEMPOTENCY_PURGE_BATCH_SIZE = int(os.getenv("IDEMPOTENCY_PURGE_BATCH_SIZE", 1000))
+
+    # ==========================
+    # Idempotency Keys
+    # ==========================
+    # Seconds a response to a request with an Idempotency-Key header is replayed to retries
+    IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", 86400))
+    # Seconds after which a key whose response was never stored (the save failed
+    # after the write committed) answers retries "already processed" instead of 409
+    IDEMPOTENCY_CLAIM_GRACE = int(os.getenv("IDEMPOTENCY_CLAIM_GRACE", 30))
+
+    # ==========================
+    # Audit Log Sink
+    # ==========================
+    # "transactional": every log_action is an INSERT in the caller's transaction.
+    # "buffered": entries are queued in-process and flushed in multi-row batches.
+    AUDIT_SINK_MODE = os.getenv("AUDIT_SINK_MODE", "transactional").lower()
+    # Entity types that stay transactional in buffered mode (money-related)
+    AUDIT_TRANSACTIONAL_ENTITIES = {
+        e.strip().upper() for e in os.getenv("AUDIT_TRANSACTIONAL_ENTITIES", "FINE").split(",") if e.strip()
+    }
+    AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 200))
+    AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", 1.0))  # seconds
+    AUDIT_MAX_PENDING = int(os.getenv("AUDIT_MAX_PENDING", 50000))
+    # "sync": flushes wait for WAL flush; "async": synchronous_commit off for flushes
+    AUDIT_DURABILITY = os.getenv("AUDIT_DURABILITY", "sync").lower()
+
+    # ==========================
+    # Password Hashing
+    # ==========================
+    # Hashes run on a process pool of PASSWORD_HASH_WORKERS (0 = inline). When
+    # PASSWORD_HASH_MAX_QUEUE more are already waiting, register/login answer 503.
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")  # werkzeug method string, e.g. pbkdf2:sha256:600000
+    PASSWORD_SALT_LENGTH = int(os.getenv("PASSWORD_SALT_LENGTH", 16))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 32))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", 10))  # seconds
+
+    # ==========================
+    # Bulk User Import
+    # ==========================
+    USER_IMPORT_MAX_ROWS = int(os.getenv("USER_IMPORT_MAX_ROWS", 20000))
+    # Separate processes used only while an import is hashing passwords. Imports
+    # hash one at a time; by default they use the CPUs the login pool leaves free.
+    USER_IMPORT_HASH_WORKERS = int(os.getenv(
+        "USER_IMPORT_HASH_WORKERS", max(1, (os.cpu_count() or 2) - PASSWORD_HASH_WORKERS)
+    ))
+
+    # ==========================
+    # Bulk Catalog Import
+    # ==========================
+    BOOK_IMPORT_MAX_ROWS = int(os.getenv("BOOK_IMPORT_MAX_ROWS", 500000))
+    BOOK_IMPORT_MAX_ERRORS = int(os.getenv("BOOK_IMPORT_MAX_ERRORS", 1000))  # error lines listed in the report
+
+    # ==========================
+    # Data Exports
+    # ==========================
+    # Each /export/<dataset> stream holds its own pooled connection for its whole
+    # duration; beyond EXPORT_MAX_CONCURRENT running exports, requests get 503.
+    EXPORT_MAX_CONCURRENT = int(os.getenv("EXPORT_MAX_CONCURRENT", 2))
+    EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", 2000))  # rows per round trip (NDJSON)
+    EXPORT_QUEUE_CHUNKS = int(os.getenv("EXPORT_QUEUE_CHUNKS", 16))  # 64 KB chunks buffered per CSV export
+    EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", 6))
+
+    # ==========================
+    # Stats Cache
+    # ==========================
+    # Seconds /stats/admin is served from cache (0 disables). Writes that change
+    # the numbers invalidate it in the process that made them.
+    STATS_CACHE_TTL = int(os.getenv("STATS_CACHE_TTL", 30))
+
+    # ==========================
+    # HTTP Caching (catalog)
+    # ==========================
+    # Cache-Control sent next to the ETag of GET /books and GET /books/<id>.
+    # "no-cache" lets browsers and proxies keep the response but revalidate it on
+    # every use, which costs a 304 when nothing changed. Empty sends no header.
+    CACHE_CONTROL_BOOKS = os.getenv("CACHE_CONTROL_BOOKS", "public, no-cache")
+    CACHE_CONTROL_BOOK_DETAIL = os.getenv("CACHE_CONTROL_BOOK_DETAIL", "public, no-cache")
+
+    # ==========================
+    # Audit Log Retention
+    # ==========================
+    # audit_logs is partitioned by month; partitions older than AUDIT_RETENTION_MONTHS
+    # are archived to AUDIT_ARCHIVE_DIR as gzipped CSV and dropped (0 keeps everything)
+    AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", 12))
+    AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR", "archive/audit_logs")
+    AUDIT_PARTITIONS_AHEAD = int(os.getenv("AUDIT_PARTITIONS_AHEAD", 3))  # months created in advance
+    AUDIT_PARTITION_INTERVAL = int(os.getenv("AUDIT_PARTITION_INTERVAL", 21600))  # seconds
@@ -1,13 +1,106 @@
 # app/models/audit_queries.py
+import re
+from datetime import date
 from psycopg2.extras import RealDictCursor
 
+# Monthly partitions are named audit_logs_yYYYYmMM (see lms_ensure_audit_partitions)
+AUDIT_PARTITION_NAME = re.compile(r"^audit_logs_y(\d{4})m(\d{2})$")
+
+
+def list_audit_logs(conn, limit, before=None, user_id=None, action=None,
+                    entity_type=None, entity_id=None, since=None, until=None, offset=0):
+    """
+    Keyset page of audit logs, newest first, ordered by (created_at, audit_id).
+    `before` is the (created_at, audit_id) of the last row of the previous page;
+    `offset` serves the legacy ?page= listing.
+    One statement on the partitioned parent. Because audit_logs_default can hold
+    any created_at, Postgres cannot use an ordered Append: it merges the head of
+    every partition's (created_at, audit_id) index (MergeAppend), and only a
+    `since` bound prunes older partitions. OFFSET pages still read every
+    skipped row; keyset pages (`before`) do not.
+    """
+    conditions = []
+    params = []
+    if before is not None:
+        conditions.append("(created_at, audit_id) < (%s, %s)")
+        params.extend(before)
+    if user_id is not None:
+        conditions.append("user_id = %s")
+        params.append(user_id)
+    if action is not None:
+        conditions.append("action = %s")
+        params.append(action)
+    if entity_type is not None:
+        conditions.append("entity_type = %s")
+        params.append(entity_type)
+    if entity_id is not None:
+        conditions.append("entity_id = %s")
+        params.append(entity_id)
+    if since is not None:
+        conditions.append("created_at >= %s")
+        params.append(since)
+    if until is not None:
+        conditions.append("created_at < %s")
+        params.append(until)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    params.extend((limit, offset))
 
-def get_audit_logs(conn, limit=20, offset=0):
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
-        cur.execute("""
+        cur.execute(f"""
             SELECT *
             FROM audit_logs
-            ORDER BY created_at DESC
+            {where}
+            ORDER BY created_at DESC, audit_id DESC
             LIMIT %s OFFSET %s
-        """, (limit, offset))
+        """, params)
         return cur.fetchall()
+
+
+# =========================
+# PARTITIONS
+# =========================
+def ensure_audit_partitions(conn, months_ahead=3):
+    """Create missing monthly partitions up to months_ahead. Returns how many were created."""
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("SELECT lms_ensure_audit_partitions(%s) AS created", (months_ahead,))
+        return cur.fetchone()["created"]
+
+
+def get_audit_partitions(conn):
+    """
+    Monthly partitions attached to audit_logs as [(month_start, table_name)],
+    newest first. Empty while audit_logs is not partitioned.
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'audit_logs'::regclass
+        """)
+        rows = cur.fetchall()
+
+    partitions = []
+    for row in rows:
+        match = AUDIT_PARTITION_NAME.match(row["relname"])
+        if match:
+            partitions.append((date(int(match.group(1)), int(match.group(2)), 1), row["relname"]))
+    partitions.sort(reverse=True)
+    return partitions
+
+
+def copy_audit_partition(conn, table_name, fileobj):
+    """Stream one partition as CSV (with header) into fileobj."""
+    if not AUDIT_PARTITION_NAME.match(table_name):
+        raise ValueError(f"Not an audit partition: {table_name}")
+    with conn.cursor() as cur:
+        cur.copy_expert(f"COPY {table_name} TO STDOUT WITH (FORMAT csv, HEADER)", fileobj)
+
+
+def drop_audit_partition(conn, table_name):
+    """Detach and drop one monthly partition. Commit handled by service layer."""
+    if not AUDIT_PARTITION_NAME.match(table_name):
+        raise ValueError(f"Not an audit partition: {table_name}")
+    with conn.cursor() as cur:
+        cur.execute(f"ALTER TABLE audit_logs DETACH PARTITION {table_name}")
+        cur.execute(f"DROP TABLE {table_name}")
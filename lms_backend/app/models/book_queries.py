@@ -1,5 +1,20 @@
 from psycopg2.extras import RealDictCursor
 
+# Columns that may be requested through ?fields= projections
+BOOK_COLUMNS = (
+    "book_id",
+    "title",
+    "author",
+    "category",
+    "isbn",
+    "total_copies",
+    "available_copies",
+    "created_at",
+    "is_active",
+)
+# search_vector (generated) and row_version (ETags) are internal and never returned to clients
+_SELECT_BOOK = f"SELECT {', '.join(BOOK_COLUMNS)} FROM books"
+
 
 def create_book(conn, title, author, isbn, total_copies, category=None, available_copies=None):
     avail = int(available_copies) if available_copies is not None else int(total_copies)
@@ -18,16 +33,38 @@ def create_book(conn, title, author, isbn, total_copies, category=None, availabl
 def get_book_by_id(conn, book_id):
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute(
-            "SELECT * FROM books WHERE book_id = %s AND is_active = TRUE;",
+            f"{_SELECT_BOOK} WHERE book_id = %s AND is_active = TRUE;",
             (book_id,)
         )
         return cur.fetchone()
 
 
+def get_book_row_version(conn, book_id):
+    """row_version of an active book (trigger-maintained), or None."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT row_version FROM books WHERE book_id = %s AND is_active = TRUE;",
+            (book_id,)
+        )
+        row = cur.fetchone()
+        return row[0] if row else None
+
+
+def get_catalog_version(conn):
+    """Change counter of the whole books table, read from library_counters only."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT COALESCE(SUM(value), 0)::BIGINT
+            FROM library_counters
+            WHERE counter_name = 'catalog_version'
+        """)
+        return cur.fetchone()[0]
+
+
 def get_book_by_isbn(conn, isbn):
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute(
-            "SELECT * FROM books WHERE isbn = %s;",
+            f"{_SELECT_BOOK} WHERE isbn = %s;",
             (isbn,)
         )
         return cur.fetchone()
@@ -45,10 +82,117 @@ def update_book_copies(conn, book_id, new_available_copies):
         )
 
 
+def decrement_available_copies(conn, book_id):
+    """
+    Take one copy in a single conditional statement (safe under concurrent issues).
+    Returns the new available_copies, or None if the book is missing or has no free copy.
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            """
+            UPDATE books
+            SET available_copies = available_copies - 1
+            WHERE book_id = %s AND is_active = TRUE AND available_copies > 0
+            RETURNING available_copies;
+            """,
+            (book_id,)
+        )
+        row = cur.fetchone()
+        return row["available_copies"] if row else None
+
+
+def increment_available_copies(conn, book_id):
+    """
+    Put one copy back in a single conditional statement, never exceeding total_copies.
+    Returns the new available_copies, or None if nothing was updated.
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            """
+            UPDATE books
+            SET available_copies = available_copies + 1
+            WHERE book_id = %s AND is_active = TRUE AND available_copies < total_copies
+            RETURNING available_copies;
+            """,
+            (book_id,)
+        )
+        row = cur.fetchone()
+        return row["available_copies"] if row else None
+
+
 def get_all_books(conn):
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute(
-            "SELECT * FROM books WHERE is_active = TRUE;"
+            f"{_SELECT_BOOK} WHERE is_active = TRUE;"
+        )
+        return cur.fetchall()
+
+
+def list_books(conn, limit, after_id=None, category=None, author=None, available=None, fields=None):
+    """
+    Keyset page of active books ordered by book_id.
+    Each page is an index range scan starting after `after_id`.
+    """
+    columns = [c for c in (fields or BOOK_COLUMNS) if c in BOOK_COLUMNS]
+    if "book_id" not in columns:
+        columns.insert(0, "book_id")
+
+    conditions = ["is_active = TRUE"]
+    params = []
+    if after_id is not None:
+        conditions.append("book_id > %s")
+        params.append(after_id)
+    if category is not None:
+        conditions.append("category = %s")
+        params.append(category)
+    if author is not None:
+        conditions.append("author = %s")
+        params.append(author)
+    if available is True:
+        conditions.append("available_copies > 0")
+    elif available is False:
+        conditions.append("available_copies = 0")
+    params.append(limit)
+
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            f"""
+            SELECT {', '.join(columns)}
+            FROM books
+            WHERE {' AND '.join(conditions)}
+            ORDER BY book_id
+            LIMIT %s
+            """,
+            params
+        )
+        return cur.fetchall()
+
+
+def search_books(conn, q, limit=20, offset=0):
+    """
+    Ranked full-text search over title/author/category/isbn, with trigram
+    word-similarity on title and author so misspelled queries still match.
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            f"""
+            WITH query AS (
+                SELECT websearch_to_tsquery('english', %(q)s)
+                       || websearch_to_tsquery('simple', %(q)s) AS tsq
+            )
+            SELECT {', '.join('b.' + c for c in BOOK_COLUMNS)},
+                   ts_rank_cd(b.search_vector, query.tsq) * 2
+                   + GREATEST(word_similarity(%(q)s, b.title),
+                              word_similarity(%(q)s, coalesce(b.author, ''))) AS rank
+            FROM books b, query
+            WHERE b.is_active = TRUE
+              AND (b.search_vector @@ query.tsq
+                   OR %(q)s <%% b.title
+                   OR %(q)s <%% b.author)
+            ORDER BY rank DESC, b.book_id
+            LIMIT %(limit)s OFFSET %(offset)s
+            """,
+            {"q": q, "limit": limit, "offset": offset}
         )
         return cur.fetchall()
 
@@ -92,3 +236,136 @@ def soft_delete_book(conn, book_id):
             "UPDATE books SET is_active = FALSE WHERE book_id = %s",
             (book_id,)
         )
+
+
+# =========================
+# BULK IMPORT
+# =========================
+# Staged as raw text so that every check (required fields, lengths, copies) runs in SQL
+BOOK_IMPORT_COLUMNS = ("title", "author", "category", "isbn", "total_copies", "available_copies")
+
+_UPSERT_BOOKS = {
+    "skip": "ON CONFLICT (isbn) DO NOTHING",
+    # Copies on loan stay on loan: available = new total - (old total - old available).
+    # Titles whose new total is below the copies on loan are left untouched (skipped).
+    "update": """
+        ON CONFLICT (isbn) DO UPDATE
+        SET title = EXCLUDED.title,
+            author = EXCLUDED.author,
+            category = COALESCE(EXCLUDED.category, books.category),
+            total_copies = EXCLUDED.total_copies,
+            available_copies = EXCLUDED.total_copies - (books.total_copies - books.available_copies),
+            is_active = TRUE
+        WHERE books.total_copies - books.available_copies <= EXCLUDED.total_copies
+    """,
+}
+
+
+def bulk_import_books(conn, rows_csv, on_conflict="skip", max_errors=1000):
+    """
+    Load CSV rows of (line_no, title, author, category, isbn, total_copies,
+    available_copies) with COPY into a temporary staging table, validate them in
+    SQL and upsert the valid ones on ISBN in one statement (`on_conflict` is
+    "skip" or "update"). Returns {"created", "updated", "skipped", "failed",
+    "errors": [{"line", "isbn", "errors": {field: [msg]}}] (first max_errors)}.
+    Commit handled by service layer.
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            CREATE TEMP TABLE book_import_staging (
+                line_no INTEGER PRIMARY KEY,
+                title TEXT,
+                author TEXT,
+                category TEXT,
+                isbn TEXT,
+                total_copies TEXT,
+                available_copies TEXT,
+                errors JSONB
+            ) ON COMMIT DROP
+        """)
+        cur.copy_expert(
+            f"COPY book_import_staging (line_no, {', '.join(BOOK_IMPORT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            rows_csv,
+        )
+        cur.execute("""
+            UPDATE book_import_staging
+            SET title = NULLIF(btrim(title), ''),
+                author = NULLIF(btrim(author), ''),
+                category = NULLIF(btrim(category), ''),
+                isbn = NULLIF(btrim(isbn), ''),
+                total_copies = NULLIF(btrim(total_copies), ''),
+                available_copies = NULLIF(btrim(available_copies), '')
+        """)
+        cur.execute("""
+            UPDATE book_import_staging t
+            SET errors = v.errors
+            FROM (
+                SELECT s.line_no, NULLIF(jsonb_strip_nulls(jsonb_build_object(
+                    'title', CASE
+                        WHEN s.title IS NULL THEN '["Title is required"]'::jsonb
+                        WHEN length(s.title) > 200 THEN '["Longer than 200 characters"]'::jsonb
+                    END,
+                    'author', CASE
+                        WHEN s.author IS NULL THEN '["Author is required"]'::jsonb
+                        WHEN length(s.author) > 100 THEN '["Longer than 100 characters"]'::jsonb
+                    END,
+                    'category', CASE
+                        WHEN length(s.category) > 50 THEN '["Longer than 50 characters"]'::jsonb
+                    END,
+                    'isbn', CASE
+                        WHEN s.isbn IS NULL THEN '["ISBN is required"]'::jsonb
+                        WHEN length(s.isbn) > 20 THEN '["Longer than 20 characters"]'::jsonb
+                        WHEN d.first_line <> s.line_no THEN jsonb_build_array('Duplicate of line ' || d.first_line)
+                    END,
+                    'total_copies', CASE
+                        WHEN s.total_copies IS NULL THEN '["Total copies is required"]'::jsonb
+                        WHEN s.total_copies !~ '^[0-9]{1,9}$' THEN '["Must be a whole number"]'::jsonb
+                        WHEN s.total_copies::int <= 0 THEN '["Total copies must be greater than 0"]'::jsonb
+                    END,
+                    'available_copies', CASE
+                        WHEN s.available_copies IS NULL THEN NULL
+                        WHEN s.available_copies !~ '^[0-9]{1,9}$' THEN '["Must be a whole number"]'::jsonb
+                        WHEN s.total_copies !~ '^[0-9]{1,9}$' THEN NULL
+                        WHEN s.available_copies::int > s.total_copies::int
+                            THEN '["Available copies must be between 0 and total copies"]'::jsonb
+                    END
+                )), '{}'::jsonb) AS errors
+                FROM book_import_staging s
+                LEFT JOIN (
+                    SELECT line_no, MIN(line_no) OVER (PARTITION BY isbn) AS first_line
+                    FROM book_import_staging
+                    WHERE isbn IS NOT NULL
+                ) d ON d.line_no = s.line_no
+            ) v
+            WHERE t.line_no = v.line_no AND v.errors IS NOT NULL
+        """)
+        cur.execute(f"""
+            WITH upserted AS (
+                INSERT INTO books (title, author, category, isbn, total_copies, available_copies)
+                SELECT title, author, category, isbn, total_copies::int,
+                       COALESCE(available_copies::int, total_copies::int)
+                FROM book_import_staging
+                WHERE errors IS NULL
+                ORDER BY line_no
+                {_UPSERT_BOOKS[on_conflict]}
+                RETURNING books.isbn, (books.xmax = 0) AS inserted
+            )
+            SELECT COUNT(*) FILTER (WHERE u.inserted) AS created,
+                   COUNT(*) FILTER (WHERE NOT u.inserted) AS updated,
+                   COUNT(*) FILTER (WHERE u.isbn IS NULL) AS skipped
+            FROM book_import_staging s
+            LEFT JOIN upserted u ON u.isbn = s.isbn
+            WHERE s.errors IS NULL
+        """)
+        result = dict(cur.fetchone())
+        cur.execute("""
+            SELECT line_no AS line, isbn, errors, COUNT(*) OVER () AS failed
+            FROM book_import_staging
+            WHERE errors IS NOT NULL
+            ORDER BY line_no
+            LIMIT %s
+        """, (max_errors,))
+        rows = cur.fetchall()
+        result["failed"] = rows[0]["failed"] if rows else 0
+        result["errors"] = [{"line": r["line"], "isbn": r["isbn"], "errors": r["errors"]} for r in rows]
+        return result
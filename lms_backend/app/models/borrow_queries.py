@@ -1,4 +1,6 @@
+import psycopg2
 from psycopg2.extras import RealDictCursor
+from app.models.db import domain_error
 
 def create_borrow(conn, user_id, book_id, due_date):
     """Create an issued borrow (status ACTIVE). Used on approve or direct admin/teacher issue."""
@@ -14,6 +16,45 @@ def create_borrow(conn, user_id, book_id, due_date):
         return result['borrow_id']
 
 
+def issue_book_atomic(conn, user_id, book_id, due_date):
+    """
+    Issue a book in a single round trip via the lms_issue_book() database function.
+    Raises ValueError for "Book not found", "Book not available" and duplicate borrows.
+    """
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                "SELECT lms_issue_book(%s, %s, %s) AS borrow_id",
+                (user_id, book_id, due_date)
+            )
+            return cur.fetchone()['borrow_id']
+    except psycopg2.Error as e:
+        error = domain_error(e)
+        if error:
+            raise error from e
+        raise
+
+
+def return_book_atomic(conn, user_id, book_id, return_date, fine_per_day):
+    """
+    Return a book in a single round trip via the lms_return_book() database function.
+    Returns {"borrow_id", "fine_amount", "fine_id", "auto_assigned_borrow_id"}.
+    Raises ValueError if the user has no active borrow of the book.
+    """
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                "SELECT lms_return_book(%s, %s, %s, %s) AS result",
+                (user_id, book_id, return_date, fine_per_day)
+            )
+            return cur.fetchone()['result']
+    except psycopg2.Error as e:
+        error = domain_error(e)
+        if error:
+            raise error from e
+        raise
+
+
 def create_borrow_request(conn, user_id, book_id):
     """Create a borrow request (status PENDING). No copy decrement until approval."""
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
@@ -46,13 +87,19 @@ def get_pending_borrows(conn):
 
 
 def update_borrow_to_issued(conn, borrow_id, due_date):
-    """Set borrow status to ACTIVE and set issue_date (used on approval)."""
-    with conn.cursor() as cur:
+    """
+    Set borrow status to ACTIVE and set issue_date (used on approval).
+    Only a PENDING request transitions; returns borrow_id, or None if it was already handled.
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute("""
             UPDATE borrows
             SET borrow_status = 'ACTIVE', issue_date = CURRENT_TIMESTAMP, due_date = %s
-            WHERE borrow_id = %s
+            WHERE borrow_id = %s AND borrow_status = 'PENDING'
+            RETURNING borrow_id
         """, (due_date, borrow_id))
+        result = cur.fetchone()
+        return result['borrow_id'] if result else None
 
 
 def reject_borrow_record(conn, borrow_id):
@@ -64,6 +111,266 @@ def reject_borrow_record(conn, borrow_id):
         
 
 
+def lock_borrows(conn, borrow_ids):
+    """Lock the given borrow rows (id order, so batches never deadlock) and return their statuses."""
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            SELECT borrow_id, user_id, book_id, borrow_status
+            FROM borrows
+            WHERE borrow_id = ANY(%s)
+            ORDER BY borrow_id
+            FOR UPDATE
+        """, (list(borrow_ids),))
+        return {row["borrow_id"]: row for row in cur.fetchall()}
+
+
+def approve_pending_borrows(conn, borrow_ids, due_date):
+    """
+    Set-based approval of PENDING requests. Per book, the oldest requests get
+    the available copies; copies are decremented once per book. Requests for a
+    book the user already has open are skipped. Call lock_borrows first.
+    Returns [{borrow_id, user_id, book_id, outcome}] with outcome one of
+    approved / already_borrowed / unavailable.
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            WITH pending AS (
+                SELECT b.borrow_id, b.user_id, b.book_id,
+                       EXISTS (
+                           SELECT 1 FROM borrows o
+                           WHERE o.user_id = b.user_id AND o.book_id = b.book_id
+                             AND o.borrow_status IN ('ACTIVE', 'OVERDUE')
+                       ) AS already_borrowed
+                FROM borrows b
+                WHERE b.borrow_id = ANY(%(ids)s) AND b.borrow_status = 'PENDING'
+            ),
+            ranked AS (
+                SELECT borrow_id, book_id,
+                       ROW_NUMBER() OVER (PARTITION BY book_id ORDER BY borrow_id) AS rn
+                FROM pending
+                WHERE NOT already_borrowed
+            ),
+            stock AS (
+                SELECT book_id, available_copies
+                FROM books
+                WHERE book_id IN (SELECT book_id FROM ranked) AND is_active = TRUE
+                ORDER BY book_id
+                FOR UPDATE
+            ),
+            granted AS (
+                SELECT r.borrow_id, r.book_id
+                FROM ranked r
+                JOIN stock s ON s.book_id = r.book_id
+                WHERE r.rn <= s.available_copies
+            ),
+            taken AS (
+                UPDATE books bk
+                SET available_copies = bk.available_copies - g.n
+                FROM (SELECT book_id, COUNT(*) AS n FROM granted GROUP BY book_id) g
+                WHERE bk.book_id = g.book_id
+            ),
+            approved AS (
+                UPDATE borrows b
+                SET borrow_status = 'ACTIVE', issue_date = CURRENT_TIMESTAMP, due_date = %(due_date)s
+                FROM granted g
+                WHERE b.borrow_id = g.borrow_id
+                RETURNING b.borrow_id
+            )
+            SELECT p.borrow_id, p.user_id, p.book_id,
+                   CASE
+                       WHEN a.borrow_id IS NOT NULL THEN 'approved'
+                       WHEN p.already_borrowed THEN 'already_borrowed'
+                       ELSE 'unavailable'
+                   END AS outcome
+            FROM pending p
+            LEFT JOIN approved a ON a.borrow_id = p.borrow_id
+        """, {"ids": list(borrow_ids), "due_date": due_date})
+        return cur.fetchall()
+
+
+def reject_pending_borrows(conn, borrow_ids):
+    """Set-based reject_borrow_record for PENDING requests. Returns {borrow_id: user_id} rejected."""
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            UPDATE borrows SET borrow_status = 'REJECTED'
+            WHERE borrow_id = ANY(%s) AND borrow_status = 'PENDING'
+            RETURNING borrow_id, user_id
+        """, (list(borrow_ids),))
+        return {row["borrow_id"]: row["user_id"] for row in cur.fetchall()}
+
+
+def issue_books_batch(conn, user_id, book_ids, due_date):
+    """
+    Set-based lms_issue_book() for several books to one user, in one statement:
+    locks the books, takes one copy of each available book, inserts the borrows
+    and their audit rows. Returns [{book_id, outcome, borrow_id}] in request order
+    with outcome one of issued / not_found / already_borrowed / unavailable.
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            WITH requested AS (
+                SELECT DISTINCT ON (book_id) book_id, ord
+                FROM unnest(%(book_ids)s::int[]) WITH ORDINALITY AS r(book_id, ord)
+                ORDER BY book_id, ord
+            ),
+            stock AS (
+                SELECT book_id, available_copies
+                FROM books
+                WHERE book_id IN (SELECT book_id FROM requested) AND is_active = TRUE
+                ORDER BY book_id
+                FOR UPDATE
+            ),
+            classified AS (
+                SELECT r.book_id, r.ord,
+                       CASE
+                           WHEN s.book_id IS NULL THEN 'not_found'
+                           WHEN EXISTS (
+                               SELECT 1 FROM borrows o
+                               WHERE o.user_id = %(user_id)s AND o.book_id = r.book_id
+                                 AND o.borrow_status IN ('ACTIVE', 'OVERDUE')
+                           ) THEN 'already_borrowed'
+                           WHEN s.available_copies <= 0 THEN 'unavailable'
+                           ELSE 'issued'
+                       END AS outcome
+                FROM requested r
+                LEFT JOIN stock s ON s.book_id = r.book_id
+            ),
+            taken AS (
+                UPDATE books
+                SET available_copies = available_copies - 1
+                WHERE book_id IN (SELECT book_id FROM classified WHERE outcome = 'issued')
+            ),
+            issued AS (
+                INSERT INTO borrows (user_id, book_id, due_date, borrow_status)
+                SELECT %(user_id)s, book_id, %(due_date)s, 'ACTIVE'
+                FROM classified
+                WHERE outcome = 'issued'
+                RETURNING borrow_id, book_id
+            ),
+            audited AS (
+                INSERT INTO audit_logs (user_id, action, entity_type, entity_id, description)
+                SELECT %(user_id)s, 'Borrow Approved', 'BORROW', borrow_id,
+                       format('Book %%s issued to user %%s', book_id, %(user_id)s)
+                FROM issued
+            )
+            SELECT c.book_id, c.outcome, i.borrow_id
+            FROM classified c
+            LEFT JOIN issued i ON i.book_id = c.book_id
+            ORDER BY c.ord
+        """, {"user_id": user_id, "book_ids": list(book_ids), "due_date": due_date})
+        return cur.fetchall()
+
+
+def return_books_batch(conn, user_id, book_ids, return_date, fine_per_day):
+    """
+    Set-based lms_return_book() for several books of one user, in one statement:
+    marks the open borrows returned, restocks, creates fines, turns the oldest
+    active reservation of each book into a PENDING request and writes the audit
+    rows. Returns [{book_id, outcome, borrow_id, fine_amount, fine_id,
+    auto_assigned_borrow_id}] in request order; outcome is returned / not_borrowed.
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            WITH requested AS (
+                SELECT DISTINCT ON (book_id) book_id, ord
+                FROM unnest(%(book_ids)s::int[]) WITH ORDINALITY AS r(book_id, ord)
+                ORDER BY book_id, ord
+            ),
+            open_borrows AS (
+                SELECT b.borrow_id, b.book_id, b.due_date
+                FROM borrows b
+                WHERE b.user_id = %(user_id)s
+                  AND b.book_id IN (SELECT book_id FROM requested)
+                  AND b.borrow_status IN ('ACTIVE', 'OVERDUE')
+                ORDER BY b.borrow_id
+                FOR UPDATE
+            ),
+            returned AS (
+                UPDATE borrows b
+                SET return_date = CURRENT_TIMESTAMP, borrow_status = 'RETURNED'
+                FROM open_borrows o
+                WHERE b.borrow_id = o.borrow_id
+                -- Same rule as fine_service.calculate_fine: whole days late * rate
+                RETURNING b.borrow_id, b.book_id,
+                          CASE WHEN %(return_date)s > o.due_date
+                               THEN floor(extract(epoch FROM %(return_date)s - o.due_date) / 86400)::int
+                                    * %(fine_per_day)s::numeric
+                               ELSE 0
+                          END AS fine_amount
+            ),
+            restocked AS (
+                UPDATE books
+                SET available_copies = available_copies + 1
+                WHERE book_id IN (SELECT book_id FROM returned)
+                  AND is_active = TRUE AND available_copies < total_copies
+            ),
+            fined AS (
+                INSERT INTO fines (borrow_id, user_id, amount, paid_status, created_at)
+                SELECT borrow_id, %(user_id)s, fine_amount, FALSE, NOW()
+                FROM returned
+                WHERE fine_amount > 0
+                RETURNING fine_id, borrow_id, amount
+            ),
+            waiting AS (
+                SELECT r.reservation_id, r.user_id, r.book_id, r.reservation_date
+                FROM reservations r
+                WHERE r.book_id IN (SELECT book_id FROM returned)
+                  AND r.reservation_status = 'ACTIVE'
+                  AND (r.expiry_date IS NULL OR r.expiry_date >= NOW())
+                FOR UPDATE
+            ),
+            next_reservation AS (
+                SELECT DISTINCT ON (book_id) reservation_id, user_id, book_id
+                FROM waiting
+                ORDER BY book_id, reservation_date ASC
+            ),
+            fulfilled AS (
+                UPDATE reservations
+                SET reservation_status = 'FULFILLED'
+                WHERE reservation_id IN (SELECT reservation_id FROM next_reservation)
+            ),
+            -- PENDING requests, no copy decrement: admin approves later
+            auto_assigned AS (
+                INSERT INTO borrows (user_id, book_id, due_date, borrow_status)
+                SELECT user_id, book_id, CURRENT_TIMESTAMP + INTERVAL '7 days', 'PENDING'
+                FROM next_reservation
+                RETURNING borrow_id, book_id
+            ),
+            audited AS (
+                INSERT INTO audit_logs (user_id, action, entity_type, entity_id, description)
+                SELECT %(user_id)s, 'Fine Created', 'FINE', fine_id,
+                       format('Fine %%s created for borrow %%s, amount Rs %%s', fine_id, borrow_id, amount)
+                FROM fined
+                UNION ALL
+                SELECT %(user_id)s, 'Fine Generated', 'FINE', fine_id,
+                       format('Fine %%s generated for borrow %%s, amount Rs %%s', fine_id, borrow_id, amount)
+                FROM fined
+                UNION ALL
+                SELECT user_id, 'Reservation Fulfilled', 'RESERVATION', reservation_id,
+                       format('Book %%s – reservation fulfilled, borrow request created for admin approval', book_id)
+                FROM next_reservation
+                UNION ALL
+                SELECT %(user_id)s, 'Book Returned', 'BORROW', borrow_id,
+                       format('Book %%s returned by user %%s', book_id, %(user_id)s)
+                FROM returned
+            )
+            SELECT q.book_id,
+                   CASE WHEN r.borrow_id IS NULL THEN 'not_borrowed' ELSE 'returned' END AS outcome,
+                   r.borrow_id, r.fine_amount, f.fine_id, a.borrow_id AS auto_assigned_borrow_id
+            FROM requested q
+            LEFT JOIN returned r ON r.book_id = q.book_id
+            LEFT JOIN fined f ON f.borrow_id = r.borrow_id
+            LEFT JOIN auto_assigned a ON a.book_id = q.book_id
+            ORDER BY q.ord
+        """, {
+            "user_id": user_id,
+            "book_ids": list(book_ids),
+            "return_date": return_date,
+            "fine_per_day": fine_per_day,
+        })
+        return cur.fetchall()
+
+
 def get_active_borrow(conn, user_id, book_id):
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute("""
@@ -71,7 +378,7 @@ def get_active_borrow(conn, user_id, book_id):
             FROM borrows
             WHERE user_id = %s
               AND book_id = %s
-              AND borrow_status = 'ACTIVE'
+              AND borrow_status IN ('ACTIVE', 'OVERDUE')
         """, (user_id, book_id))
         return cur.fetchone()
 
@@ -116,7 +423,7 @@ def get_user_active_borrows(conn, user_id):
             SELECT b.borrow_id, b.book_id, b.issue_date, b.due_date, bk.title, bk.author
             FROM borrows b
             JOIN books bk ON b.book_id = bk.book_id
-            WHERE b.user_id = %s AND b.borrow_status = 'ACTIVE'
+            WHERE b.user_id = %s AND b.borrow_status IN ('ACTIVE', 'OVERDUE')
             ORDER BY b.due_date
         """, (user_id,))
         return cur.fetchall()
@@ -140,7 +447,7 @@ def get_user_borrow_history(conn, user_id, limit=50, offset=0):
 
 
 def get_all_active_borrows(conn):
-    """Get all active (ACTIVE) borrows for admin."""
+    """Get all open (ACTIVE or OVERDUE) borrows for admin."""
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute("""
             SELECT b.borrow_id, b.user_id, b.book_id, b.issue_date, b.due_date,
@@ -148,27 +455,86 @@ def get_all_active_borrows(conn):
             FROM borrows b
             JOIN books bk ON b.book_id = bk.book_id
             JOIN users u ON b.user_id = u.user_id
-            WHERE b.borrow_status = 'ACTIVE'
+            WHERE b.borrow_status IN ('ACTIVE', 'OVERDUE')
             ORDER BY b.due_date
         """)
         return cur.fetchall()
 
 
+BORROW_LISTING_COLUMNS = (
+    "borrow_id", "user_id", "book_id", "requested_date", "issue_date", "due_date",
+    "return_date", "borrow_status", "book_title", "author", "available_copies",
+    "user_name", "email", "role_name",
+)
+
+_SELECT_BORROW_LISTING = """
+    SELECT b.borrow_id, b.user_id, b.book_id,
+           b.issue_date AS requested_date,
+           b.issue_date, b.due_date, b.return_date,
+           b.borrow_status,
+           bk.title AS book_title, bk.author, bk.available_copies,
+           u.name AS user_name, u.email,
+           r.role_name
+    FROM borrows b
+    JOIN books bk ON b.book_id = bk.book_id
+    JOIN users u ON b.user_id = u.user_id
+    JOIN roles r ON u.role_id = r.role_id
+"""
+
+
 def get_all_borrows(conn):
     """Get all borrows with user name, role, book title, dates, status (for Borrow Management)."""
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
-        cur.execute("""
-            SELECT b.borrow_id, b.user_id, b.book_id, 
-                   b.issue_date AS requested_date,
-                   b.issue_date, b.due_date, b.return_date,
-                   b.borrow_status,
-                   bk.title AS book_title, bk.author, bk.available_copies,
-                   u.name AS user_name, u.email,
-                   r.role_name
-            FROM borrows b
-            JOIN books bk ON b.book_id = bk.book_id
-            JOIN users u ON b.user_id = u.user_id
-            JOIN roles r ON u.role_id = r.role_id
-            ORDER BY b.borrow_id DESC
-        """)
+        cur.execute(f"{_SELECT_BORROW_LISTING} ORDER BY b.borrow_id DESC")
+        return cur.fetchall()
+
+
+def _borrow_listing_where(before_id=None, status=None, user_id=None, book_id=None, since=None, until=None):
+    conditions = []
+    params = []
+    if before_id is not None:
+        conditions.append("b.borrow_id < %s")
+        params.append(before_id)
+    if status is not None:
+        conditions.append("b.borrow_status = %s")
+        params.append(status)
+    if user_id is not None:
+        conditions.append("b.user_id = %s")
+        params.append(user_id)
+    if book_id is not None:
+        conditions.append("b.book_id = %s")
+        params.append(book_id)
+    if since is not None:
+        conditions.append("b.issue_date >= %s")
+        params.append(since)
+    if until is not None:
+        conditions.append("b.issue_date < %s")
+        params.append(until)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
+
+
+def list_borrows(conn, limit, before_id=None, **filters):
+    """
+    Keyset page of the get_all_borrows listing, newest first.
+    `before_id` is the borrow_id of the last row of the previous page.
+    Filters: status, user_id, book_id, since/until (on issue_date).
+    """
+    where, params = _borrow_listing_where(before_id, **filters)
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(f"{_SELECT_BORROW_LISTING} {where} ORDER BY b.borrow_id DESC LIMIT %s", params + [limit])
         return cur.fetchall()
+
+
+def iter_borrows(conn, chunk_size=1000, **filters):
+    """
+    Yield the whole filtered listing, newest first, through a named (server-side)
+    cursor that fetches chunk_size rows at a time, so memory does not grow with
+    the result. The caller ends the transaction afterwards.
+    """
+    where, params = _borrow_listing_where(**filters)
+    with conn.cursor(name="borrow_listing_export", cursor_factory=RealDictCursor) as cur:
+        cur.itersize = chunk_size
+        cur.execute(f"{_SELECT_BORROW_LISTING} {where} ORDER BY b.borrow_id DESC", params)
+        for row in cur:
+            yield row
@@ -1,35 +1,111 @@
 # app/models/db.py
+import threading
+from contextlib import contextmanager
 import psycopg2
+import psycopg2.errors
 from psycopg2.extras import RealDictCursor
 from flask import g
 from app.config import Config
+from app.models.pool import ConnectionPool
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# SQLSTATE class raised by the LMS functions in database/schema.sql for business-rule errors
+DOMAIN_ERROR_CLASS = "LM"
+
+# Unique indexes whose violation is a user error rather than a server fault
+_UNIQUE_VIOLATION_MESSAGES = {
+    "unique_open_borrow": "User already borrowed this book",
+}
+
+
+def _connect():
+    return psycopg2.connect(
+        dsn=Config.DATABASE_URL,
+        cursor_factory=RealDictCursor
+    )
+
+
+def get_pool():
+    """
+    Returns the process-wide connection pool, creating it on first use.
+    Pool sizing and recycling are configured via Config.DB_POOL_*.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # Ensure a DATABASE_URL is configured before attempting connection
+                if not Config.DATABASE_URL:
+                    raise RuntimeError(
+                        "DATABASE_URL is not configured. Set DATABASE_URL in your environment or .env file."
+                    )
+                _pool = ConnectionPool(
+                    _connect,
+                    min_size=Config.DB_POOL_MIN_SIZE,
+                    max_size=Config.DB_POOL_MAX_SIZE,
+                    idle_timeout=Config.DB_POOL_IDLE_TIMEOUT,
+                    max_lifetime=Config.DB_POOL_MAX_LIFETIME,
+                    acquire_timeout=Config.DB_POOL_ACQUIRE_TIMEOUT,
+                    health_check=Config.DB_POOL_HEALTH_CHECK,
+                )
+    return _pool
+
+
+def get_pool_stats():
+    """Returns pool statistics, or None if the pool has not been created yet."""
+    return _pool.stats() if _pool is not None else None
+
+
+@contextmanager
+def pooled_connection():
+    """
+    Check a connection out of the pool outside of a request (background jobs,
+    CLI commands). The connection is returned, rolled back if uncommitted.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
 
 def get_db():
     """
-    Returns a PostgreSQL connection stored in Flask's g.
-    Uses DATABASE_URL from Config for connection.
-    Ensures RealDictCursor is used for dictionary-style rows.
+    Returns a pooled PostgreSQL connection stored in Flask's g.
+    Connections use RealDictCursor for dictionary-style rows.
     """
     if "db" not in g:
-        # Ensure a DATABASE_URL is configured before attempting connection
-        if not Config.DATABASE_URL:
-            raise RuntimeError(
-                "DATABASE_URL is not configured. Set DATABASE_URL in your environment or .env file."
-            )
         try:
-            g.db = psycopg2.connect(
-                dsn=Config.DATABASE_URL,
-                cursor_factory=RealDictCursor
-            )
+            g.db = get_pool().getconn()
         except Exception as e:
             print("Database connection error:", e)
             raise e
     return g.db
 
+
 def close_db(e=None):
     """
-    Closes the PostgreSQL connection at the end of request.
+    Returns the request's connection to the pool at the end of request.
+    Any uncommitted transaction is rolled back by the pool.
     """
     db = g.pop("db", None)
     if db is not None:
-        db.close()
+        get_pool().putconn(db)
+
+
+def domain_error(exc):
+    """
+    Map a psycopg2 error raised by an LMS database function to a ValueError.
+    Returns None for errors that are not business-rule failures.
+    """
+    pgcode = getattr(exc, "pgcode", None)
+    if pgcode and pgcode.startswith(DOMAIN_ERROR_CLASS):
+        return ValueError(exc.diag.message_primary)
+    if isinstance(exc, psycopg2.errors.UniqueViolation):
+        message = _UNIQUE_VIOLATION_MESSAGES.get(exc.diag.constraint_name)
+        if message:
+            return ValueError(message)
+    return None
@@ -0,0 +1,121 @@
+import psycopg2.extensions
+
+# Exportable datasets: output column -> SQL expression, the FROM clause, the
+# column that since/until filter on, and the (unique) ordering key.
+# Password hashes are never exportable.
+EXPORT_DATASETS = {
+    "books": {
+        "from": "books bk",
+        "where": "bk.is_active = TRUE",
+        "columns": {
+            "book_id": "bk.book_id",
+            "title": "bk.title",
+            "author": "bk.author",
+            "category": "bk.category",
+            "isbn": "bk.isbn",
+            "total_copies": "bk.total_copies",
+            "available_copies": "bk.available_copies",
+            "created_at": "bk.created_at",
+        },
+        "date_column": "bk.created_at",
+        "order_by": "bk.book_id",
+    },
+    "users": {
+        "from": "users u JOIN roles r ON r.role_id = u.role_id",
+        "where": None,
+        "columns": {
+            "user_id": "u.user_id",
+            "name": "u.name",
+            "email": "u.email",
+            "phone": "u.phone",
+            "role_name": "r.role_name",
+            "status": "u.status",
+            "created_at": "u.created_at",
+            "approved_by": "u.approved_by",
+            "approved_at": "u.approved_at",
+        },
+        "date_column": "u.created_at",
+        "order_by": "u.user_id",
+    },
+    "fines": {
+        "from": "fines f JOIN users u ON u.user_id = f.user_id",
+        "where": None,
+        "columns": {
+            "fine_id": "f.fine_id",
+            "borrow_id": "f.borrow_id",
+            "user_id": "f.user_id",
+            "user_name": "u.name",
+            "email": "u.email",
+            "amount": "f.amount",
+            "paid_status": "f.paid_status",
+            "paid_date": "f.paid_date",
+            "created_at": "f.created_at",
+        },
+        "date_column": "f.created_at",
+        "order_by": "f.fine_id",
+    },
+    "reservations": {
+        "from": "reservations rs JOIN users u ON u.user_id = rs.user_id JOIN books bk ON bk.book_id = rs.book_id",
+        "where": None,
+        "columns": {
+            "reservation_id": "rs.reservation_id",
+            "user_id": "rs.user_id",
+            "user_name": "u.name",
+            "book_id": "rs.book_id",
+            "book_title": "bk.title",
+            "reservation_date": "rs.reservation_date",
+            "expiry_date": "rs.expiry_date",
+            "reservation_status": "rs.reservation_status",
+        },
+        "date_column": "rs.reservation_date",
+        "order_by": "rs.reservation_id",
+    },
+}
+
+
+def build_export_select(dataset, columns=None, since=None, until=None):
+    """
+    SELECT for an export as (sql, params). `columns` picks and orders output
+    columns (default: all). Raises ValueError for unknown datasets or columns.
+    """
+    spec = EXPORT_DATASETS.get(dataset)
+    if spec is None:
+        raise ValueError(f"Unknown dataset: {dataset}. Available: {', '.join(EXPORT_DATASETS)}")
+    columns = list(columns or spec["columns"])
+    unknown = [c for c in columns if c not in spec["columns"]]
+    if unknown:
+        raise ValueError(f"Unknown columns for {dataset}: {', '.join(unknown)}")
+
+    conditions = [spec["where"]] if spec["where"] else []
+    params = []
+    if since is not None:
+        conditions.append(f"{spec['date_column']} >= %s")
+        params.append(since)
+    if until is not None:
+        conditions.append(f"{spec['date_column']} < %s")
+        params.append(until)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    select_list = ", ".join(f"{spec['columns'][c]} AS {c}" for c in columns)
+    sql = f"SELECT {select_list} FROM {spec['from']} {where} ORDER BY {spec['order_by']}"
+    return sql, params
+
+
+def copy_csv_to(conn, sql, params, file):
+    """COPY (sql) TO STDOUT as CSV with a header line, written to file.write(bytes)."""
+    with conn.cursor() as cur:
+        query = cur.mogrify(sql, params).decode()
+        cur.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", file)
+
+
+def iter_json_lines(conn, sql, params, fetch_size):
+    """
+    Yield lists of JSON texts (one per row, built by Postgres) through a named
+    server-side cursor, fetch_size rows per round trip.
+    """
+    with conn.cursor(name="dataset_export", cursor_factory=psycopg2.extensions.cursor) as cur:
+        cur.execute(f"SELECT row_to_json(x)::text FROM ({sql}) x", params)
+        while True:
+            rows = cur.fetchmany(fetch_size)
+            if not rows:
+                return
+            yield [row[0] for row in rows]
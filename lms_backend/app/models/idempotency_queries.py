@@ -0,0 +1,61 @@
+from psycopg2.extras import RealDictCursor, Json
+
+
+def claim_idempotency_key(conn, user_id, key_hash, request_hash, ttl):
+    """
+    Insert the key in the caller's transaction, or take over an expired one.
+    Returns True if this request owns the key. A concurrent request with the same
+    key waits here until the owner's transaction commits or rolls back.
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO idempotency_keys (user_id, key_hash, request_hash, expires_at)
+            VALUES (%s, %s, %s, NOW() + make_interval(secs => %s))
+            ON CONFLICT (user_id, key_hash) DO UPDATE
+            SET request_hash = EXCLUDED.request_hash,
+                status_code = NULL,
+                response_body = NULL,
+                claimed_at = NOW(),
+                expires_at = EXCLUDED.expires_at
+            WHERE idempotency_keys.expires_at < NOW()
+            RETURNING 1
+        """, (user_id, key_hash, request_hash, ttl))
+        return cur.fetchone() is not None
+
+
+def get_idempotency_record(conn, user_id, key_hash, grace):
+    """The live record; response_lost is true once it has gone `grace` seconds without a response."""
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            SELECT request_hash, status_code, response_body,
+                   status_code IS NULL AND claimed_at < NOW() - make_interval(secs => %s) AS response_lost
+            FROM idempotency_keys
+            WHERE user_id = %s AND key_hash = %s AND expires_at >= NOW()
+        """, (grace, user_id, key_hash))
+        return cur.fetchone()
+
+
+def save_idempotent_response(conn, user_id, key_hash, status_code, body):
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE idempotency_keys
+            SET status_code = %s, response_body = %s
+            WHERE user_id = %s AND key_hash = %s
+        """, (status_code, Json(body), user_id, key_hash))
+
+
+def purge_expired_idempotency_keys(conn, batch_size):
+    """Delete up to batch_size expired keys. Returns the number deleted."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            DELETE FROM idempotency_keys
+            WHERE (user_id, key_hash) IN (
+                SELECT user_id, key_hash
+                FROM idempotency_keys
+                WHERE expires_at < NOW()
+                ORDER BY expires_at
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+        """, (batch_size,))
+        return cur.rowcount
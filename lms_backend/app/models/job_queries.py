@@ -0,0 +1,28 @@
+# app/models/job_queries.py
+from psycopg2.extras import RealDictCursor
+
+# Session-level advisory lock keys, one per job that must not run concurrently across nodes
+OVERDUE_JOB_LOCK_KEY = 7301001
+AUDIT_PARTITION_JOB_LOCK_KEY = 7301002
+
+
+def try_advisory_lock(conn, key):
+    """Try to take a session-level advisory lock. Returns True if acquired."""
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("SELECT pg_try_advisory_lock(%s) AS locked", (key,))
+        return cur.fetchone()["locked"]
+
+
+def advisory_unlock(conn, key):
+    """Release a session-level advisory lock taken with try_advisory_lock."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_unlock(%s)", (key,))
+
+
+def record_job_run(conn, job_name, node, started_at, duration_ms, rows_affected):
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO job_runs (job_name, node, started_at, duration_ms, rows_affected)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (job_name, node, started_at, duration_ms, rows_affected))
+        # commit handled by service layer
@@ -0,0 +1,238 @@
+# app/models/pool.py
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(RuntimeError):
+    """Raised when no connection becomes available within the acquire timeout."""
+
+
+class _PooledConnection:
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """
+    Thread-safe PostgreSQL connection pool.
+
+    - connections are opened lazily; prune() never shrinks below min_size
+    - at most max_size connections exist at any time
+    - idle connections older than idle_timeout (seconds) are closed
+    - connections older than max_lifetime (seconds) are recycled
+    - health_check runs `SELECT 1` on checkout before handing a connection out
+    """
+
+    def __init__(self, connect, min_size=1, max_size=10, idle_timeout=300,
+                 max_lifetime=3600, acquire_timeout=30, health_check=True):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.acquire_timeout = acquire_timeout
+        self.health_check = health_check
+
+        self._idle = deque()
+        self._in_use = {}
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self._last_prune = time.monotonic()
+        self._cond = threading.Condition()
+
+        self._stats = {
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "timeouts": 0,
+            "health_check_failures": 0,
+            "total_wait_ms": 0.0,
+        }
+
+    # =========================
+    # CHECKOUT / RETURN
+    # =========================
+    def getconn(self):
+        """Check out a connection, opening a new one if under max_size."""
+        started = time.monotonic()
+        deadline = started + self.acquire_timeout if self.acquire_timeout else None
+
+        while True:
+            entry = self._reserve(deadline)
+            if entry is None:
+                break
+            # Health check outside the lock so a slow round trip does not block other threads
+            if self._is_healthy(entry):
+                with self._cond:
+                    return self._checkout(entry, started)
+            with self._cond:
+                self._discard(entry)
+                self._cond.notify()
+
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._stats["connections_opened"] += 1
+            return self._checkout(_PooledConnection(conn), started)
+
+    def putconn(self, conn, close=False):
+        """Return a connection to the pool. Open transactions are rolled back."""
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+        if entry is None:
+            # Not ours (or already returned): just make sure it does not leak
+            if not getattr(conn, "closed", True):
+                conn.close()
+            return
+
+        if not close and not getattr(conn, "closed", False):
+            try:
+                conn.rollback()
+            except Exception:
+                close = True
+
+        with self._cond:
+            if close or self._closed or getattr(conn, "closed", False) or self._is_expired(entry):
+                self._discard(entry)
+            else:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+            self._cond.notify()
+
+        # Idle connections at the bottom of the LIFO stack are otherwise never revisited
+        if self.idle_timeout and time.monotonic() - self._last_prune > self.idle_timeout:
+            self.prune()
+
+    # =========================
+    # MAINTENANCE
+    # =========================
+    def prune(self):
+        """Close idle connections past idle_timeout/max_lifetime, keeping min_size warm."""
+        with self._cond:
+            self._last_prune = time.monotonic()
+            keep = deque()
+            while self._idle:
+                entry = self._idle.popleft()
+                if self._is_expired(entry) and self._size > self.min_size:
+                    self._discard(entry)
+                else:
+                    keep.append(entry)
+            self._idle = keep
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._discard(self._idle.pop())
+            for entry in list(self._in_use.values()):
+                self._discard(entry)
+            self._in_use.clear()
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            checkouts = self._stats["checkouts"]
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "waiting": self._waiting,
+                "connections_opened": self._stats["connections_opened"],
+                "connections_closed": self._stats["connections_closed"],
+                "checkouts": checkouts,
+                "timeouts": self._stats["timeouts"],
+                "health_check_failures": self._stats["health_check_failures"],
+                "avg_wait_ms": round(self._stats["total_wait_ms"] / checkouts, 3) if checkouts else 0.0,
+            }
+
+    # =========================
+    # INTERNALS
+    # =========================
+    def _reserve(self, deadline):
+        """
+        Pop a reusable idle connection, or reserve a slot for a new one (returns None).
+        Blocks until one of the two is possible or the deadline passes.
+        """
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+
+                while self._idle:
+                    entry = self._idle.pop()
+                    if self._is_expired(entry):
+                        self._discard(entry)
+                        continue
+                    return entry
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"Timed out after {self.acquire_timeout}s waiting for a database connection"
+                    )
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+    def _checkout(self, entry, started):
+        self._in_use[id(entry.conn)] = entry
+        self._stats["checkouts"] += 1
+        self._stats["total_wait_ms"] += (time.monotonic() - started) * 1000
+        return entry.conn
+
+    def _is_expired(self, entry):
+        now = time.monotonic()
+        if self.max_lifetime and now - entry.created_at > self.max_lifetime:
+            return True
+        if self.idle_timeout and now - entry.last_used > self.idle_timeout:
+            return True
+        return False
+
+    def _is_healthy(self, entry):
+        conn = entry.conn
+        if getattr(conn, "closed", False):
+            return False
+        if not self.health_check:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            with self._cond:
+                self._stats["health_check_failures"] += 1
+            return False
+
+    def _discard(self, entry):
+        self._size -= 1
+        self._stats["connections_closed"] += 1
+        try:
+            if not getattr(entry.conn, "closed", True):
+                entry.conn.close()
+        except Exception:
+            pass
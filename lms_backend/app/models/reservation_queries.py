@@ -27,7 +27,7 @@ def create_reservation(conn, user_id, book_id, expiry_days=3):
 # =====================================================
 def get_oldest_active_reservation(conn, book_id):
     """
-    Fetch the oldest ACTIVE reservation for a book.
+    Fetch the oldest ACTIVE, unexpired reservation for a book.
     Uses FOR UPDATE to prevent race conditions during auto-assign.
     Returns reservation dict or None.
     """
@@ -37,6 +37,7 @@ def get_oldest_active_reservation(conn, book_id):
             FROM reservations
             WHERE book_id = %s
               AND reservation_status = 'ACTIVE'
+              AND (expiry_date IS NULL OR expiry_date >= NOW())
             ORDER BY reservation_date ASC
             LIMIT 1
             FOR UPDATE
@@ -60,9 +61,6 @@ def mark_reservation_fulfilled(conn, reservation_id):
         # commit handled by service layer
 
 
-# =====================================================
-# EXPIRE OVERDUE RESERVATIONS
-# =====================================================
 def get_all_reservations(conn, limit=100, offset=0):
     """Admin: list all reservations with user and book info."""
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
@@ -91,17 +89,55 @@ def get_user_reservations(conn, user_id):
         return cur.fetchall()
 
 
-def expire_overdue_reservations(conn):
+# =====================================================
+# EXPIRE OVERDUE RESERVATIONS
+# =====================================================
+def expire_overdue_reservations(conn, batch_size=None):
     """
     Expires reservations where expiry_date has passed and status is still ACTIVE.
-    Can be called periodically or before issuing a book.
+    With batch_size, expires at most that many rows (oldest first), skipping rows
+    locked by concurrent requests. Returns the number of reservations expired.
+    Called by the scheduled sweeper (see reservation_service).
+    """
+    with conn.cursor() as cur:
+        if batch_size is None:
+            cur.execute("""
+                UPDATE reservations
+                SET reservation_status = 'EXPIRED'
+                WHERE reservation_status = 'ACTIVE'
+                  AND expiry_date IS NOT NULL
+                  AND expiry_date < NOW()
+            """)
+        else:
+            cur.execute("""
+                UPDATE reservations
+                SET reservation_status = 'EXPIRED'
+                WHERE reservation_id IN (
+                    SELECT reservation_id
+                    FROM reservations
+                    WHERE reservation_status = 'ACTIVE'
+                      AND expiry_date < NOW()
+                    ORDER BY expiry_date
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+            """, (batch_size,))
+        return cur.rowcount
+        # commit handled by service layer
+
+
+def expire_user_reservation(conn, user_id, book_id):
+    """
+    Expire one user's lapsed reservation for a book, if the sweeper has not reached it yet.
+    Lets the user reserve the same book again without waiting for the next sweep.
     """
     with conn.cursor() as cur:
         cur.execute("""
             UPDATE reservations
             SET reservation_status = 'EXPIRED'
-            WHERE reservation_status = 'ACTIVE'
-              AND expiry_date IS NOT NULL
+            WHERE user_id = %s
+              AND book_id = %s
+              AND reservation_status = 'ACTIVE'
               AND expiry_date < NOW()
-        """)
+        """, (user_id, book_id))
         # commit handled by service layer
@@ -1,91 +1,130 @@
 """Stats/dashboard queries for LMS."""
 from datetime import datetime, timedelta
+from decimal import Decimal
 from psycopg2.extras import RealDictCursor
 
 
+# Counter name -> type of the value returned by get_admin_stats
+ADMIN_COUNTERS = {
+    "total_issued_books": int,
+    "total_available_books": int,
+    "total_students": int,
+    "total_teachers": int,
+    "total_fine_collected": Decimal,
+}
+
+
 def get_admin_stats(conn):
-    """Total issued, available books, students, teachers, fine collected."""
+    """Total issued, available books, students, teachers, fine collected (from library_counters)."""
+    counters = get_library_counters(conn)
+    return {name: cast(counters.get(name, 0)) for name, cast in ADMIN_COUNTERS.items()}
+
+
+def get_library_counters(conn):
+    """Trigger-maintained counters as {counter_name: value}, summed over their slots."""
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute("""
-            SELECT
-                (SELECT COUNT(*) FROM borrows WHERE borrow_status = 'ACTIVE') AS total_issued_books,
-                (SELECT COALESCE(SUM(available_copies), 0)::int FROM books WHERE is_active = TRUE) AS total_available_books,
-                (SELECT COUNT(*) FROM users WHERE role_id = 3 AND status = 'APPROVED') AS total_students,
-                (SELECT COUNT(*) FROM users WHERE role_id = 2 AND status = 'APPROVED') AS total_teachers,
-                (SELECT COALESCE(SUM(amount), 0) FROM fines WHERE paid_status = TRUE) AS total_fine_collected
+            SELECT counter_name, SUM(value) AS value
+            FROM library_counters
+            GROUP BY counter_name
         """)
-        return cur.fetchone()
+        return {row["counter_name"]: row["value"] for row in cur.fetchall()}
 
 
-def get_teacher_stats(conn, user_id):
-    """Issued books count, due today, overdue for teacher."""
+def compute_library_counters(conn):
+    """The same counters recomputed from the base tables."""
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
-        cur.execute("""
-            SELECT COUNT(*) AS issued_count
-            FROM borrows WHERE user_id = %s AND borrow_status = 'ACTIVE'
-        """, (user_id,))
-        issued = cur.fetchone()["issued_count"]
+        cur.execute("SELECT counter_name, value FROM lms_compute_counters()")
+        return {row["counter_name"]: row["value"] for row in cur.fetchall()}
 
-        cur.execute("""
-            SELECT b.borrow_id, b.book_id, b.due_date, bk.title, bk.author
-            FROM borrows b
-            JOIN books bk ON b.book_id = bk.book_id
-            WHERE b.user_id = %s AND b.borrow_status = 'ACTIVE'
-              AND b.due_date::date = CURRENT_DATE
-            ORDER BY b.due_date
-        """, (user_id,))
-        due_today = cur.fetchall()
 
+def lock_library_counters(conn):
+    """Block counter triggers until the end of the transaction (held by reconciliation)."""
+    with conn.cursor() as cur:
+        cur.execute("LOCK TABLE library_counters IN EXCLUSIVE MODE")
+
+
+def reset_library_counter(conn, counter_name, value):
+    """Collapse a counter's slots into one row holding value. Commit handled by service layer."""
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM library_counters WHERE counter_name = %s", (counter_name,))
         cur.execute("""
-            SELECT b.borrow_id, b.book_id, b.due_date, bk.title, bk.author
-            FROM borrows b
-            JOIN books bk ON b.book_id = bk.book_id
-            WHERE b.user_id = %s AND b.borrow_status = 'ACTIVE'
-              AND b.due_date < NOW()
-            ORDER BY b.due_date
-        """, (user_id,))
-        overdue = cur.fetchall()
+            INSERT INTO library_counters (counter_name, slot, value)
+            VALUES (%s, 0, %s)
+        """, (counter_name, value))
+
+
+# A user's open borrows with book details, shared by the teacher and student dashboards
+_OPEN_BORROWS_CTE = """
+    WITH open_borrows AS (
+        SELECT b.borrow_id, b.book_id, b.due_date, bk.title, bk.author
+        FROM borrows b
+        JOIN books bk ON b.book_id = bk.book_id
+        WHERE b.user_id = %(user_id)s AND b.borrow_status IN ('ACTIVE', 'OVERDUE')
+    )
+"""
+
+_BORROW_JSON = """
+    json_build_object(
+        'borrow_id', borrow_id, 'book_id', book_id,
+        'due_date', to_char(due_date, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+        'title', title, 'author', author
+    ) ORDER BY due_date
+"""
+
+
+def _borrow_list(rows):
+    """due_date comes back from json_agg as ISO text; restore datetimes so responses keep their format."""
+    for row in rows:
+        row["due_date"] = datetime.fromisoformat(row["due_date"])
+    return rows
+
+
+def get_teacher_stats(conn, user_id):
+    """Issued books count, due today, overdue for teacher (one query)."""
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(_OPEN_BORROWS_CTE + f"""
+            SELECT
+                COUNT(*) AS issued_count,
+                COALESCE(json_agg({_BORROW_JSON}) FILTER (WHERE due_date::date = CURRENT_DATE), '[]') AS due_today,
+                COALESCE(json_agg({_BORROW_JSON}) FILTER (WHERE due_date < NOW()), '[]') AS overdue
+            FROM open_borrows
+        """, {"user_id": user_id})
+        row = cur.fetchone()
 
     return {
-        "issued_count": issued,
-        "due_today": due_today,
-        "overdue": overdue,
+        "issued_count": row["issued_count"],
+        "due_today": _borrow_list(row["due_today"]),
+        "overdue": _borrow_list(row["overdue"]),
     }
 
 
 def get_student_stats(conn, user_id):
-    """Currently borrowed, due soon, total fines, active reservations for student."""
+    """Currently borrowed, due soon, total fines, active reservations for student (one query)."""
     soon_days = 2
     soon_end = datetime.utcnow() + timedelta(days=soon_days)
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
-        cur.execute("""
-            SELECT COUNT(*) AS count FROM borrows WHERE user_id = %s AND borrow_status = 'ACTIVE'
-        """, (user_id,))
-        borrowed = cur.fetchone()["count"]
-
-        cur.execute("""
-            SELECT b.borrow_id, b.book_id, b.due_date, bk.title, bk.author
-            FROM borrows b
-            JOIN books bk ON b.book_id = bk.book_id
-            WHERE b.user_id = %s AND b.borrow_status = 'ACTIVE'
-              AND b.due_date >= NOW() AND b.due_date <= %s
-            ORDER BY b.due_date
-        """, (user_id, soon_end))
-        due_soon = cur.fetchall()
-
-        cur.execute("""
-            SELECT COALESCE(SUM(amount), 0)::float AS total FROM fines WHERE user_id = %s AND paid_status = FALSE
-        """, (user_id,))
-        total_fines = cur.fetchone()["total"] or 0
-
-        cur.execute("""
-            SELECT COUNT(*) AS count FROM reservations WHERE user_id = %s AND reservation_status = 'ACTIVE'
-        """, (user_id,))
-        active_reservations = cur.fetchone()["count"]
+        cur.execute(_OPEN_BORROWS_CTE + f"""
+            SELECT
+                ob.borrowed_count,
+                ob.due_soon,
+                (SELECT COALESCE(SUM(amount), 0)::float FROM fines
+                 WHERE user_id = %(user_id)s AND paid_status = FALSE) AS total_fines,
+                (SELECT COUNT(*) FROM reservations
+                 WHERE user_id = %(user_id)s AND reservation_status = 'ACTIVE') AS active_reservations
+            FROM (
+                SELECT
+                    COUNT(*) AS borrowed_count,
+                    COALESCE(json_agg({_BORROW_JSON})
+                             FILTER (WHERE due_date >= NOW() AND due_date <= %(soon_end)s), '[]') AS due_soon
+                FROM open_borrows
+            ) ob
+        """, {"user_id": user_id, "soon_end": soon_end})
+        row = cur.fetchone()
 
     return {
-        "borrowed_count": borrowed,
-        "due_soon": due_soon,
-        "total_fines": float(total_fines),
-        "active_reservations": active_reservations,
+        "borrowed_count": row["borrowed_count"],
+        "due_soon": _borrow_list(row["due_soon"]),
+        "total_fines": float(row["total_fines"] or 0),
+        "active_reservations": row["active_reservations"],
     }
@@ -1,3 +1,5 @@
+import csv
+import io
 from psycopg2.extras import RealDictCursor
 
 
@@ -130,3 +132,68 @@ def update_user_status(conn, user_id, status, approved_by=None):
                 approved_at = CURRENT_TIMESTAMP
             WHERE user_id = %s
         """, (status, approved_by, user_id))
+
+
+def update_users_status(conn, user_ids, status, approved_by=None):
+    """Set-based update_user_status. Returns the ids that exist and were updated."""
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            UPDATE users
+            SET status = %s,
+                approved_by = %s,
+                approved_at = CURRENT_TIMESTAMP
+            WHERE user_id = ANY(%s)
+            RETURNING user_id
+        """, (status, approved_by, list(user_ids)))
+        return {row["user_id"] for row in cur.fetchall()}
+
+
+# =========================
+# BULK IMPORT
+# =========================
+def get_existing_emails(conn, emails):
+    """Subset of `emails` already registered, in one query."""
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("SELECT email FROM users WHERE email = ANY(%s)", (list(emails),))
+        return {row["email"] for row in cur.fetchall()}
+
+
+def bulk_insert_users(conn, rows, status="PENDING", approved_by=None):
+    """
+    Load rows of (line_no, name, email, password_hash, role_id, phone) with COPY
+    into a temporary staging table, then insert them into users in one statement.
+    Emails registered concurrently are skipped (ON CONFLICT DO NOTHING).
+    Returns {email: user_id} for the users actually created. Commit handled by service layer.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if value is None else value for value in row])
+    buffer.seek(0)
+
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            CREATE TEMP TABLE user_import_staging (
+                line_no INTEGER,
+                name VARCHAR(100),
+                email VARCHAR(120),
+                password VARCHAR(200),
+                role_id INTEGER,
+                phone VARCHAR(20)
+            ) ON COMMIT DROP
+        """)
+        cur.copy_expert(
+            "COPY user_import_staging (line_no, name, email, password, role_id, phone) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+        cur.execute("""
+            INSERT INTO users (name, email, password, role_id, phone, status, approved_by, approved_at)
+            SELECT name, email, password, role_id, phone,
+                   %s, %s, CASE WHEN %s = 'PENDING' THEN NULL ELSE CURRENT_TIMESTAMP END
+            FROM user_import_staging
+            ORDER BY line_no
+            ON CONFLICT (email) DO NOTHING
+            RETURNING user_id, email
+        """, (status, approved_by, status))
+        return {row["email"]: row["user_id"] for row in cur.fetchall()}
@@ -1,8 +1,10 @@
+from datetime import datetime
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from app.utils.decorators import admin_required
+from app.utils.pagination import parse_limit, parse_optional
 from app.models.db import get_db
-from app.models.audit_queries import get_audit_logs
+from app.services.audit_service import get_audit_logs, fetch_audit_logs_page
 
 audit_bp = Blueprint("audit", __name__)
 
@@ -11,6 +13,10 @@ audit_bp = Blueprint("audit", __name__)
 @jwt_required()
 @admin_required
 def view_audit_logs():
+    # ?page= keeps the legacy OFFSET listing; otherwise keyset pagination with filters
+    if "page" not in request.args:
+        return view_audit_logs_keyset()
+
     page = int(request.args.get("page", 1))
     limit = int(request.args.get("limit", 20))
     offset = (page - 1) * limit
@@ -22,3 +28,26 @@ def view_audit_logs():
     finally:
         # request-scoped connection closed by teardown
         pass
+
+
+def view_audit_logs_keyset():
+    """
+    Query params: limit, cursor, user_id, action, entity_type, entity_id,
+    since, until (ISO 8601). Returns {"items": [...], "next_cursor": ...}.
+    """
+    conn = get_db()
+    try:
+        result = fetch_audit_logs_page(
+            conn,
+            limit=parse_limit(request.args.get("limit"), default=20, maximum=200),
+            cursor=request.args.get("cursor"),
+            user_id=parse_optional(request.args, "user_id", int),
+            action=parse_optional(request.args, "action", str),
+            entity_type=parse_optional(request.args, "entity_type", str),
+            entity_id=parse_optional(request.args, "entity_id", int),
+            since=parse_optional(request.args, "since", datetime.fromisoformat),
+            until=parse_optional(request.args, "until", datetime.fromisoformat),
+        )
+        return jsonify(result)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
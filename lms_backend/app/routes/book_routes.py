@@ -1,12 +1,20 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.utils.decorators import admin_required
+from app.utils.decorators import admin_required, conditional
 from app.models.db import get_db
 from app.services.audit_service import log_action
+from app.utils.pagination import parse_limit, parse_bool, parse_page
+from app.utils.import_formats import detect_format
+from app.services.book_import_service import import_books
 from app.services.book_service import (
     add_book,
     fetch_book,
     fetch_all_books,
+    fetch_books_page,
+    search_catalog,
+    catalog_etag,
+    book_etag,
+    MAX_PAGE_SIZE,
     change_book_copies,
     update_book_details,
     remove_book,
@@ -46,6 +54,43 @@ def create_book_route():
         return jsonify({"error": "Internal server error"}), 500
 
 
+# =========================
+# ADMIN: BULK IMPORT
+# =========================
+@book_bp.route("/import", methods=["POST"])
+@jwt_required()
+@admin_required
+def import_books_route():
+    """
+    Upload a CSV (header: title,author,isbn,total_copies,category,available_copies)
+    or NDJSON file as multipart field "file" or as the raw request body.
+    ?on_conflict=skip (default) or update for ISBNs already in the catalog;
+    ?format=csv|ndjson overrides detection. Returns a per-line error report.
+    """
+    conn = get_db()
+    admin = get_jwt_identity()
+    upload = request.files.get("file")
+    try:
+        if upload is not None:
+            raw, filename, content_type = upload.read(), upload.filename, upload.mimetype
+        else:
+            raw, filename, content_type = request.get_data(), None, request.mimetype
+        fmt = detect_format(filename, content_type, request.args.get("format"))
+        report = import_books(
+            conn, raw, fmt, admin["id"],
+            on_conflict=request.args.get("on_conflict", "skip").lower(),
+            source=filename,
+        )
+        return jsonify(report), 200
+    except UnicodeDecodeError:
+        return jsonify({"error": "Upload must be UTF-8 encoded"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print("Book import failed:", e)
+        return jsonify({"error": "Internal server error"}), 500
+
+
 # =========================
 # ADMIN: UPDATE COPIES
 # =========================
@@ -77,12 +122,57 @@ def update_book_copies_route(book_id):
 # =========================
 # PUBLIC: GET ALL BOOKS
 # =========================
+# Query params: limit, cursor, category, author, available, fields (comma separated).
+# Any of them switches the response to a keyset page {"items": [...], "next_cursor": ...};
+# without them the full list is returned for existing clients.
+# Responses carry an ETag; If-None-Match gets 304 until a book changes.
+PAGE_PARAMS = ("limit", "cursor", "category", "author", "available", "fields")
+
+
 @book_bp.route("/", methods=["GET"])
+@conditional(lambda conn: catalog_etag(conn, request.args), cache_control="CACHE_CONTROL_BOOKS")
 def get_all_books_route():
     conn = get_db()
+    args = request.args
     try:
-        books = fetch_all_books(conn)
-        return jsonify(books), 200
+        if not any(p in args for p in PAGE_PARAMS):
+            books = fetch_all_books(conn)
+            return jsonify(books), 200
+
+        fields = [f.strip() for f in args["fields"].split(",") if f.strip()] if args.get("fields") else None
+        page = fetch_books_page(
+            conn,
+            limit=parse_limit(args.get("limit"), maximum=MAX_PAGE_SIZE),
+            cursor=args.get("cursor"),
+            category=args.get("category"),
+            author=args.get("author"),
+            available=parse_bool(args.get("available")),
+            fields=fields,
+        )
+        return jsonify(page), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(e)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+# =========================
+# PUBLIC: SEARCH BOOKS
+# =========================
+@book_bp.route("/search", methods=["GET"])
+def search_books_route():
+    conn = get_db()
+    try:
+        result = search_catalog(
+            conn,
+            request.args.get("q"),
+            page=parse_page(request.args.get("page")),
+            limit=parse_limit(request.args.get("limit"), default=20, maximum=MAX_PAGE_SIZE),
+        )
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         print(e)
         return jsonify({"error": "Internal server error"}), 500
@@ -142,6 +232,7 @@ def delete_book_route(book_id):
 # PUBLIC: GET SINGLE BOOK
 # =========================
 @book_bp.route("/<int:book_id>", methods=["GET"])
+@conditional(book_etag, cache_control="CACHE_CONTROL_BOOK_DETAIL")
 def get_single_book_route(book_id):
     conn = get_db()
     try:
@@ -1,5 +1,6 @@
 # app/routes/borrow_routes.py
-from flask import Blueprint, request, jsonify
+from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.db import get_db
 from app.models.borrow_queries import get_all_active_borrows, get_user_active_borrows, get_user_borrow_history, get_pending_borrows, get_all_borrows
@@ -12,16 +13,32 @@ from app.services.borrow_service import (
     admin_return_by_borrow_id,
     approve_borrow,
     reject_borrow,
+    approve_borrows,
+    reject_borrows,
+    issue_books,
+    return_books,
+    fetch_borrows_page,
+    export_borrows,
 )
-from app.utils.decorators import admin_required
+from app.services.export_service import CONTENT_TYPES
+from app.utils.pagination import parse_limit, parse_optional
+from app.utils.batch import parse_ids, batch_response
+from app.utils.decorators import admin_required, idempotent
 
 borrow_bp = Blueprint("borrow", __name__)
 
+# Books per issue-batch / return-batch call (one desk checkout)
+MAX_CART_BOOKS = 50
+
+# Any of these switches /admin/all from the full list to keyset pages
+LISTING_PARAMS = ("limit", "cursor", "status", "user_id", "book_id", "since", "until")
+
 # =========================
 # REQUEST BORROW (STUDENT & TEACHER) – creates PENDING
 # =========================
 @borrow_bp.route("/request", methods=["POST"])
 @jwt_required()
+@idempotent
 def request_borrow_route():
     conn = get_db()
     user = get_jwt_identity()
@@ -51,6 +68,7 @@ def request_borrow_route():
 # =========================
 @borrow_bp.route("/return", methods=["POST"])
 @jwt_required()
+@idempotent
 def return_book():
     conn = get_db()
     user = get_jwt_identity()
@@ -117,9 +135,50 @@ def my_borrow_history():
 @jwt_required()
 @admin_required
 def admin_list_all_borrows():
+    """
+    Without query params: the full listing. With limit, cursor, status, user_id,
+    book_id, since or until (ISO 8601, on issue_date): {"items": [...], "next_cursor": ...}.
+    """
     conn = get_db()
-    borrows = get_all_borrows(conn)
-    return jsonify(borrows)
+    if not any(p in request.args for p in LISTING_PARAMS):
+        borrows = get_all_borrows(conn)
+        return jsonify(borrows)
+    try:
+        page = fetch_borrows_page(
+            conn,
+            limit=parse_limit(request.args.get("limit"), default=50, maximum=500),
+            cursor=request.args.get("cursor"),
+            **_listing_filters(),
+        )
+        return jsonify(page), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@borrow_bp.route("/admin/all/export", methods=["GET"])
+@jwt_required()
+@admin_required
+def admin_export_all_borrows():
+    """Streams the listing (same filters as /admin/all) as ?format=json (default) or csv."""
+    conn = get_db()
+    fmt = request.args.get("format", "json").lower()
+    try:
+        chunks = export_borrows(conn, fmt, **_listing_filters())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    response = Response(stream_with_context(chunks), mimetype=CONTENT_TYPES[fmt])
+    response.headers["Content-Disposition"] = f'attachment; filename="borrows.{fmt}"'
+    return response
+
+
+def _listing_filters():
+    return {
+        "status": parse_optional(request.args, "status", str.upper),
+        "user_id": parse_optional(request.args, "user_id", int),
+        "book_id": parse_optional(request.args, "book_id", int),
+        "since": parse_optional(request.args, "since", datetime.fromisoformat),
+        "until": parse_optional(request.args, "until", datetime.fromisoformat),
+    }
 
 
 # =========================
@@ -176,6 +235,42 @@ def admin_reject_borrow(borrow_id):
         return jsonify({"error": "Internal server error"}), 500
 
 
+@borrow_bp.route("/admin/approve-batch", methods=["POST"])
+@jwt_required()
+@admin_required
+def admin_approve_borrows():
+    """Body: {"borrow_ids": [...]}. One transaction; per-request outcome in "results"."""
+    conn = get_db()
+    admin = get_jwt_identity()
+    try:
+        borrow_ids = parse_ids((request.get_json(silent=True) or {}).get("borrow_ids"), name="borrow_ids")
+        outcomes = approve_borrows(conn, borrow_ids, admin["id"])
+        return jsonify(batch_response(borrow_ids, outcomes, id_key="borrow_id")), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print("Batch approve failed:", e)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@borrow_bp.route("/admin/reject-batch", methods=["POST"])
+@jwt_required()
+@admin_required
+def admin_reject_borrows():
+    """Body: {"borrow_ids": [...]}. One transaction; per-request outcome in "results"."""
+    conn = get_db()
+    admin = get_jwt_identity()
+    try:
+        borrow_ids = parse_ids((request.get_json(silent=True) or {}).get("borrow_ids"), name="borrow_ids")
+        outcomes = reject_borrows(conn, borrow_ids, admin["id"])
+        return jsonify(batch_response(borrow_ids, outcomes, id_key="borrow_id")), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print("Batch reject failed:", e)
+        return jsonify({"error": "Internal server error"}), 500
+
+
 # =========================
 # ADMIN: LIST USERS (for Issue form – Students + Teachers)
 # =========================
@@ -194,6 +289,7 @@ def admin_list_users():
 @borrow_bp.route("/admin/issue", methods=["POST"])
 @jwt_required()
 @admin_required
+@idempotent
 def admin_issue():
     conn = get_db()
     data = request.get_json()
@@ -216,6 +312,7 @@ def admin_issue():
 @borrow_bp.route("/admin/return", methods=["POST"])
 @jwt_required()
 @admin_required
+@idempotent
 def admin_return():
     conn = get_db()
     data = request.get_json()
@@ -231,6 +328,45 @@ def admin_return():
         return jsonify({"error": "Internal server error"}), 500
 
 
+# =========================
+# ADMIN: ISSUE / RETURN SEVERAL BOOKS FOR ONE USER
+# =========================
+@borrow_bp.route("/admin/issue-batch", methods=["POST"])
+@jwt_required()
+@admin_required
+@idempotent
+def admin_issue_batch():
+    """Body: {"user_id", "book_ids": [...]}. One transaction; per-book outcome in "results"."""
+    return _cart(issue_books, "Batch issue failed:")
+
+
+@borrow_bp.route("/admin/return-batch", methods=["POST"])
+@jwt_required()
+@admin_required
+@idempotent
+def admin_return_batch():
+    """Body: {"user_id", "book_ids": [...]}. One transaction; per-book outcome and fine in "results"."""
+    return _cart(return_books, "Batch return failed:")
+
+
+def _cart(action, failure):
+    conn = get_db()
+    data = request.get_json(silent=True) or {}
+    user_id = data.get("user_id")
+    if not user_id:
+        return jsonify({"error": "user_id is required"}), 400
+    try:
+        book_ids = parse_ids(data.get("book_ids"), name="book_ids", maximum=MAX_CART_BOOKS)
+        results = action(conn, int(user_id), book_ids)
+        outcomes = {book_id: result.pop("outcome") for book_id, result in results.items()}
+        return jsonify(batch_response(book_ids, outcomes, id_key="book_id", details=results)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(failure, e)
+        return jsonify({"error": "Internal server error"}), 500
+
+
 # =========================
 # TEACHER: LIST STUDENTS (for Issue form – Students only)
 # =========================
@@ -250,6 +386,7 @@ def teacher_list_students():
 # =========================
 @borrow_bp.route("/teacher/issue", methods=["POST"])
 @jwt_required()
+@idempotent
 def teacher_issue():
     user = get_jwt_identity()
     if user.get("role_id") != 2:
@@ -0,0 +1,48 @@
+from datetime import datetime
+from flask import Blueprint, Response, request, jsonify
+from flask_jwt_extended import jwt_required
+from app.utils.decorators import admin_required
+from app.utils.pagination import parse_bool, parse_optional
+from app.services.export_service import start_export, ExportBusyError, DATASET_CONTENT_TYPES
+
+export_bp = Blueprint("export", __name__)
+
+
+@export_bp.route("/<dataset>", methods=["GET"])
+@jwt_required()
+@admin_required
+def export_dataset(dataset):
+    """
+    Full dump of books, users, fines or reservations, streamed.
+    Query params: format=csv (default) | ndjson, columns=a,b,c, since/until
+    (ISO 8601, on the dataset's created/reservation date), gzip=true.
+    """
+    args = request.args
+    fmt = args.get("format", "csv").lower()
+    columns = [c.strip() for c in args["columns"].split(",") if c.strip()] if args.get("columns") else None
+    try:
+        compress = bool(parse_bool(args.get("gzip")))
+        stream = start_export(
+            dataset,
+            fmt=fmt,
+            columns=columns,
+            since=parse_optional(request.args, "since", datetime.fromisoformat),
+            until=parse_optional(request.args, "until", datetime.fromisoformat),
+            compress=compress,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except ExportBusyError as e:
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response, 503
+
+    filename = f"{dataset}.{fmt}"
+    if compress:
+        response = Response(stream, mimetype="application/gzip")
+        filename += ".gz"
+    else:
+        response = Response(stream, mimetype=DATASET_CONTENT_TYPES[fmt])
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response.headers["Cache-Control"] = "no-store"
+    return response
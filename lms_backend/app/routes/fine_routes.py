@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.utils.decorators import admin_required
+from app.utils.decorators import admin_required, idempotent
 from app.models.db import get_db
 from app.services.fine_service import pay_fine, get_my_unpaid_fines, get_my_fines_with_book, get_all_fines_admin
 
@@ -37,6 +37,7 @@ def my_fines():
 @fine_bp.route("/pay/<int:fine_id>", methods=["POST"])
 @jwt_required()
 @admin_required
+@idempotent
 def pay_fine_route(fine_id):
     current_user = get_jwt_identity()
     admin_id = current_user.get("id")
@@ -0,0 +1,63 @@
+"""Operational metrics routes (admin only)."""
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+from app.models.db import get_pool_stats
+from app.services.audit_service import get_audit_buffer_stats
+from app.services.stats_service import get_stats_cache_stats
+from app.services.password_hasher import get_password_hasher_stats
+from app.services.export_service import get_export_stats
+from app.utils.decorators import admin_required
+from app.utils.token_blacklist import get_blacklist_stats
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/db-pool", methods=["GET"])
+@jwt_required()
+@admin_required
+def db_pool_stats():
+    stats = get_pool_stats()
+    if stats is None:
+        return jsonify({"message": "Connection pool not initialized yet"}), 200
+    return jsonify(stats)
+
+
+@metrics_bp.route("/audit-buffer", methods=["GET"])
+@jwt_required()
+@admin_required
+def audit_buffer_stats():
+    stats = get_audit_buffer_stats()
+    if stats is None:
+        return jsonify({"message": "Audit buffer not in use"}), 200
+    return jsonify(stats)
+
+
+@metrics_bp.route("/stats-cache", methods=["GET"])
+@jwt_required()
+@admin_required
+def stats_cache_stats():
+    return jsonify(get_stats_cache_stats())
+
+
+@metrics_bp.route("/token-blacklist", methods=["GET"])
+@jwt_required()
+@admin_required
+def token_blacklist_stats():
+    return jsonify(get_blacklist_stats())
+
+
+@metrics_bp.route("/password-hashing", methods=["GET"])
+@jwt_required()
+@admin_required
+def password_hashing_stats():
+    stats = get_password_hasher_stats()
+    if stats is None:
+        return jsonify({"message": "No passwords hashed yet"}), 200
+    return jsonify(stats)
+
+
+@metrics_bp.route("/exports", methods=["GET"])
+@jwt_required()
+@admin_required
+def export_stats():
+    return jsonify(get_export_stats())
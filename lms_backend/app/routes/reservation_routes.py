@@ -5,7 +5,7 @@ from app.models.db import get_db
 from app.models.book_queries import get_book_by_id
 from app.models.reservation_queries import (
     create_reservation,
-    expire_overdue_reservations,
+    expire_user_reservation,
     get_all_reservations,
     get_user_reservations,
 )
@@ -49,13 +49,14 @@ def create_new_reservation():
     conn = get_db()
 
     try:
-        expire_overdue_reservations(conn)
         book = get_book_by_id(conn, book_id)
         if not book:
             return jsonify({"error": "Book not found"}), 400
         if book.get("available_copies", 0) > 0:
             return jsonify({"error": "Reserve only when no copies available. Use Request Borrow instead."}), 400
 
+        # Table-wide expiry runs in the scheduled sweeper; only clear this user's lapsed one
+        expire_user_reservation(conn, user_id, book_id)
         reservation_id = create_reservation(conn, user_id, book_id)
 
         log_action(
@@ -2,7 +2,8 @@
 from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.db import get_db
-from app.models.stats_queries import get_admin_stats, get_teacher_stats, get_student_stats
+from app.models.stats_queries import get_teacher_stats, get_student_stats
+from app.services.stats_service import get_admin_stats_cached
 from app.utils.decorators import admin_required
 
 stats_bp = Blueprint("stats", __name__)
@@ -13,8 +14,11 @@ stats_bp = Blueprint("stats", __name__)
 @admin_required
 def admin_stats():
     conn = get_db()
-    stats = get_admin_stats(conn)
-    return jsonify(stats)
+    stats, age = get_admin_stats_cached(conn)
+    response = jsonify(stats)
+    response.headers["X-Cache"] = "MISS" if age is None else "HIT"
+    response.headers["Age"] = str(int(age or 0))
+    return response
 
 
 @stats_bp.route("/teacher", methods=["GET"])
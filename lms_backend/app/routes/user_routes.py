@@ -1,14 +1,20 @@
+import time
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt, get_jwt_identity
 from marshmallow import ValidationError
 
 from app.models.db import get_db
 from app.models.user_queries import get_pending_users, get_user_by_id, get_all_users, get_teachers_and_students, update_user_status, delete_user
-from app.services.user_service import register_user, authenticate_user, approve_or_reject_user
+from app.services.user_service import register_user, authenticate_user, approve_or_reject_user, approve_or_reject_users
+from app.services.password_hasher import HashingBusyError
+from app.services.user_import_service import import_users
+from app.utils.batch import parse_ids, batch_response
+from app.utils.import_formats import detect_format
 from app.utils.decorators import admin_required
 from app.schemas.user_schema import RegisterSchema, LoginSchema
 from app.utils.token_blacklist import add_token_to_blacklist  # import for logout
 from app.services.audit_service import log_action
+from app.services.stats_service import invalidate_admin_stats
 
 user_bp = Blueprint("user", __name__)
 
@@ -16,6 +22,12 @@ register_schema = RegisterSchema()
 login_schema = LoginSchema()
 
 
+def _busy_response(busy):
+    response = jsonify({"error": str(busy)})
+    response.headers["Retry-After"] = str(busy.retry_after)
+    return response, 503
+
+
 # =========================
 # REGISTER
 # =========================
@@ -48,6 +60,9 @@ def register():
     except ValueError as ve:
         return jsonify({"error": str(ve)}), 400
 
+    except HashingBusyError as busy:
+        return _busy_response(busy)
+
     except Exception:
         return jsonify({"error": "Internal Server Error"}), 500
 
@@ -94,6 +109,9 @@ def login():
     except ValueError as ve:
         return jsonify({"error": str(ve)}), 401
 
+    except HashingBusyError as busy:
+        return _busy_response(busy)
+
     except Exception:
         return jsonify({"error": "Internal Server Error"}), 500
     
@@ -172,6 +190,72 @@ def reject_user(user_id):
         return jsonify({"error": str(e)}), 400
 
 
+@user_bp.route("/approve-batch", methods=["POST"])
+@jwt_required()
+@admin_required
+def approve_users_batch():
+    """Body: {"user_ids": [...]}. One transaction; per-user outcome in "results"."""
+    return _set_users_status("APPROVED")
+
+
+@user_bp.route("/reject-batch", methods=["POST"])
+@jwt_required()
+@admin_required
+def reject_users_batch():
+    """Body: {"user_ids": [...]}. One transaction; per-user outcome in "results"."""
+    return _set_users_status("REJECTED")
+
+
+def _set_users_status(status):
+    conn = get_db()
+    admin = get_jwt_identity()
+    try:
+        user_ids = parse_ids((request.get_json(silent=True) or {}).get("user_ids"), name="user_ids")
+        outcomes = approve_or_reject_users(conn, user_ids, status, admin["id"])
+        return jsonify(batch_response(user_ids, outcomes, id_key="user_id")), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print("Batch user status update failed:", e)
+        return jsonify({"error": "Internal Server Error"}), 500
+
+
+# =========================
+# ADMIN: BULK IMPORT
+# =========================
+@user_bp.route("/import", methods=["POST"])
+@jwt_required()
+@admin_required
+def import_users_route():
+    """
+    Upload a CSV (header: name,email,password,role_id,phone) or NDJSON file as
+    multipart field "file" or as the raw request body. ?status=APPROVED (default)
+    or PENDING; ?format=csv|ndjson overrides detection. Returns a per-line error report.
+    """
+    conn = get_db()
+    admin = get_jwt_identity()
+    upload = request.files.get("file")
+    try:
+        if upload is not None:
+            raw, filename, content_type = upload.read(), upload.filename, upload.mimetype
+        else:
+            raw, filename, content_type = request.get_data(), None, request.mimetype
+        fmt = detect_format(filename, content_type, request.args.get("format"))
+        report = import_users(
+            conn, raw, fmt, admin["id"],
+            status=request.args.get("status", "APPROVED").upper(),
+            source=filename,
+        )
+        return jsonify(report), 200 if report["created"] else 400
+    except UnicodeDecodeError:
+        return jsonify({"error": "Upload must be UTF-8 encoded"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print("User import failed:", e)
+        return jsonify({"error": "Internal Server Error"}), 500
+
+
 # =========================
 # TEACHER: LIST TEACHERS & STUDENTS (read-only)
 # =========================
@@ -218,6 +302,7 @@ def set_user_status(user_id):
             description=f"User {user_id} status set to {status}",
         )
         conn.commit()
+        invalidate_admin_stats()
         return jsonify({"message": f"User status set to {status}"}), 200
     except Exception as e:
         conn.rollback()
@@ -242,6 +327,7 @@ def remove_user(user_id):
         )
         delete_user(conn, user_id)
         conn.commit()
+        invalidate_admin_stats()
         return jsonify({"message": "User removed"}), 200
     except Exception as e:
         conn.rollback()
@@ -266,5 +352,6 @@ def logout():
     conn.commit()
     claims = get_jwt()
     jti = claims["jti"]
-    add_token_to_blacklist(jti)
+    # Only needs to stay revoked until the token would have expired anyway
+    add_token_to_blacklist(jti, expires=claims["exp"] - time.time())
     return jsonify({"message": "Logged out successfully"})
@@ -7,7 +7,8 @@ class RegisterSchema(Schema):
         validate=validate.Length(min=3, max=100)
     )
 
-    email = fields.Email(required=True)
+    # Limits match the users columns, so a bulk import reports oversized values per line
+    email = fields.Email(required=True, validate=validate.Length(max=120))
 
     phone = fields.Str(required=False, allow_none=True, validate=validate.Length(max=20))
 
@@ -0,0 +1,103 @@
+# app/services/audit_buffer.py
+import atexit
+import threading
+from psycopg2.extras import execute_values
+from app.models.db import pooled_connection
+
+
+class AuditBuffer:
+    """
+    In-process queue of audit entries written in multi-row INSERT batches.
+
+    A background thread flushes when `batch_size` entries are queued or every
+    `flush_interval` seconds, whichever comes first. Up to `max_pending`
+    entries are held while the database is unreachable; beyond that the
+    oldest are dropped and counted. Entries still queued when the process
+    exits are flushed by an atexit hook, but a hard crash loses them.
+    """
+
+    def __init__(self, batch_size=200, flush_interval=1.0, max_pending=50000, synchronous_commit=True):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.synchronous_commit = synchronous_commit
+
+        self._entries = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {"queued": 0, "written": 0, "flushes": 0, "failures": 0, "dropped": 0}
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="audit-flusher", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def add(self, entry):
+        """Queue one (user_id, action, entity_type, entity_id, description, created_at) tuple."""
+        with self._lock:
+            self._entries.append(entry)
+            self._stats["queued"] += 1
+            self._drop_overflow()
+            full = len(self._entries) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write everything queued so far. Returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._entries = self._entries, []
+            if not batch:
+                return 0
+            try:
+                with pooled_connection() as conn:
+                    with conn.cursor() as cur:
+                        if not self.synchronous_commit:
+                            cur.execute("SET LOCAL synchronous_commit TO OFF")
+                        execute_values(cur, """
+                            INSERT INTO audit_logs (user_id, action, entity_type, entity_id, description, created_at)
+                            VALUES %s
+                        """, batch, page_size=self.batch_size)
+                    conn.commit()
+            except Exception as e:
+                print("Audit flush failed:", e)
+                with self._lock:
+                    # Keep the failed batch ahead of newer entries for the next attempt
+                    self._entries = batch + self._entries
+                    self._stats["failures"] += 1
+                    self._drop_overflow()
+                return 0
+            with self._lock:
+                self._stats["written"] += len(batch)
+                self._stats["flushes"] += 1
+            return len(batch)
+
+    def close(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(5)
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, pending=len(self._entries))
+
+    def _drop_overflow(self):
+        # Caller holds self._lock. Oldest entries go first.
+        overflow = len(self._entries) - self.max_pending
+        if overflow > 0:
+            del self._entries[:overflow]
+            self._stats["dropped"] += overflow
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if not self.flush() and self.stats()["pending"]:
+                # Database unreachable: back off instead of retrying in a tight loop
+                self._stop.wait(self.flush_interval)
@@ -0,0 +1,83 @@
+import gzip
+import os
+import time
+from datetime import datetime
+from app.models.audit_queries import (
+    ensure_audit_partitions,
+    get_audit_partitions,
+    copy_audit_partition,
+    drop_audit_partition,
+)
+from app.models.job_queries import (
+    AUDIT_PARTITION_JOB_LOCK_KEY,
+    try_advisory_lock,
+    advisory_unlock,
+    record_job_run,
+)
+from app.services.overdue_service import NODE_NAME
+
+
+def add_months(month, months):
+    """First day of the month `months` away from `month` (a date or datetime)."""
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def archive_audit_partition(conn, table_name, archive_dir):
+    """
+    Write one partition to <archive_dir>/<table_name>.csv.gz. The file is written
+    under a temporary name and fsynced before being renamed into place.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{table_name}.csv.gz")
+    partial = path + ".part"
+    with open(partial, "wb") as raw:
+        with gzip.GzipFile(filename=f"{table_name}.csv", mode="wb", fileobj=raw) as gz:
+            copy_audit_partition(conn, table_name, gz)
+        raw.flush()
+        os.fsync(raw.fileno())
+    conn.rollback()
+    os.replace(partial, path)
+    return path
+
+
+def rotate_audit_partitions(conn, retain_months=12, archive_dir="archive/audit_logs", months_ahead=3):
+    """
+    Create upcoming monthly audit_logs partitions, then archive and drop those
+    older than retain_months (0 keeps everything). A partition is only dropped
+    after its archive file is safely on disk. Guarded by an advisory lock so
+    only one node rotates at a time.
+    """
+    if not try_advisory_lock(conn, AUDIT_PARTITION_JOB_LOCK_KEY):
+        conn.rollback()
+        return {"skipped": True, "reason": "already running on another node"}
+
+    started_at = datetime.utcnow()
+    started = time.monotonic()
+    archived = []
+    try:
+        created = ensure_audit_partitions(conn, months_ahead)
+        conn.commit()
+
+        if retain_months > 0:
+            cutoff = add_months(datetime.utcnow(), -retain_months).date()
+            # Oldest first, so an interrupted run never leaves a hole between kept months
+            for month, table_name in reversed(get_audit_partitions(conn)):
+                if month >= cutoff:
+                    break
+                archive_audit_partition(conn, table_name, archive_dir)
+                drop_audit_partition(conn, table_name)
+                conn.commit()
+                archived.append(table_name)
+
+        duration_ms = int((time.monotonic() - started) * 1000)
+        record_job_run(conn, "rotate_audit_partitions", NODE_NAME, started_at, duration_ms, len(archived))
+        conn.commit()
+        return {"created": created, "archived": archived, "duration_ms": duration_ms}
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        # Session-level lock: must be released explicitly before the connection goes back to the pool
+        advisory_unlock(conn, AUDIT_PARTITION_JOB_LOCK_KEY)
+        conn.commit()
@@ -1,9 +1,105 @@
+import threading
+from datetime import datetime
+from psycopg2.extras import execute_values
+from app.config import Config
+from app.models.audit_queries import list_audit_logs
+from app.services.audit_buffer import AuditBuffer
+from app.utils.pagination import encode_cursor, decode_cursor
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_audit_buffer():
+    """Process-wide audit buffer, started on first use (buffered mode only)."""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = AuditBuffer(
+                    batch_size=Config.AUDIT_BATCH_SIZE,
+                    flush_interval=Config.AUDIT_FLUSH_INTERVAL,
+                    max_pending=Config.AUDIT_MAX_PENDING,
+                    synchronous_commit=Config.AUDIT_DURABILITY == "sync",
+                )
+                _buffer.start()
+    return _buffer
+
+
+def get_audit_buffer_stats():
+    return _buffer.stats() if _buffer is not None else None
+
+
+def _is_buffered(table_name):
+    return (
+        Config.AUDIT_SINK_MODE == "buffered"
+        and (table_name or "").upper() not in Config.AUDIT_TRANSACTIONAL_ENTITIES
+    )
+
+
 def log_action(conn, user_id, action, table_name=None, record_id=None, description=None):
     """
     Insert audit log entry.
+    In "buffered" sink mode the entry is queued and written asynchronously in
+    batches (even if the caller later rolls back); entity types listed in
+    AUDIT_TRANSACTIONAL_ENTITIES are always written in the caller's transaction.
     """
+    if _is_buffered(table_name):
+        get_audit_buffer().add((user_id, action, table_name, record_id, description, datetime.utcnow()))
+        return
+
     with conn.cursor() as cur:
         cur.execute("""
             INSERT INTO audit_logs (user_id, action, entity_type, entity_id, description)
             VALUES (%s, %s, %s, %s, %s)
         """, (user_id, action, table_name, record_id, description))
+
+
+def log_actions(conn, user_id, action, table_name, entries):
+    """
+    Bulk variant of log_action for batch operations: one multi-row INSERT for
+    entries of (record_id, description), all with the same user, action and table.
+    """
+    if not entries:
+        return
+    if _is_buffered(table_name):
+        buffer = get_audit_buffer()
+        now = datetime.utcnow()
+        for record_id, description in entries:
+            buffer.add((user_id, action, table_name, record_id, description, now))
+        return
+
+    with conn.cursor() as cur:
+        execute_values(cur, """
+            INSERT INTO audit_logs (user_id, action, entity_type, entity_id, description)
+            VALUES %s
+        """, [(user_id, action, table_name, record_id, description) for record_id, description in entries],
+            page_size=500)
+
+
+def get_audit_logs(conn, limit=20, offset=0):
+    """Legacy OFFSET listing (GET /admin/audit?page=), newest first. The offset is applied in SQL."""
+    return list_audit_logs(conn, limit, offset=offset)
+
+
+def fetch_audit_logs_page(conn, limit, cursor=None, **filters):
+    """
+    One keyset page of audit logs, newest first.
+    Filters: user_id, action, entity_type, entity_id, since, until.
+    Returns {"items": [...], "next_cursor": token or None}.
+    """
+    before = None
+    if cursor:
+        created_at, audit_id = decode_cursor(cursor, size=2)
+        try:
+            before = (datetime.fromisoformat(created_at), int(audit_id))
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+
+    rows = list_audit_logs(conn, limit + 1, before, **filters)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last["created_at"].isoformat(), last["audit_id"])
+    return {"items": rows, "next_cursor": next_cursor}
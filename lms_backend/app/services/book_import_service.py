@@ -0,0 +1,78 @@
+import csv
+import io
+from app.config import Config
+from app.models.book_queries import bulk_import_books, BOOK_IMPORT_COLUMNS
+from app.services.audit_service import log_action
+from app.services.stats_service import invalidate_admin_stats
+from app.utils.import_formats import read_records
+
+ON_CONFLICT_POLICIES = ("skip", "update")
+
+
+def _stage(records, errors):
+    """
+    Write parsed records as CSV for COPY; lines that could not be parsed go
+    straight to the error report. Returns (buffer, total_rows).
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    total = 0
+    for line_no, record, parse_error in records:
+        total += 1
+        if total > Config.BOOK_IMPORT_MAX_ROWS:
+            raise ValueError(f"Too many rows (limit {Config.BOOK_IMPORT_MAX_ROWS})")
+        if parse_error:
+            errors.append({"line": line_no, "isbn": None, "errors": {"_row": [parse_error]}})
+            continue
+        writer.writerow([line_no] + ["" if record.get(c) is None else str(record[c]) for c in BOOK_IMPORT_COLUMNS])
+    buffer.seek(0)
+    return buffer, total
+
+
+def import_books(conn, raw, fmt, admin_id, on_conflict="skip", source=None):
+    """
+    Bulk-load catalog rows (title, author, category, isbn, total_copies,
+    available_copies) from a CSV/NDJSON file.
+
+    Rows are staged with COPY and validated and upserted on ISBN in SQL:
+    on_conflict="skip" leaves existing ISBNs alone, "update" overwrites their
+    details and total copies (keeping copies on loan). One summary audit entry
+    is written. Returns counts plus a per-line error report.
+    """
+    if on_conflict not in ON_CONFLICT_POLICIES:
+        raise ValueError(f"on_conflict must be one of: {', '.join(ON_CONFLICT_POLICIES)}")
+
+    parse_errors = []
+    buffer, total = _stage(read_records(raw, fmt), parse_errors)
+    if not total:
+        raise ValueError("No rows found in upload")
+
+    try:
+        result = bulk_import_books(conn, buffer, on_conflict, max_errors=Config.BOOK_IMPORT_MAX_ERRORS)
+        log_action(
+            conn, admin_id,
+            action="Books Imported",
+            table_name="BOOK",
+            description=(
+                f"Bulk import{f' of {source}' if source else ''} ({on_conflict} existing ISBNs): "
+                f"{result['created']} created, {result['updated']} updated, {result['skipped']} skipped, "
+                f"{result['failed'] + len(parse_errors)} rejected, {total} rows"
+            ),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    if result["created"] or result["updated"]:
+        invalidate_admin_stats()
+
+    errors = sorted(parse_errors + result["errors"], key=lambda e: e["line"])
+    return {
+        "total_rows": total,
+        "created": result["created"],
+        "updated": result["updated"],
+        "skipped": result["skipped"],
+        "failed": result["failed"] + len(parse_errors),
+        "errors": errors[:Config.BOOK_IMPORT_MAX_ERRORS],
+    }
@@ -5,8 +5,18 @@ from app.models.book_queries import (
     update_book_copies,
     update_book,
     soft_delete_book,
-    get_all_books
+    get_all_books,
+    list_books,
+    search_books,
+    get_book_row_version,
+    get_catalog_version,
+    BOOK_COLUMNS,
 )
+from app.services.stats_service import invalidate_admin_stats
+from app.utils.http_cache import make_etag, args_digest
+from app.utils.pagination import encode_cursor, decode_cursor
+
+MAX_PAGE_SIZE = 200
 
 def add_book(conn, title, author, isbn, total_copies, category=None, available_copies=None):
     try:
@@ -29,6 +39,7 @@ def add_book(conn, title, author, isbn, total_copies, category=None, available_c
 
         book_id = create_book(conn, title, author, isbn, total_copies, category, available_copies)
         conn.commit()
+        invalidate_admin_stats()
         return book_id
 
     except Exception:
@@ -47,6 +58,60 @@ def fetch_all_books(conn):
     return get_all_books(conn)
 
 
+def fetch_books_page(conn, limit, cursor=None, category=None, author=None, available=None, fields=None):
+    """
+    One keyset page of the catalog.
+    Returns {"items": [...], "next_cursor": token or None}.
+    """
+    if fields:
+        unknown = [f for f in fields if f not in BOOK_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    after_id = None
+    if cursor:
+        try:
+            after_id = int(decode_cursor(cursor)[0])
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+
+    # Fetch one extra row to know whether another page exists
+    rows = list_books(conn, limit + 1, after_id, category, author, available, fields)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["book_id"])
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+def catalog_etag(conn, args):
+    """
+    ETag of a GET /books response: the catalog-wide change counter plus the query
+    it answers. Read from library_counters, so a revalidation never touches books.
+    """
+    return make_etag("books", get_catalog_version(conn), args_digest(args))
+
+
+def book_etag(conn, book_id):
+    """ETag of GET /books/<id> from the book's row_version, or None if there is no such book."""
+    row_version = get_book_row_version(conn, book_id)
+    if row_version is None:
+        return None
+    return make_etag("book", book_id, row_version)
+
+
+def search_catalog(conn, q, page=1, limit=20):
+    """Ranked catalog search. Returns {"items", "page", "limit", "has_more"}."""
+    q = (q or "").strip()
+    if not q:
+        raise ValueError("Search query 'q' is required")
+    if page < 1:
+        raise ValueError("page must be at least 1")
+    offset = (page - 1) * limit
+    rows = search_books(conn, q, limit + 1, offset)
+    has_more = len(rows) > limit
+    return {"items": rows[:limit], "page": page, "limit": limit, "has_more": has_more}
+
+
 def change_book_copies(conn, book_id, new_available_copies):
     try:
         book = get_book_by_id(conn, book_id)
@@ -60,6 +125,7 @@ def change_book_copies(conn, book_id, new_available_copies):
 
         update_book_copies(conn, book_id, new_available_copies)
         conn.commit()
+        invalidate_admin_stats()
 
     except Exception:
         conn.rollback()
@@ -87,6 +153,7 @@ def update_book_details(conn, book_id, title=None, author=None, category=None, i
     try:
         update_book(conn, book_id, title, author, category, isbn, total_copies, available_copies)
         conn.commit()
+        invalidate_admin_stats()
     except Exception:
         conn.rollback()
         raise
@@ -102,6 +169,7 @@ def remove_book(conn, book_id):
     try:
         soft_delete_book(conn, book_id)
         conn.commit()
+        invalidate_admin_stats()
     except Exception:
         conn.rollback()
         raise
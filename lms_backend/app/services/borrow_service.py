@@ -1,32 +1,39 @@
 # app/services/borrow_service.py
 
 from datetime import datetime, timedelta
-from app.models.book_queries import get_book_by_id, update_book_copies
+from app.models.book_queries import get_book_by_id, decrement_available_copies
 from app.models.borrow_queries import (
-    create_borrow,
+    issue_book_atomic,
+    return_book_atomic,
     create_borrow_request,
     get_active_borrow,
     get_pending_borrow,
     get_borrow_by_id,
     get_pending_borrows,
-    return_book_record,
     update_borrow_to_issued,
     reject_borrow_record,
+    lock_borrows,
+    approve_pending_borrows,
+    reject_pending_borrows,
+    issue_books_batch,
+    return_books_batch,
+    list_borrows,
+    iter_borrows,
+    BORROW_LISTING_COLUMNS,
 )
-from app.models.reservation_queries import (
-    expire_overdue_reservations,
-    get_oldest_active_reservation,
-    mark_reservation_fulfilled
-)
-from app.services.fine_service import calculate_fine, create_fine
-from app.services.audit_service import log_action
+from app.services.fine_service import FINE_PER_DAY
+from app.services.audit_service import log_action, log_actions
+from app.services.stats_service import invalidate_admin_stats
+from app.services.export_service import encode_rows
+from app.utils.pagination import encode_cursor, decode_cursor
+
+BORROW_STATUSES = ("PENDING", "ACTIVE", "OVERDUE", "RETURNED", "REJECTED")
 
 # =====================================================
 # REQUEST BORROW (student/teacher → PENDING)
 # =====================================================
 def request_borrow(conn, user_id, book_id):
     """Create a PENDING borrow request. Admin approves later."""
-    expire_overdue_reservations(conn)
     book_id = int(book_id)
     book = get_book_by_id(conn, book_id)
     if not book:
@@ -63,21 +70,26 @@ def approve_borrow(conn, borrow_id, admin_id=None):
         raise ValueError("Only pending requests can be approved")
     book_id = borrow["book_id"]
     user_id = borrow["user_id"]
-    book = get_book_by_id(conn, book_id)
-    if not book or book["available_copies"] < 1:
-        raise ValueError("Book no longer available")
     due_date = datetime.utcnow() + timedelta(days=7)
-    update_borrow_to_issued(conn, borrow_id, due_date)
-    update_book_copies(conn, book_id, book["available_copies"] - 1)
-    log_action(
-        conn, admin_id or user_id,
-        action="Borrow Approved",
-        table_name="BORROW",
-        record_id=borrow_id,
-        description=f"Borrow {borrow_id} approved for book {book_id}",
-    )
-    conn.commit()
-    return borrow_id
+    try:
+        # Conditional updates: a concurrent approval or issue of the last copy makes these no-ops
+        if not update_borrow_to_issued(conn, borrow_id, due_date):
+            raise ValueError("Only pending requests can be approved")
+        if decrement_available_copies(conn, book_id) is None:
+            raise ValueError("Book no longer available")
+        log_action(
+            conn, admin_id or user_id,
+            action="Borrow Approved",
+            table_name="BORROW",
+            record_id=borrow_id,
+            description=f"Borrow {borrow_id} approved for book {book_id}",
+        )
+        conn.commit()
+        invalidate_admin_stats()
+        return borrow_id
+    except Exception:
+        conn.rollback()
+        raise
 
 
 def reject_borrow(conn, borrow_id, admin_id=None):
@@ -99,60 +111,95 @@ def reject_borrow(conn, borrow_id, admin_id=None):
     return borrow_id
 
 
+# =====================================================
+# BATCH APPROVE / REJECT (admin)
+# =====================================================
+def approve_borrows(conn, borrow_ids, admin_id):
+    """
+    Batch approve_borrow in one transaction with set-based updates.
+    Returns {borrow_id: outcome}: approved, not_found, not_pending,
+    already_borrowed or unavailable (no copy left for this request).
+    """
+    due_date = datetime.utcnow() + timedelta(days=7)
+    try:
+        locked = lock_borrows(conn, borrow_ids)
+        rows = approve_pending_borrows(conn, borrow_ids, due_date) if locked else []
+        outcomes = {borrow_id: _batch_precheck(locked.get(borrow_id)) for borrow_id in borrow_ids}
+        for row in rows:
+            outcomes[row["borrow_id"]] = row["outcome"]
+        log_actions(
+            conn, admin_id,
+            action="Borrow Approved",
+            table_name="BORROW",
+            entries=[(row["borrow_id"], f"Borrow {row['borrow_id']} approved for book {row['book_id']} (batch)")
+                     for row in rows if row["outcome"] == "approved"],
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if any(outcome == "approved" for outcome in outcomes.values()):
+        invalidate_admin_stats()
+    return outcomes
+
+
+def reject_borrows(conn, borrow_ids, admin_id):
+    """Batch reject_borrow. Returns {borrow_id: rejected | not_found | not_pending}."""
+    try:
+        locked = lock_borrows(conn, borrow_ids)
+        rejected = reject_pending_borrows(conn, borrow_ids) if locked else {}
+        log_actions(
+            conn, admin_id,
+            action="Borrow Rejected",
+            table_name="BORROW",
+            entries=[(borrow_id, f"Borrow request {borrow_id} rejected (batch)") for borrow_id in rejected],
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return {
+        borrow_id: "rejected" if borrow_id in rejected else _batch_precheck(locked.get(borrow_id))
+        for borrow_id in borrow_ids
+    }
+
+
+def _batch_precheck(borrow):
+    if borrow is None:
+        return "not_found"
+    if borrow["borrow_status"] != "PENDING":
+        return "not_pending"
+    return "unavailable"
+
+
 # =====================================================
 # ISSUE BOOK (direct issue – admin/teacher or after approval)
 # =====================================================
 def issue_book(conn, user_id, book_id):
     """
-    Issues a book to a user.
-    Checks available copies, prevents double borrowing,
-    and expires overdue reservations.
+    Issues a book to a user in a single database round trip.
+    lms_issue_book() takes a copy, prevents double borrowing and writes the
+    audit row. Lapsed reservations are expired by the scheduled sweeper.
     """
     print("issue_book called with:", user_id, book_id)
 
-    # 0️⃣ Expire overdue reservations before issuing
-    expire_overdue_reservations(conn)
-
     # Validate book_id
     try:
         book_id = int(book_id)
     except ValueError:
         raise ValueError("Invalid book_id")
 
-    # Check book exists
-    book = get_book_by_id(conn, book_id)
-    if not book:
-        raise ValueError("Book not found")
-    if book['available_copies'] <= 0:
-        raise ValueError("Book not available")
-
-    # Check if user already borrowed this book
-    existing = get_active_borrow(conn, user_id, book_id)
-    if existing:
-        raise ValueError("User already borrowed this book")
-
     # Calculate due date
     due_date = datetime.utcnow() + timedelta(days=7)
 
     try:
-        # Reduce available copies
-        update_book_copies(conn, book_id, book['available_copies'] - 1)
-
-        # Create borrow record
-        borrow_id = create_borrow(conn, user_id, book_id, due_date)
+        borrow_id = issue_book_atomic(conn, user_id, book_id, due_date)
         if not borrow_id:
             raise Exception("Failed to issue book")
 
-        log_action(
-            conn, user_id,
-            action="Borrow Approved",
-            table_name="BORROW",
-            record_id=borrow_id,
-            description=f"Book {book_id} issued to user {user_id}"
-        )
-
         # Commit transaction
         conn.commit()
+        invalidate_admin_stats()
         print("Book issued successfully, borrow_id:", borrow_id)
         return borrow_id
 
@@ -166,13 +213,10 @@ def issue_book(conn, user_id, book_id):
 # =====================================================
 def return_borrowed_book(conn, user_id, book_id):
     """
-    Returns a borrowed book:
-    - Calculates fine
-    - Updates borrow record
-    - Updates stock
-    - Creates fine record if needed
-    - Checks reservations and auto-assigns
-    - Logs audit
+    Returns a borrowed book in a single database round trip.
+    lms_return_book() calculates the fine, updates the borrow record and stock,
+    creates the fine record if needed, auto-assigns the oldest reservation
+    and logs audit rows.
     """
     print("return_borrowed_book called with:", user_id, book_id)
 
@@ -181,78 +225,20 @@ def return_borrowed_book(conn, user_id, book_id):
     except ValueError:
         raise ValueError("Invalid book_id")
 
-    # Find active borrow
-    active = get_active_borrow(conn, user_id, book_id)
-    if not active:
-        raise ValueError("No active borrow found for this book")
-
-    borrow_id = active["borrow_id"]
-    due_date = active["due_date"]
     return_date = datetime.utcnow()
 
     try:
-        # 1️ Calculate fine
-        fine_amount = calculate_fine(due_date, return_date)
-
-        # 2️ Mark borrow as returned
-        return_book_record(conn, borrow_id)
-
-        # 3️ Increase available copies
-        book = get_book_by_id(conn, book_id)
-        if book:
-            update_book_copies(
-                conn,
-                book_id,
-                book["available_copies"] + 1
-            )
-
-        fine_id = None
-
-        # 4️ Create fine if late
-        if fine_amount > 0:
-            fine_id = create_fine(conn, borrow_id, user_id, fine_amount)
-            log_action(
-                conn, user_id,
-                action="Fine Generated",
-                table_name="FINE",
-                record_id=fine_id,
-                description=f"Fine {fine_id} generated for borrow {borrow_id}, amount Rs {fine_amount}",
-            )
-
-        # 5️ CHECK RESERVATION QUEUE: create PENDING borrow for reserved user (admin approves later)
-        reservation = get_oldest_active_reservation(conn, book_id)
-        auto_assigned_borrow_id = None
-
-        if reservation:
-            reserved_user_id = reservation["user_id"]
-            # Create PENDING borrow request (no copy decrement – admin will approve)
-            auto_assigned_borrow_id = create_borrow_request(conn, reserved_user_id, book_id)
-            mark_reservation_fulfilled(conn, reservation["reservation_id"])
-            log_action(
-                conn, reserved_user_id,
-                action="Reservation Fulfilled",
-                table_name="RESERVATION",
-                record_id=reservation["reservation_id"],
-                description=f"Book {book_id} – reservation fulfilled, borrow request created for admin approval",
-            )
-
-        # 6️ Audit return
-        log_action(
-            conn, user_id,
-            action="Book Returned",
-            table_name="BORROW",
-            record_id=borrow_id,
-            description=f"Book {book_id} returned by user {user_id}"
-        )
+        result = return_book_atomic(conn, user_id, book_id, return_date, FINE_PER_DAY)
 
         # Commit all
         conn.commit()
+        invalidate_admin_stats()
 
         return {
             "message": "Book returned successfully",
-            "fine_amount": fine_amount,
-            "fine_id": fine_id,
-            "auto_assigned_borrow_id": auto_assigned_borrow_id
+            "fine_amount": result["fine_amount"],
+            "fine_id": result["fine_id"],
+            "auto_assigned_borrow_id": result["auto_assigned_borrow_id"]
         }
 
     except Exception as e:
@@ -260,6 +246,46 @@ def return_borrowed_book(conn, user_id, book_id):
         raise e
 
 
+# =====================================================
+# CART: ISSUE / RETURN SEVERAL BOOKS (one transaction)
+# =====================================================
+def issue_books(conn, user_id, book_ids):
+    """
+    Issue several books to one user in one statement and one commit.
+    Books that cannot be issued are reported, not raised: returns
+    {book_id: {"outcome", "borrow_id"}} with outcome issued / not_found /
+    already_borrowed / unavailable.
+    """
+    due_date = datetime.utcnow() + timedelta(days=7)
+    try:
+        rows = issue_books_batch(conn, user_id, book_ids, due_date)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if any(row["outcome"] == "issued" for row in rows):
+        invalidate_admin_stats()
+    return {row["book_id"]: {"outcome": row["outcome"], "borrow_id": row["borrow_id"]} for row in rows}
+
+
+def return_books(conn, user_id, book_ids):
+    """
+    Return several books of one user in one statement and one commit, with the
+    same fines and reservation hand-off as return_borrowed_book. Returns
+    {book_id: {"outcome", "borrow_id", "fine_amount", "fine_id", "auto_assigned_borrow_id"}}
+    with outcome returned / not_borrowed.
+    """
+    try:
+        rows = return_books_batch(conn, user_id, book_ids, datetime.utcnow(), FINE_PER_DAY)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if any(row["outcome"] == "returned" for row in rows):
+        invalidate_admin_stats()
+    return {row["book_id"]: {key: value for key, value in row.items() if key != "book_id"} for row in rows}
+
+
 # =====================================================
 # ADMIN: ISSUE BOOK TO ANY USER
 # =====================================================
@@ -281,3 +307,52 @@ def admin_return_by_borrow_id(conn, borrow_id):
     user_id = borrow["user_id"]
     book_id = borrow["book_id"]
     return return_borrowed_book(conn, user_id, book_id)
+
+
+# =====================================================
+# ADMIN: BORROW LISTING (keyset pages / streamed export)
+# =====================================================
+def _check_listing_filters(filters):
+    status = filters.get("status")
+    if status is not None and status not in BORROW_STATUSES:
+        raise ValueError(f"status must be one of: {', '.join(BORROW_STATUSES)}")
+
+
+def fetch_borrows_page(conn, limit, cursor=None, **filters):
+    """
+    One keyset page of the admin borrow listing, newest first.
+    Returns {"items": [...], "next_cursor": token or None}.
+    """
+    _check_listing_filters(filters)
+    before_id = None
+    if cursor:
+        try:
+            before_id = int(decode_cursor(cursor)[0])
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+
+    # Fetch one extra row to know whether another page exists
+    rows = list_borrows(conn, limit + 1, before_id, **filters)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["borrow_id"])
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+def export_borrows(conn, fmt, chunk_size=1000, **filters):
+    """
+    The whole filtered listing as chunks of JSON or CSV text, read through a
+    server-side cursor. Validates up front; the query runs as the chunks are consumed.
+    """
+    _check_listing_filters(filters)
+    chunks = encode_rows(iter_borrows(conn, chunk_size, **filters), fmt, BORROW_LISTING_COLUMNS)
+
+    def stream():
+        try:
+            yield from chunks
+        finally:
+            # Read-only: closes the named cursor's transaction
+            conn.rollback()
+
+    return stream()
@@ -0,0 +1,43 @@
+from app.models.stats_queries import (
+    ADMIN_COUNTERS,
+    get_library_counters,
+    compute_library_counters,
+    lock_library_counters,
+    reset_library_counter,
+)
+from app.services.stats_service import invalidate_admin_stats
+
+
+def reconcile_counters(conn, fix=False):
+    """
+    Recompute library_counters from the base tables and report drift as
+    {counter_name: {"stored", "actual", "drift"}}. With fix=True, drifted
+    counters are overwritten with the recomputed values. Counter triggers are
+    blocked while this runs so no concurrent change is lost or counted twice.
+    """
+    try:
+        lock_library_counters(conn)
+        stored = get_library_counters(conn)
+        actual = compute_library_counters(conn)
+
+        report = {}
+        for name in ADMIN_COUNTERS:
+            stored_value = stored.get(name, 0)
+            actual_value = actual.get(name, 0)
+            report[name] = {
+                "stored": stored_value,
+                "actual": actual_value,
+                "drift": stored_value - actual_value,
+            }
+            if fix and stored_value != actual_value:
+                reset_library_counter(conn, name, actual_value)
+
+        if fix:
+            conn.commit()
+            invalidate_admin_stats()
+        else:
+            conn.rollback()
+        return report
+    except Exception:
+        conn.rollback()
+        raise
@@ -0,0 +1,299 @@
+import csv
+import io
+import json
+import queue
+import threading
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from app.config import Config
+from app.models.db import get_pool
+from app.models.export_queries import build_export_select, copy_csv_to, iter_json_lines
+
+EXPORT_FORMATS = ("json", "csv")
+CONTENT_TYPES = {"json": "application/json", "csv": "text/csv"}
+
+# Rows encoded per chunk handed to the WSGI server
+CHUNK_ROWS = 500
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, memoryview):
+        return value.hex()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def iter_json_array(rows, chunk_rows=CHUNK_ROWS):
+    """Encode rows as one JSON array, yielded in chunks of chunk_rows rows."""
+    yield "["
+    buffer = []
+    first = True
+    for row in rows:
+        buffer.append(("" if first else ",") + json.dumps(row, default=_json_default, separators=(",", ":")))
+        first = False
+        if len(buffer) >= chunk_rows:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+    yield "]"
+
+
+def iter_csv(rows, columns, chunk_rows=CHUNK_ROWS):
+    """Encode rows as CSV with a header line, yielded in chunks of chunk_rows rows."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow([_csv_value(row[c]) for c in columns])
+        count += 1
+        if count % chunk_rows == 0:
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+    yield out.getvalue()
+
+
+def _csv_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return "" if value is None else value
+
+
+def encode_rows(rows, fmt, columns):
+    """Chunked text encoding of rows in fmt (json or csv)."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if fmt == "csv":
+        return iter_csv(rows, columns)
+    return iter_json_array(rows)
+
+
+# =========================
+# DATASET EXPORTS (/export/<dataset>)
+# =========================
+DATASET_FORMATS = ("csv", "ndjson")
+DATASET_CONTENT_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# Bytes gathered from COPY before a chunk is handed to the response
+COPY_CHUNK_BYTES = 64 * 1024
+
+_DONE = object()
+
+
+class ExportBusyError(RuntimeError):
+    """Raised when EXPORT_MAX_CONCURRENT exports are already streaming."""
+
+    def __init__(self, message, retry_after=5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _ExportCancelled(Exception):
+    pass
+
+
+_slots = None
+_slots_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"started": 0, "completed": 0, "failed": 0, "rejected": 0, "bytes_sent": 0, "active": 0}
+
+
+def _get_slots():
+    global _slots
+    if _slots is None:
+        with _slots_lock:
+            if _slots is None:
+                _slots = threading.BoundedSemaphore(Config.EXPORT_MAX_CONCURRENT)
+    return _slots
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+class ExportStream:
+    """
+    Response body of one export. Iterating yields bytes; close() (called by the
+    WSGI server when the response ends or the client goes away) stops the
+    export and frees its slot, even if iteration never started.
+    """
+
+    def __init__(self, chunks, release):
+        self._chunks = chunks
+        self._release = release
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self.close()
+            raise
+        except Exception:
+            _count("failed")
+            self.close()
+            raise
+        _count("bytes_sent", len(chunk))
+        return chunk
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._chunks.close()
+        finally:
+            self._release()
+
+
+def start_export(dataset, fmt="csv", columns=None, since=None, until=None, compress=False):
+    """
+    Validate an export and reserve one of EXPORT_MAX_CONCURRENT slots.
+    Returns an ExportStream that runs the query on its own pooled connection
+    (not the request's) as it is iterated. Raises ValueError for bad parameters
+    and ExportBusyError when all slots are taken.
+    """
+    if fmt not in DATASET_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(DATASET_FORMATS)}")
+    sql, params = build_export_select(dataset, columns, since, until)
+
+    slots = _get_slots()
+    if not slots.acquire(blocking=False):
+        _count("rejected")
+        raise ExportBusyError("Too many exports running, please retry shortly")
+    _count("started")
+    _count("active")
+
+    def release():
+        _count("active", -1)
+        slots.release()
+
+    chunks = _run_export(sql, params, fmt)
+    if compress:
+        chunks = gzip_chunks(chunks, Config.EXPORT_GZIP_LEVEL)
+    return ExportStream(chunks, release)
+
+
+def _run_export(sql, params, fmt):
+    pool = get_pool()
+    conn = pool.getconn()
+    discard = True
+    try:
+        if fmt == "csv":
+            yield from _iter_copy(conn, sql, params)
+        else:
+            for lines in iter_json_lines(conn, sql, params, Config.EXPORT_FETCH_SIZE):
+                yield ("\n".join(lines) + "\n").encode()
+        _count("completed")
+        discard = False
+    finally:
+        # An export cut short may leave COPY or the cursor mid-stream: do not reuse that connection
+        pool.putconn(conn, close=discard)
+
+
+class _QueueWriter:
+    """File-like target for COPY: batches rows into chunks on a bounded queue."""
+
+    def __init__(self, chunks, cancelled):
+        self._chunks = chunks
+        self._cancelled = cancelled
+        self._buffer = bytearray()
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        self._buffer += data
+        if len(self._buffer) >= COPY_CHUNK_BYTES:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        chunk = bytes(self._buffer)
+        self._buffer.clear()
+        self.put(chunk)
+
+    def put(self, item):
+        # Blocks while the client is slower than the database (backpressure), until cancelled
+        while True:
+            if self._cancelled.is_set():
+                raise _ExportCancelled()
+            try:
+                self._chunks.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+
+def _iter_copy(conn, sql, params):
+    """Run COPY TO STDOUT on a helper thread and yield its output as it arrives."""
+    chunks = queue.Queue(maxsize=Config.EXPORT_QUEUE_CHUNKS)
+    cancelled = threading.Event()
+    writer = _QueueWriter(chunks, cancelled)
+
+    def produce():
+        try:
+            copy_csv_to(conn, sql, params, writer)
+            writer.flush()
+            writer.put(_DONE)
+        except _ExportCancelled:
+            pass
+        except Exception as e:
+            try:
+                writer.put(e)
+            except _ExportCancelled:
+                pass
+
+    thread = threading.Thread(target=produce, name="export-copy", daemon=True)
+    thread.start()
+    finished = False
+    try:
+        while True:
+            item = chunks.get()
+            if item is _DONE:
+                finished = True
+                return
+            if isinstance(item, Exception):
+                finished = True
+                raise item
+            yield item
+    finally:
+        cancelled.set()
+        if not finished:
+            # Client went away: the COPY may still be running on the server
+            try:
+                conn.cancel()
+            except Exception:
+                pass
+        thread.join()
+
+
+def gzip_chunks(chunks, level=6):
+    """Gzip-compress a stream of byte chunks without buffering the whole body."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    try:
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        # Closing this stream must also close (and clean up) the one it wraps
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def get_export_stats():
+    with _stats_lock:
+        return {"max_concurrent": Config.EXPORT_MAX_CONCURRENT, **_stats}
@@ -7,6 +7,7 @@ from app.models.fine_queries import (
     get_all_fines
 )
 from app.services.audit_service import log_action
+from app.services.stats_service import invalidate_admin_stats
 
 FINE_PER_DAY = 5
 
@@ -48,6 +49,7 @@ def pay_fine(conn, fine_id, admin_id):
     )
 
     conn.commit()
+    invalidate_admin_stats()
     return True
 
 
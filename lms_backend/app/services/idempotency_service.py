@@ -0,0 +1,80 @@
+import hashlib
+from app.models.idempotency_queries import (
+    claim_idempotency_key,
+    get_idempotency_record,
+    save_idempotent_response,
+    purge_expired_idempotency_keys,
+)
+
+MAX_KEY_LENGTH = 255
+
+
+def key_digest(key):
+    return hashlib.sha256(key.encode()).digest()
+
+
+def request_fingerprint(method, path, body):
+    """16-byte digest of the request, to refuse a key reused for a different request."""
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), body or b""):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.digest()[:16]
+
+
+def begin_idempotent_request(conn, user_id, key_hash, fingerprint, ttl, grace):
+    """
+    Claim the key inside the caller's transaction, so the claim commits or rolls
+    back together with the work it protects. Returns (state, record):
+
+      ("new", None)          this request owns the key; run it, then finish_idempotent_request
+      ("replay", record)     a previous request finished; record has status_code and response_body
+      ("mismatch", None)     the key was used for a different request
+      ("in_progress", None)  the first request has committed but not stored its response yet
+      ("processed", None)    the first request committed but its response was never stored
+                             (still missing `grace` seconds after the claim); it is not run again
+
+    A claim is only visible once the write it protects has committed, so a
+    claim without a response always stands for work that is already done.
+    """
+    if claim_idempotency_key(conn, user_id, key_hash, fingerprint, ttl):
+        return "new", None
+    record = get_idempotency_record(conn, user_id, key_hash, grace)
+    # Nothing to hold on to until the route runs or the replay is sent
+    conn.rollback()
+    if record is None:
+        # Expired between the claim and the read; the client can simply retry
+        return "in_progress", None
+    if bytes(record["request_hash"]) != fingerprint:
+        return "mismatch", None
+    if record["status_code"] is None:
+        return ("processed" if record["response_lost"] else "in_progress"), None
+    return "replay", record
+
+
+def finish_idempotent_request(conn, user_id, key_hash, status_code, body):
+    """Store the response of a request begun with begin_idempotent_request."""
+    try:
+        save_idempotent_response(conn, user_id, key_hash, status_code, body)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def purge_idempotency_keys(conn, batch_size=1000, max_batches=None):
+    """Delete expired idempotency keys in bounded batches. Returns the number deleted."""
+    total = 0
+    batches = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            deleted = purge_expired_idempotency_keys(conn, batch_size)
+            conn.commit()
+            total += deleted
+            batches += 1
+            if deleted < batch_size:
+                break
+    except Exception:
+        conn.rollback()
+        raise
+    return total
@@ -1,9 +1,66 @@
-def mark_overdue_borrows(conn):
+import os
+import socket
+import time
+from datetime import datetime
+from app.models.job_queries import (
+    OVERDUE_JOB_LOCK_KEY,
+    try_advisory_lock,
+    advisory_unlock,
+    record_job_run,
+)
+
+NODE_NAME = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _mark_overdue_chunk(conn, chunk_size):
     with conn.cursor() as cur:
         cur.execute("""
             UPDATE borrows
             SET borrow_status = 'OVERDUE'
-            WHERE borrow_status = 'ACTIVE'
-              AND due_date < NOW()
-        """)
-    conn.commit()
+            WHERE borrow_id IN (
+                SELECT borrow_id
+                FROM borrows
+                WHERE borrow_status = 'ACTIVE'
+                  AND due_date < NOW()
+                ORDER BY due_date
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+        """, (chunk_size,))
+        return cur.rowcount
+
+
+def mark_overdue_borrows(conn, chunk_size=1000, max_chunks=None):
+    """
+    Mark ACTIVE borrows past their due date as OVERDUE, chunk_size rows per
+    transaction. Guarded by an advisory lock so only one node runs it at a time;
+    other nodes return {"skipped": True}. Each completed run is recorded in job_runs.
+    """
+    if not try_advisory_lock(conn, OVERDUE_JOB_LOCK_KEY):
+        conn.rollback()
+        return {"skipped": True, "reason": "already running on another node"}
+
+    started_at = datetime.utcnow()
+    started = time.monotonic()
+    updated = 0
+    chunks = 0
+    try:
+        while max_chunks is None or chunks < max_chunks:
+            changed = _mark_overdue_chunk(conn, chunk_size)
+            conn.commit()
+            updated += changed
+            chunks += 1
+            if changed < chunk_size:
+                break
+
+        duration_ms = int((time.monotonic() - started) * 1000)
+        record_job_run(conn, "mark_overdue", NODE_NAME, started_at, duration_ms, updated)
+        conn.commit()
+        return {"updated": updated, "chunks": chunks, "duration_ms": duration_ms}
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        # Session-level lock: must be released explicitly before the connection goes back to the pool
+        advisory_unlock(conn, OVERDUE_JOB_LOCK_KEY)
+        conn.commit()
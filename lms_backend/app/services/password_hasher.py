@@ -0,0 +1,218 @@
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from werkzeug.security import generate_password_hash, check_password_hash
+from app.config import Config
+
+
+class HashingBusyError(RuntimeError):
+    """Raised when the hashing queue is full or a hash does not finish in time."""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# Module-level so they can be pickled into the worker processes
+def _hash(password, method, salt_length):
+    return generate_password_hash(password, method=method, salt_length=salt_length)
+
+
+def _check(pwhash, password):
+    return check_password_hash(pwhash, password)
+
+
+def _hash_batch(passwords, method, salt_length):
+    return [generate_password_hash(p, method=method, salt_length=salt_length) for p in passwords]
+
+
+class PasswordHasher:
+    """
+    Runs password hashing on a bounded process pool so CPU-heavy hashes do not
+    block request threads.
+
+    - at most `workers` hashes run at once; up to `max_queue` more may wait
+    - beyond that, calls fail fast with HashingBusyError instead of queueing
+    - a hash that has not finished after `timeout` seconds also raises HashingBusyError
+    - workers=0 hashes inline in the calling thread (tests, single-process deployments);
+      a pool that cannot be started (no /dev/shm on serverless hosts) falls back to that
+    """
+
+    def __init__(self, workers=2, max_queue=32, timeout=10, method="scrypt", salt_length=16):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.method = method
+        self.salt_length = salt_length
+
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._import_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers + max_queue) if workers else None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._latencies_ms = deque(maxlen=1000)
+        self._stats = {"hashes": 0, "verifications": 0, "rejected": 0, "timeouts": 0}
+
+    def hash(self, password):
+        self._count("hashes")
+        return self._run(_hash, password, self.method, self.salt_length)
+
+    def verify(self, pwhash, password):
+        self._count("verifications")
+        return self._run(_check, pwhash, password)
+
+    def hash_many(self, passwords, workers, chunk_size=64):
+        """
+        Hash a batch (bulk imports) on a separate, short-lived pool of `workers`
+        processes so a large import does not queue ahead of interactive logins.
+        Imports are serialized: a second one waits here, so at most `workers`
+        import processes run next to the login pool. Returns hashes in input order.
+        """
+        passwords = list(passwords)
+        chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+        with self._import_lock:
+            started = time.perf_counter()
+            if not workers or len(chunks) <= 1:
+                hashes = [h for chunk in chunks for h in _hash_batch(chunk, self.method, self.salt_length)]
+            else:
+                with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                                         mp_context=multiprocessing.get_context("spawn")) as pool:
+                    results = pool.map(_hash_batch, chunks,
+                                       [self.method] * len(chunks), [self.salt_length] * len(chunks))
+                    hashes = [h for chunk in results for h in chunk]
+        with self._lock:
+            self._stats["hashes"] += len(passwords)
+            if passwords:
+                self._latencies_ms.append((time.perf_counter() - started) * 1000 / len(passwords))
+        return hashes
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies_ms)
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "method": self.method,
+                "in_flight": self._in_flight,
+                **self._stats,
+                "latency_ms": {
+                    "samples": len(latencies),
+                    "avg": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+                    "p95": round(latencies[int(len(latencies) * 0.95) - 1], 3) if latencies else 0.0,
+                    "max": round(latencies[-1], 3) if latencies else 0.0,
+                },
+            }
+
+    # =========================
+    # INTERNALS
+    # =========================
+    def _run(self, func, *args):
+        started = time.perf_counter()
+        if not self.workers:
+            try:
+                return func(*args)
+            finally:
+                self._record(started)
+
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            raise HashingBusyError("Too many sign-in requests, please retry shortly")
+        with self._lock:
+            self._in_flight += 1
+
+        try:
+            future = self._get_executor().submit(func, *args)
+        except OSError as e:
+            # No process pool on this host (e.g. serverless without /dev/shm)
+            self._release()
+            self._disable_pool(e)
+            return self._run(func, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            self._count("timeouts")
+            raise HashingBusyError("Password hashing timed out, please retry shortly")
+        finally:
+            self._record(started)
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    # spawn: forking a process that already runs request threads is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._executor
+
+    def _disable_pool(self, error):
+        """Switch to inline hashing for the rest of the process, logging it once."""
+        with self._executor_lock:
+            if self.workers:
+                print("Password hashing pool unavailable, hashing inline:", error)
+                self.workers = 0
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _record(self, started):
+        with self._lock:
+            self._latencies_ms.append((time.perf_counter() - started) * 1000)
+
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher():
+    """Process-wide hasher configured from Config."""
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher(
+                    workers=Config.PASSWORD_HASH_WORKERS,
+                    max_queue=Config.PASSWORD_HASH_MAX_QUEUE,
+                    timeout=Config.PASSWORD_HASH_TIMEOUT,
+                    method=Config.PASSWORD_HASH_METHOD,
+                    salt_length=Config.PASSWORD_SALT_LENGTH,
+                )
+    return _hasher
+
+
+def hash_password(password):
+    return get_password_hasher().hash(password)
+
+
+def verify_password(pwhash, password):
+    return get_password_hasher().verify(pwhash, password)
+
+
+def hash_passwords(passwords, workers):
+    return get_password_hasher().hash_many(passwords, workers)
+
+
+def get_password_hasher_stats():
+    return _hasher.stats() if _hasher is not None else None
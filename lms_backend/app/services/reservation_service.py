@@ -0,0 +1,22 @@
+from app.models.reservation_queries import expire_overdue_reservations
+
+
+def sweep_expired_reservations(conn, batch_size=500, max_batches=None):
+    """
+    Expire lapsed reservations in bounded batches, committing after each one
+    so no single transaction holds many row locks. Returns the number expired.
+    """
+    total = 0
+    batches = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            expired = expire_overdue_reservations(conn, batch_size)
+            conn.commit()
+            total += expired
+            batches += 1
+            if expired < batch_size:
+                break
+    except Exception:
+        conn.rollback()
+        raise
+    return total
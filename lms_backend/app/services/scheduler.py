@@ -0,0 +1,99 @@
+# app/services/scheduler.py
+import threading
+import time
+from app.config import Config
+from app.models.db import pooled_connection
+from app.services.reservation_service import sweep_expired_reservations
+from app.services.overdue_service import mark_overdue_borrows
+from app.services.audit_retention_service import rotate_audit_partitions
+from app.services.idempotency_service import purge_idempotency_keys
+
+
+class Scheduler:
+    """
+    Runs periodic maintenance jobs on daemon threads, one thread per job.
+    Each run gets its own pooled connection; failures are logged and retried
+    on the next interval.
+    """
+
+    def __init__(self):
+        self._jobs = {}
+        self._threads = []
+        self._stop = threading.Event()
+        self.last_results = {}
+
+    def add_job(self, name, interval, func):
+        """Register func(conn) to run every `interval` seconds."""
+        self._jobs[name] = (interval, func)
+
+    @property
+    def job_names(self):
+        return list(self._jobs)
+
+    def run_once(self, name):
+        interval, func = self._jobs[name]
+        started = time.monotonic()
+        with pooled_connection() as conn:
+            result = func(conn)
+        self.last_results[name] = {
+            "result": result,
+            "duration_ms": round((time.monotonic() - started) * 1000, 1),
+            "finished_at": time.time(),
+        }
+        return result
+
+    def _loop(self, name, interval):
+        while not self._stop.wait(interval):
+            try:
+                result = self.run_once(name)
+                print(f"[scheduler] {name}: {result}")
+            except Exception as e:
+                print(f"[scheduler] {name} failed:", e)
+
+    def start(self):
+        for name, (interval, _) in self._jobs.items():
+            thread = threading.Thread(target=self._loop, args=(name, interval), name=f"job-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wait(self):
+        """Block until stop() is called (used by the standalone worker)."""
+        while not self._stop.wait(1):
+            pass
+
+
+def build_scheduler():
+    """Scheduler with all maintenance jobs registered from Config."""
+    scheduler = Scheduler()
+    scheduler.add_job(
+        "expire_reservations",
+        Config.RESERVATION_EXPIRY_INTERVAL,
+        lambda conn: sweep_expired_reservations(conn, Config.RESERVATION_EXPIRY_BATCH_SIZE),
+    )
+    scheduler.add_job(
+        "mark_overdue",
+        Config.OVERDUE_MARK_INTERVAL,
+        lambda conn: mark_overdue_borrows(conn, Config.OVERDUE_MARK_CHUNK_SIZE),
+    )
+    scheduler.add_job(
+        "rotate_audit_partitions",
+        Config.AUDIT_PARTITION_INTERVAL,
+        lambda conn: rotate_audit_partitions(
+            conn,
+            retain_months=Config.AUDIT_RETENTION_MONTHS,
+            archive_dir=Config.AUDIT_ARCHIVE_DIR,
+            months_ahead=Config.AUDIT_PARTITIONS_AHEAD,
+        ),
+    )
+    scheduler.add_job(
+        "purge_idempotency_keys",
+        Config.IDEMPOTENCY_PURGE_INTERVAL,
+        lambda conn: purge_idempotency_keys(conn, Config.IDEMPOTENCY_PURGE_BATCH_SIZE),
+    )
+    return scheduler
@@ -0,0 +1,37 @@
+import threading
+from app.config import Config
+from app.models.stats_queries import get_admin_stats
+from app.utils.cache import TTLCache
+
+ADMIN_STATS_KEY = "admin"
+
+_admin_stats_cache = TTLCache(ttl=Config.STATS_CACHE_TTL, max_entries=1)
+# Only one request recomputes the stats when the entry expires; the others wait for it
+_admin_stats_refresh = threading.Lock()
+
+
+def get_admin_stats_cached(conn):
+    """
+    Admin dashboard stats, served from cache for up to STATS_CACHE_TTL seconds.
+    Returns (stats, age_seconds); age is None when the stats were just computed.
+    """
+    cached = _admin_stats_cache.get(ADMIN_STATS_KEY)
+    if cached is not None:
+        return cached
+
+    with _admin_stats_refresh:
+        cached = _admin_stats_cache.get(ADMIN_STATS_KEY)
+        if cached is not None:
+            return cached
+        stats = get_admin_stats(conn)
+        _admin_stats_cache.set(ADMIN_STATS_KEY, stats)
+        return stats, None
+
+
+def invalidate_admin_stats():
+    """Drop the cached admin stats. Call after committing a change that affects them."""
+    _admin_stats_cache.delete(ADMIN_STATS_KEY)
+
+
+def get_stats_cache_stats():
+    return _admin_stats_cache.stats()
@@ -0,0 +1,109 @@
+from marshmallow import ValidationError
+from app.config import Config
+from app.models.user_queries import get_existing_emails, bulk_insert_users
+from app.schemas.user_schema import RegisterSchema
+from app.services.audit_service import log_action
+from app.services.password_hasher import hash_passwords
+from app.services.stats_service import invalidate_admin_stats
+from app.utils.import_formats import read_records
+
+# Bulk imports may create teachers and students only
+IMPORTABLE_ROLES = {2: "TEACHER", 3: "STUDENT"}
+
+register_schema = RegisterSchema()
+
+
+def _validate(records):
+    """Split parsed records into valid rows and a per-line error report."""
+    valid = []
+    errors = []
+    seen = {}
+    for line_no, record, parse_error in records:
+        if parse_error:
+            errors.append({"line": line_no, "errors": {"_row": [parse_error]}})
+            continue
+        try:
+            data = register_schema.load(record, unknown="exclude")
+        except ValidationError as err:
+            errors.append({"line": line_no, "email": record.get("email"), "errors": err.messages})
+            continue
+        if data["role_id"] not in IMPORTABLE_ROLES:
+            errors.append({"line": line_no, "email": data["email"],
+                           "errors": {"role_id": ["Only teachers (2) and students (3) can be imported"]}})
+            continue
+        if data["email"] in seen:
+            errors.append({"line": line_no, "email": data["email"],
+                           "errors": {"email": [f"Duplicate of line {seen[data['email']]}"]}})
+            continue
+        seen[data["email"]] = line_no
+        valid.append((line_no, data))
+    return valid, errors
+
+
+def import_users(conn, raw, fmt, admin_id, status="APPROVED", source=None):
+    """
+    Bulk-create users from an uploaded CSV/NDJSON file.
+
+    Rows are validated with RegisterSchema, checked against existing emails in
+    one query, hashed in parallel and loaded with COPY; a single summary audit
+    entry is written. Returns counts plus a per-line error report.
+    """
+    if status not in ("APPROVED", "PENDING"):
+        raise ValueError("status must be APPROVED or PENDING")
+
+    records = list(read_records(raw, fmt))
+    if not records:
+        raise ValueError("No rows found in upload")
+    if len(records) > Config.USER_IMPORT_MAX_ROWS:
+        raise ValueError(f"Too many rows: {len(records)} (limit {Config.USER_IMPORT_MAX_ROWS})")
+
+    valid, errors = _validate(records)
+
+    existing = get_existing_emails(conn, [data["email"] for _, data in valid]) if valid else set()
+    pending = []
+    for line_no, data in valid:
+        if data["email"] in existing:
+            errors.append({"line": line_no, "email": data["email"], "errors": {"email": ["Email already exists"]}})
+        else:
+            pending.append((line_no, data))
+
+    created = {}
+    try:
+        if pending:
+            hashes = hash_passwords([data["password"] for _, data in pending], Config.USER_IMPORT_HASH_WORKERS)
+            rows = [
+                (line_no, data["name"], data["email"], pwhash, data["role_id"], data.get("phone"))
+                for (line_no, data), pwhash in zip(pending, hashes)
+            ]
+            created = bulk_insert_users(conn, rows, status=status,
+                                        approved_by=admin_id if status == "APPROVED" else None)
+            for line_no, data in pending:
+                if data["email"] not in created:
+                    # Registered by someone else between the check and the insert
+                    errors.append({"line": line_no, "email": data["email"],
+                                   "errors": {"email": ["Email already exists"]}})
+
+        log_action(
+            conn, admin_id,
+            action="Users Imported",
+            table_name="USER",
+            description=(
+                f"Bulk import{f' of {source}' if source else ''}: {len(created)} created "
+                f"({status}), {len(errors)} rejected, {len(records)} rows"
+            ),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    if created and status == "APPROVED":
+        invalidate_admin_stats()
+
+    errors.sort(key=lambda e: e["line"])
+    return {
+        "total_rows": len(records),
+        "created": len(created),
+        "failed": len(errors),
+        "errors": errors,
+    }
@@ -1,11 +1,13 @@
-from werkzeug.security import generate_password_hash, check_password_hash
 from app.models.user_queries import (
     create_user,
     get_user_by_email,
     get_pending_users,
     update_user_status,
+    update_users_status,
 )
-from app.services.audit_service import log_action
+from app.services.audit_service import log_action, log_actions
+from app.services.password_hasher import hash_password, verify_password
+from app.services.stats_service import invalidate_admin_stats
 
 
 def register_user(conn, name, email, password, role_id, phone=None):
@@ -24,7 +26,7 @@ def register_user(conn, name, email, password, role_id, phone=None):
             raise ValueError("Email already exists")
 
         # Hash password
-        hashed_password = generate_password_hash(password)
+        hashed_password = hash_password(password)
 
         # Create user
         user_id = create_user(conn, name, email, hashed_password, role_id, phone)
@@ -61,7 +63,7 @@ def authenticate_user(conn, email, password):
         raise ValueError("User not found")
 
     # Verify password
-    if not check_password_hash(user["password"], password):
+    if not verify_password(user["password"], password):
         raise ValueError("Invalid password")
 
     # Check approval status
@@ -84,3 +86,30 @@ def approve_or_reject_user(conn, user_id, status, approved_by):
         description=f"User {user_id} status set to {status}",
     )
     conn.commit()
+    invalidate_admin_stats()
+
+
+def approve_or_reject_users(conn, user_ids, status, approved_by):
+    """
+    Batch approve_or_reject_user: one UPDATE and one multi-row audit insert in a
+    single transaction. Returns {user_id: "approved" | "rejected" | "not_found"}.
+    """
+    if status not in ("APPROVED", "REJECTED"):
+        raise ValueError("Status must be APPROVED or REJECTED")
+    try:
+        updated = update_users_status(conn, user_ids, status, approved_by)
+        log_actions(
+            conn, approved_by,
+            action="User Approved" if status == "APPROVED" else "User Rejected",
+            table_name="USER",
+            entries=[(user_id, f"User {user_id} status set to {status} (batch)")
+                     for user_id in user_ids if user_id in updated],
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if updated:
+        invalidate_admin_stats()
+    outcome = status.lower()
+    return {user_id: outcome if user_id in updated else "not_found" for user_id in user_ids}
@@ -0,0 +1,31 @@
+# app/utils/batch.py
+from collections import Counter
+
+MAX_BATCH_SIZE = 1000
+
+
+def parse_ids(values, name="ids", maximum=MAX_BATCH_SIZE):
+    """Validate a JSON list of integer ids; duplicates are dropped, order is kept."""
+    if not isinstance(values, list) or not values:
+        raise ValueError(f"{name} must be a non-empty list")
+    if len(values) > maximum:
+        raise ValueError(f"At most {maximum} {name} per batch")
+    ids = []
+    seen = set()
+    for value in values:
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(f"{name} must contain integers only")
+        if value not in seen:
+            seen.add(value)
+            ids.append(value)
+    return ids
+
+
+def batch_response(ids, outcomes, id_key="id", details=None):
+    """
+    {"results": [{id_key: ..., "outcome": ..., **details[id]}, ...] in request order,
+     "summary": {outcome: count}} from a {id: outcome} mapping.
+    """
+    details = details or {}
+    results = [{id_key: i, "outcome": outcomes[i], **details.get(i, {})} for i in ids]
+    return {"results": results, "summary": dict(Counter(outcomes[i] for i in ids))}
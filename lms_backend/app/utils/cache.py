@@ -0,0 +1,68 @@
+# app/utils/cache.py
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with a per-entry TTL and LRU eviction.
+
+    get() returns (value, age_seconds) or None when the key is missing or
+    expired, so falsy values can be cached too. set() may override the TTL per
+    entry. A ttl of 0 disables caching.
+    The cache is per process: invalidations do not reach other workers, whose
+    entries still expire after ttl seconds.
+    """
+
+    def __init__(self, ttl, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] < entry[2]:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[0], now - entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic(), ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._stats["invalidations"] += 1
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._stats["invalidations"] += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                "ttl": self.ttl,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                **self._stats,
+                "hit_ratio": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            }
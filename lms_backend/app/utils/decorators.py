@@ -1,6 +1,15 @@
 from functools import wraps
 from flask_jwt_extended import get_jwt_identity
-from flask import jsonify
+from flask import jsonify, request, make_response
+from app.config import Config
+from app.models.db import get_db
+from app.services.idempotency_service import (
+    MAX_KEY_LENGTH,
+    key_digest,
+    request_fingerprint,
+    begin_idempotent_request,
+    finish_idempotent_request,
+)
 
 
 def admin_required(fn):
@@ -19,3 +28,104 @@ def admin_required(fn):
         return fn(*args, **kwargs)
 
     return wrapper
+
+
+def idempotent(fn):
+    """
+    Honour an Idempotency-Key header on a write route (place below @jwt_required).
+    The first request runs normally and its 2xx response is stored for
+    IDEMPOTENCY_KEY_TTL seconds; retries with the same key get that response back
+    (Idempotent-Replayed: true) without running the route again. Error responses
+    are not stored, so a failed request can be retried with the same key.
+    Requests without the header are not affected.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if key is None:
+            return fn(*args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return jsonify({"error": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"}), 400
+
+        conn = get_db()
+        user_id = get_jwt_identity()["id"]
+        key_hash = key_digest(key)
+        fingerprint = request_fingerprint(request.method, request.full_path, request.get_data())
+        state, record = begin_idempotent_request(
+            conn, user_id, key_hash, fingerprint, Config.IDEMPOTENCY_KEY_TTL, Config.IDEMPOTENCY_CLAIM_GRACE,
+        )
+
+        if state == "replay":
+            response = make_response(jsonify(record["response_body"]), record["status_code"])
+            response.headers["Idempotent-Replayed"] = "true"
+            return response
+        if state == "processed":
+            response = make_response(jsonify({
+                "message": "This request was already processed; its original response is no longer available",
+            }), 200)
+            response.headers["Idempotent-Replayed"] = "true"
+            return response
+        if state == "mismatch":
+            return jsonify({"error": "Idempotency-Key was already used for a different request"}), 422
+        if state == "in_progress":
+            response = make_response(jsonify({"error": "A request with this Idempotency-Key is still in progress"}), 409)
+            response.headers["Retry-After"] = "1"
+            return response
+
+        try:
+            response = make_response(fn(*args, **kwargs))
+        except Exception:
+            conn.rollback()
+            raise
+        if 200 <= response.status_code < 300 and response.is_json:
+            try:
+                finish_idempotent_request(conn, user_id, key_hash, response.status_code, response.get_json())
+            except Exception as e:
+                # The write itself has committed: report it rather than turn success into a 500.
+                # Retries get "already processed" once IDEMPOTENCY_CLAIM_GRACE has passed
+                print("Storing idempotent response failed:", e)
+        else:
+            # Drops the claim if the route failed before committing anything
+            conn.rollback()
+        return response
+
+    return wrapper
+
+
+def conditional(etag_for, cache_control):
+    """
+    Conditional GET with a strong ETag. etag_for(conn, **view_kwargs) returns the
+    current ETag, or None to serve the route unconditionally (e.g. unknown id). It
+    runs before the view, so a matching If-None-Match gets 304 without the view
+    querying or serializing anything. cache_control names the Config attribute
+    holding the route's Cache-Control policy (empty sends none).
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            conn = get_db()
+            try:
+                etag = etag_for(conn, **kwargs)
+            except Exception as e:
+                print("ETag lookup failed:", e)
+                conn.rollback()
+                return fn(*args, **kwargs)
+            if etag is None:
+                return fn(*args, **kwargs)
+
+            if request.if_none_match.contains_weak(etag):
+                response = make_response("", 304)
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            # Read before the view ran: a change committed meanwhile only makes the tag stale, never wrong
+            response.set_etag(etag)
+            policy = getattr(Config, cache_control)
+            if policy:
+                response.headers["Cache-Control"] = policy
+            return response
+
+        return wrapper
+
+    return decorator
@@ -1,5 +1,6 @@
 from flask import jsonify
 from flask_jwt_extended.exceptions import JWTExtendedException
+from app.services.password_hasher import HashingBusyError
 
 def register_error_handlers(app):
 
@@ -15,6 +16,12 @@ def register_error_handlers(app):
     def jwt_errors(e):
         return jsonify({"msg": str(e)}), 401
 
+    @app.errorhandler(HashingBusyError)
+    def hashing_busy(e):
+        response = jsonify({"msg": str(e)})
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response, 503
+
     @app.errorhandler(Exception)
     def server_error(e):
         return jsonify({"msg": "Internal server error"}), 500
@@ -0,0 +1,125 @@
+# app/utils/expiring_set.py
+import heapq
+import threading
+import time
+
+
+def compact_key(key):
+    """UUID strings (JWT jtis) are stored as their 16 raw bytes; anything else as-is."""
+    if isinstance(key, str) and len(key) == 36:
+        try:
+            return bytes.fromhex(key.replace("-", ""))
+        except ValueError:
+            pass
+    return key
+
+
+class ExpiringSet:
+    """
+    Thread-safe set whose members expire, with a cap on the number of members.
+
+    Members are grouped into time-wheel buckets of `resolution` seconds: each
+    member maps to the bucket its expiry falls into, and whole buckets are
+    dropped once they have passed. Expiry is rounded up to the end of the
+    bucket, so a member may live up to `resolution` seconds longer than asked,
+    never shorter. When the cap is reached, members closest to expiry are
+    evicted first.
+    """
+
+    def __init__(self, max_entries=1_000_000, default_ttl=3600, resolution=60, clock=time.time):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.resolution = resolution
+        self._clock = clock
+        self._members = {}   # key -> bucket id
+        self._buckets = {}   # bucket id -> (bucket id, [keys]); members share that int object
+        self._order = []     # heap of bucket ids
+        self._lock = threading.Lock()
+        self._stats = {"added": 0, "expired": 0, "evicted": 0}
+
+    def add(self, key, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        key = compact_key(key)
+        bucket = int((self._clock() + ttl) // self.resolution)
+        with self._lock:
+            self._purge(self._current_bucket())
+            previous = self._members.get(key)
+            if previous is not None and previous >= bucket:
+                return
+            if previous is None:
+                while len(self._members) >= self.max_entries and self._order:
+                    self._evict_one()
+            entry = self._buckets.get(bucket)
+            if entry is None:
+                entry = self._buckets[bucket] = (bucket, [])
+                heapq.heappush(self._order, bucket)
+            entry[1].append(key)
+            self._members[key] = entry[0]
+            self._stats["added"] += 1
+
+    def __contains__(self, key):
+        key = compact_key(key)
+        current = self._current_bucket()
+        try:
+            expired = self._order[0] < current
+        except IndexError:  # empty, or emptied by another thread
+            expired = False
+        if expired:
+            with self._lock:
+                self._purge(current)
+        # Single dict lookup: safe without the lock
+        bucket = self._members.get(key)
+        return bucket is not None and bucket >= current
+
+    def __len__(self):
+        return len(self._members)
+
+    def purge(self):
+        """Drop every expired member. Also done incrementally by add() and lookups."""
+        with self._lock:
+            self._purge(self._current_bucket())
+
+    def clear(self):
+        with self._lock:
+            self._members.clear()
+            self._buckets.clear()
+            self._order.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._members),
+                "max_entries": self.max_entries,
+                "buckets": len(self._buckets),
+                **self._stats,
+            }
+
+    # =========================
+    # INTERNALS
+    # =========================
+    def _current_bucket(self):
+        return int(self._clock() // self.resolution)
+
+    def _purge(self, current):
+        while self._order and self._order[0] < current:
+            bucket = heapq.heappop(self._order)
+            for key in self._buckets.pop(bucket)[1]:
+                # A key re-added with a later expiry lives on in its newer bucket
+                if self._members.get(key) == bucket:
+                    del self._members[key]
+                    self._stats["expired"] += 1
+
+    def _evict_one(self):
+        bucket = self._order[0]
+        keys = self._buckets[bucket][1]
+        while keys:
+            key = keys.pop()
+            if self._members.get(key) == bucket:
+                del self._members[key]
+                self._stats["evicted"] += 1
+                break
+        if not keys:
+            heapq.heappop(self._order)
+            del self._buckets[bucket]
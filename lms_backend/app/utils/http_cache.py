@@ -0,0 +1,20 @@
+# app/utils/http_cache.py
+import hashlib
+
+
+def make_etag(*parts):
+    """
+    Unquoted strong ETag from version parts, e.g. make_etag("book", 7, 3) -> "book-7-3".
+    Every part must change whenever the representation does.
+    """
+    return "-".join(str(part) for part in parts)
+
+
+def args_digest(args):
+    """
+    Short digest of a request's query arguments, independent of their order, so
+    each distinct listing (filters, page, projection) gets its own ETag.
+    """
+    items = sorted(args.items(multi=True))
+    raw = "&".join(f"{key}={value}" for key, value in items)
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
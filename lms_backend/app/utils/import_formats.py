@@ -0,0 +1,51 @@
+# app/utils/import_formats.py
+import csv
+import io
+import json
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+
+
+def detect_format(filename=None, content_type=None, requested=None):
+    """Pick csv or ndjson from an explicit ?format=, the file extension or the content type."""
+    if requested:
+        fmt = requested.lower()
+    elif filename and filename.lower().endswith((".ndjson", ".jsonl")):
+        fmt = "ndjson"
+    elif content_type and ("ndjson" in content_type or "jsonl" in content_type):
+        fmt = "ndjson"
+    else:
+        fmt = "csv"
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}. Use csv or ndjson")
+    return fmt
+
+
+def read_records(raw, fmt):
+    """
+    Yield (line_no, record, error) for each data line of an uploaded file.
+    record is a dict with empty values as None; error is a message when the
+    line could not be parsed (record is then None).
+    """
+    text = raw.decode("utf-8-sig") if isinstance(raw, bytes) else raw
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        for record in reader:
+            if None in record:
+                yield reader.line_num, None, "Too many columns"
+                continue
+            yield reader.line_num, {k.strip(): (v.strip() or None) if isinstance(v, str) else v
+                                    for k, v in record.items() if k}, None
+    else:
+        for line_no, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, None, f"Invalid JSON: {e.msg}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "Each line must be a JSON object"
+                continue
+            yield line_no, {k: (None if v == "" else v) for k, v in record.items()}, None
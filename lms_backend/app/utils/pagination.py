@@ -0,0 +1,76 @@
+# app/utils/pagination.py
+import base64
+import json
+
+
+def encode_cursor(*values):
+    """
+    Encode the keyset position (e.g. last book_id) into an opaque, URL-safe token.
+    The same position always yields the same token.
+    """
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, size=1):
+    """Decode a token produced by encode_cursor. Raises ValueError if it is malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def parse_limit(value, default=50, maximum=200):
+    """Parse a ?limit= value, clamping it to [1, maximum]."""
+    if value is None or value == "":
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    return min(limit, maximum)
+
+
+def parse_page(value, default=1):
+    """Parse a ?page= value (1-based)."""
+    if value is None or value == "":
+        return default
+    try:
+        page = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("page must be an integer")
+    if page < 1:
+        raise ValueError("page must be at least 1")
+    return page
+
+
+def parse_optional(args, name, parse):
+    """
+    Parse the optional query parameter `name` from `args` with `parse` (e.g. int,
+    datetime.fromisoformat). Returns None when it is absent or empty.
+    """
+    value = args.get(name)
+    if value is None or value == "":
+        return None
+    try:
+        return parse(value)
+    except ValueError:
+        raise ValueError(f"Invalid value for {name}: {value}")
+
+
+def parse_bool(value):
+    """Parse a boolean query parameter. Returns None when the parameter is absent."""
+    if value is None or value == "":
+        return None
+    lowered = str(value).lower()
+    if lowered in ("1", "true", "yes"):
+        return True
+    if lowered in ("0", "false", "no"):
+        return False
+    raise ValueError(f"Invalid boolean value: {value}")
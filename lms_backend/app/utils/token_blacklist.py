@@ -1,64 +1,151 @@
 # app/utils/token_blacklist.py
 
 import os
+import threading
 import time
+from collections import deque
 try:
     import redis
 except Exception:
     redis = None
 
+from app.utils.cache import TTLCache
+from app.utils.expiring_set import ExpiringSet
+
 # Environment variable to configure Redis (optional)
 REDIS_URL = os.getenv("REDIS_URL")
 REDIS_PREFIX = os.getenv("REDIS_PREFIX", "token_blacklist:")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 20))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 0.5))  # seconds
+
+# Local front cache for Redis lookups. Revocation is permanent, so positive
+# answers can be kept longer; negative answers are kept briefly because a
+# logout on another node only becomes visible here once they expire.
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", 300))  # seconds, revoked tokens
+TOKEN_CACHE_NEGATIVE_TTL = float(os.getenv("TOKEN_CACHE_NEGATIVE_TTL", 2))  # seconds, valid tokens
+
+# Revoked tokens only matter until they expire. Used when `expires` is not given.
+TOKEN_BLACKLIST_DEFAULT_TTL = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRES", 3600))  # seconds
+TOKEN_BLACKLIST_MAX_ENTRIES = int(os.getenv("TOKEN_BLACKLIST_MAX_ENTRIES", 1_000_000))
+
+# Fallback in-memory store if Redis is not available/configured (or erroring);
+# entries are dropped when the token expires
+_IN_MEMORY_BLACKLIST = ExpiringSet(
+    max_entries=TOKEN_BLACKLIST_MAX_ENTRIES,
+    default_ttl=TOKEN_BLACKLIST_DEFAULT_TTL,
+)
+
+_client = None
+_client_created = False
+_client_lock = threading.Lock()
+
+_local_cache = TTLCache(ttl=TOKEN_CACHE_TTL, max_entries=TOKEN_CACHE_SIZE)
 
-# Fallback in-memory set if Redis is not available/configured
-_IN_MEMORY_BLACKLIST = set()
+_stats_lock = threading.Lock()
+_stats = {"lookups": 0, "redis_calls": 0, "redis_errors": 0}
+_redis_latencies_ms = deque(maxlen=1000)
 
 
 def _get_redis_client():
+    """Process-wide Redis client; its connection pool is shared by all threads."""
+    global _client, _client_created
     if not REDIS_URL or redis is None:
         return None
+    if not _client_created:
+        with _client_lock:
+            if not _client_created:
+                try:
+                    _client = redis.from_url(
+                        REDIS_URL,
+                        max_connections=REDIS_MAX_CONNECTIONS,
+                        socket_timeout=REDIS_SOCKET_TIMEOUT,
+                        socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+                    )
+                except Exception:
+                    _client = None
+                _client_created = True
+    return _client
+
+
+def _timed_redis_call(func, *args):
+    started = time.perf_counter()
     try:
-        return redis.from_url(REDIS_URL)
+        return func(*args)
     except Exception:
-        return None
+        with _stats_lock:
+            _stats["redis_errors"] += 1
+        raise
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with _stats_lock:
+            _stats["redis_calls"] += 1
+            _redis_latencies_ms.append(elapsed_ms)
 
 
 def add_token_to_blacklist(jti, expires=None):
     """
-    Add a token `jti` to blacklist. If Redis is configured, store with optional TTL (seconds).
-    Otherwise use in-memory set. `expires` is optional seconds to expire the blacklist entry.
+    Add a token `jti` to blacklist. If Redis is configured, store it there, otherwise
+    in memory. `expires` is the token's remaining lifetime in seconds (defaults to
+    the access token lifetime); the entry is dropped after that.
     """
+    ttl = max(int(expires or TOKEN_BLACKLIST_DEFAULT_TTL), 1)
     client = _get_redis_client()
     if client:
         key = REDIS_PREFIX + str(jti)
         try:
-            if expires:
-                client.setex(key, int(expires), "1")
-            else:
-                client.set(key, "1")
+            _timed_redis_call(client.setex, key, ttl, "1")
         except Exception:
             # fallback to in-memory on error
-            _IN_MEMORY_BLACKLIST.add(jti)
+            _IN_MEMORY_BLACKLIST.add(jti, ttl)
+        _local_cache.set(jti, True, min(ttl, TOKEN_CACHE_TTL))
     else:
-        _IN_MEMORY_BLACKLIST.add(jti)
+        _IN_MEMORY_BLACKLIST.add(jti, ttl)
 
 
 def is_token_blacklisted(jti):
     """
     Return True if token `jti` is blacklisted.
-    Checks Redis first (if configured), otherwise in-memory set.
+    Checks the local cache, then Redis (if configured), otherwise in-memory set.
     """
     client = _get_redis_client()
     if client:
+        with _stats_lock:
+            _stats["lookups"] += 1
+        cached = _local_cache.get(jti)
+        if cached is not None:
+            return cached[0]
         try:
             key = REDIS_PREFIX + str(jti)
-            return client.exists(key) == 1
+            revoked = _timed_redis_call(client.exists, key) == 1
         except Exception:
             return jti in _IN_MEMORY_BLACKLIST
+        _local_cache.set(jti, revoked, None if revoked else TOKEN_CACHE_NEGATIVE_TTL)
+        return revoked
     return jti in _IN_MEMORY_BLACKLIST
 
 
+def get_blacklist_stats():
+    """Local cache hit rate and Redis latency for the admin metrics endpoint."""
+    cache = _local_cache.stats()
+    with _stats_lock:
+        latencies = sorted(_redis_latencies_ms)
+        stats = dict(_stats)
+    return {
+        "backend": "redis" if _get_redis_client() else "memory",
+        **stats,
+        "local_cache": cache,
+        "memory_store": _IN_MEMORY_BLACKLIST.stats(),
+        "redis_latency_ms": {
+            "samples": len(latencies),
+            "avg": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            "p95": round(latencies[int(len(latencies) * 0.95) - 1], 3) if latencies else 0.0,
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+    }
+
+
 def clear_blacklist():
-    """Clear in-memory blacklist (for tests). Does not affect Redis."""
+    """Clear in-memory blacklist and local cache (for tests). Does not affect Redis."""
     _IN_MEMORY_BLACKLIST.clear()
+    _local_cache.clear()
@@ -0,0 +1,130 @@
+"""
+Login and issue throughput with each audit sink mode.
+
+For each mode (transactional, buffered with sync durability, buffered with
+async durability) this runs, over --threads concurrent workers:
+
+  login  POST /users/login through the Flask test client (hash check + audit row)
+  issue  request_borrow -> approve_borrow -> return_borrowed_book for a scratch book
+
+and prints operations per second. Buffered runs flush the queue before the
+clock stops, so every mode writes the same rows.
+
+Usage (from lms_backend/, against a scratch database with schema.sql applied):
+    python benchmarks/bench_audit_sink.py --email student@example.com --password secret --iterations 200
+The account must be an APPROVED student or teacher.
+"""
+import argparse
+import itertools
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config  # noqa: E402
+from app.models.db import pooled_connection  # noqa: E402
+from app.models.user_queries import get_user_by_email  # noqa: E402
+from app.services import audit_service  # noqa: E402
+from app.services.borrow_service import request_borrow, approve_borrow, return_borrowed_book  # noqa: E402
+from run import app  # noqa: E402
+
+BENCH_ISBN = "BENCH-AUDIT"
+MODES = (
+    ("transactional", "transactional", "sync"),
+    ("buffered/sync", "buffered", "sync"),
+    ("buffered/async", "buffered", "async"),
+)
+
+
+def run_threads(threads, iterations, work):
+    def worker():
+        for _ in range(iterations):
+            work()
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    if audit_service.get_audit_buffer_stats() is not None:
+        audit_service.get_audit_buffer().flush()
+    return threads * iterations / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--iterations", type=int, default=100, help="operations per thread")
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    with pooled_connection() as conn:
+        user = get_user_by_email(conn, args.email)
+    if not user:
+        sys.exit(f"No user {args.email}")
+    user_id = user["user_id"]
+
+    client = app.test_client()
+
+    def login():
+        resp = client.post("/users/login", json={"email": args.email, "password": args.password})
+        if resp.status_code != 200:
+            raise RuntimeError(resp.get_json())
+
+    # Each thread cycles its own copy so threads never contend for the same borrow
+    book_ids = {}
+    suffixes = itertools.count()
+
+    def issue():
+        ident = threading.get_ident()
+        if ident not in book_ids:
+            book_ids[ident] = create_book_for_thread(ident)
+        book_id = book_ids[ident]
+        with pooled_connection() as conn:
+            borrow_id = request_borrow(conn, user_id, book_id)
+            approve_borrow(conn, borrow_id)
+            return_borrowed_book(conn, user_id, book_id)
+
+    def create_book_for_thread(ident):
+        with pooled_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO books (title, author, isbn, total_copies, available_copies)
+                    VALUES ('Audit Sink Benchmark', 'Bench', %s, 1, 1)
+                    RETURNING book_id
+                """, (f"{BENCH_ISBN}-{next(suffixes)}",))
+                book_id = cur.fetchone()["book_id"]
+            conn.commit()
+        return book_id
+
+    print(f"{'mode':<16}{'logins/s':>10}{'issues/s':>10}")
+    try:
+        for label, mode, durability in MODES:
+            Config.AUDIT_SINK_MODE = mode
+            Config.AUDIT_DURABILITY = durability
+            if audit_service.get_audit_buffer_stats() is not None:
+                audit_service.get_audit_buffer().synchronous_commit = durability == "sync"
+            logins = run_threads(args.threads, args.iterations, login)
+            issues = run_threads(args.threads, args.iterations, issue)
+            print(f"{label:<16}{logins:>10.1f}{issues:>10.1f}")
+    finally:
+        with pooled_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    DELETE FROM fines WHERE borrow_id IN (
+                        SELECT borrow_id FROM borrows
+                        WHERE book_id IN (SELECT book_id FROM books WHERE isbn LIKE %s))
+                """, (BENCH_ISBN + "%",))
+                cur.execute("""
+                    DELETE FROM borrows WHERE book_id IN (SELECT book_id FROM books WHERE isbn LIKE %s)
+                """, (BENCH_ISBN + "%",))
+                cur.execute("DELETE FROM books WHERE isbn LIKE %s", (BENCH_ISBN + "%",))
+            conn.commit()
+
+
+if __name__ == "__main__":
+    main()
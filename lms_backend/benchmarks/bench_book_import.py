@@ -0,0 +1,96 @@
+"""
+Throughput of bulk catalog loading, in rows per second.
+
+Generates --rows synthetic titles (ISBNs prefixed BENCH-) and loads them with:
+
+  legacy   book_service.add_book per row (ISBN lookup, INSERT, commit), on the
+           first --legacy-rows rows only; the rate is extrapolated
+  bulk     book_import_service.import_books: COPY into staging, SQL validation,
+           one INSERT ... ON CONFLICT (isbn)
+
+then re-imports the same feed with --on-conflict skip and update to time the
+conflict paths. Benchmark rows are deleted afterwards.
+
+Usage (from lms_backend/, against a scratch database with schema.sql applied):
+    python benchmarks/bench_book_import.py --rows 200000 --legacy-rows 2000
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config  # noqa: E402
+from app.services import book_service  # noqa: E402
+from app.services.book_import_service import import_books  # noqa: E402
+
+ISBN_PREFIX = "BENCH-"
+
+
+def connect():
+    return psycopg2.connect(dsn=Config.DATABASE_URL, cursor_factory=RealDictCursor)
+
+
+def make_feed(rows, copies=3):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["title", "author", "category", "isbn", "total_copies"])
+    for i in range(rows):
+        writer.writerow([f"Benchmark Title {i}", f"Author {i % 997}", "Bench", f"{ISBN_PREFIX}{i:012d}", copies])
+    return out.getvalue().encode()
+
+
+def cleanup(conn):
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM books WHERE isbn LIKE %s", (ISBN_PREFIX + "%",))
+    conn.commit()
+
+
+def run_legacy(conn, rows):
+    # add_book raises for existing ISBNs, so load a disjoint range
+    started = time.perf_counter()
+    for i in range(rows):
+        book_service.add_book(conn, f"Legacy Title {i}", "Author", f"{ISBN_PREFIX}L{i:011d}", 3, "Bench")
+    return rows / (time.perf_counter() - started)
+
+
+def run_bulk(conn, feed, rows, on_conflict):
+    started = time.perf_counter()
+    report = import_books(conn, feed, "csv", admin_id=None, on_conflict=on_conflict, source="bench")
+    elapsed = time.perf_counter() - started
+    return rows / elapsed, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--legacy-rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    if not Config.DATABASE_URL:
+        sys.exit("DATABASE_URL is not configured")
+
+    conn = connect()
+    cleanup(conn)
+    feed = make_feed(args.rows)
+    try:
+        print(f"{'mode':<16}{'rows/s':>12}{'created':>10}{'updated':>10}{'skipped':>10}")
+        if args.legacy_rows:
+            rate = run_legacy(conn, args.legacy_rows)
+            print(f"{'legacy add_book':<16}{rate:>12.0f}{args.legacy_rows:>10}{0:>10}{0:>10}")
+        for label, policy in (("bulk (new)", "skip"), ("bulk skip", "skip"), ("bulk update", "update")):
+            rate, report = run_bulk(conn, feed, args.rows, policy)
+            print(f"{label:<16}{rate:>12.0f}{report['created']:>10}{report['updated']:>10}{report['skipped']:>10}")
+    finally:
+        cleanup(conn)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark GET /books/search query latency on a large synthetic catalog.
+
+Seeds N synthetic books (ISBN prefix 'BENCH'), runs a mix of exact, multi-word,
+misspelled and ISBN queries through book_queries.search_books and prints
+p50/p95/max latency per query type.
+
+Usage (from lms_backend/, against a scratch database with schema.sql applied):
+    python benchmarks/bench_book_search.py --rows 1000000 --iterations 50 --cleanup
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config  # noqa: E402
+from app.models.book_queries import search_books  # noqa: E402
+
+WORDS = [
+    "ancient", "modern", "history", "science", "garden", "river", "empire", "quantum",
+    "journey", "silent", "mountain", "ocean", "algorithm", "database", "poetry", "winter",
+    "economics", "philosophy", "machine", "learning", "physics", "chemistry", "kingdom", "shadow",
+]
+AUTHORS = ["Sharma", "Thapa", "Gurung", "Smith", "Garcia", "Nakamura", "Okafor", "Ivanova"]
+CATEGORIES = ["Fiction", "Science", "History", "Technology", "Poetry", "Economics"]
+
+QUERIES = {
+    "single word": ["quantum", "garden", "empire"],
+    "multi word": ["ancient history", "machine learning", "silent river"],
+    "misspelled": ["quantm", "philosphy", "algoritm"],
+    "author": ["Nakamura", "Okafor"],
+    "isbn": ["BENCH0000042", "BENCH0500000"],
+}
+
+
+def seed(conn, rows):
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) AS n FROM books WHERE isbn LIKE %s", ("BENCH%",))
+        existing = cur.fetchone()["n"]
+        if existing >= rows:
+            print(f"Reusing {existing} existing synthetic books")
+            return
+        print(f"Seeding {rows - existing} synthetic books...")
+        started = time.perf_counter()
+        cur.execute("""
+            INSERT INTO books (title, author, category, isbn, total_copies, available_copies)
+            SELECT initcap(w[1 + (g * 7) %% cardinality(w)] || ' ' || w[1 + (g * 13) %% cardinality(w)]
+                           || ' ' || w[1 + (g * 31) %% cardinality(w)]),
+                   a[1 + g %% cardinality(a)],
+                   c[1 + g %% cardinality(c)],
+                   'BENCH' || lpad(g::text, 7, '0'),
+                   5, 5
+            FROM generate_series(%s, %s) AS g,
+                 (SELECT %s::text[] AS w, %s::text[] AS a, %s::text[] AS c) AS lists
+        """, (existing, rows - 1, WORDS, AUTHORS, CATEGORIES))
+        cur.execute("ANALYZE books")
+    conn.commit()
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+
+def cleanup(conn):
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM books WHERE isbn LIKE %s", ("BENCH%",))
+    conn.commit()
+    print("Removed synthetic books")
+
+
+def run(conn, iterations):
+    print(f"\n{'query type':<14}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for label, queries in QUERIES.items():
+        timings = []
+        for _ in range(iterations):
+            for q in queries:
+                started = time.perf_counter()
+                search_books(conn, q, limit=20, offset=0)
+                timings.append((time.perf_counter() - started) * 1000)
+                conn.rollback()
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(f"{label:<14}{statistics.median(timings):>10.2f}{p95:>10.2f}{timings[-1]:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--cleanup", action="store_true", help="delete synthetic books afterwards")
+    args = parser.parse_args()
+
+    if not Config.DATABASE_URL:
+        sys.exit("DATABASE_URL is not configured")
+    conn = psycopg2.connect(dsn=Config.DATABASE_URL, cursor_factory=RealDictCursor)
+    try:
+        seed(conn, args.rows)
+        run(conn, args.iterations)
+    finally:
+        if args.cleanup:
+            cleanup(conn)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Concurrent load test for available_copies accounting.
+
+Creates one synthetic book with --copies copies and lets --threads workers
+take copies concurrently until none are left, using:
+
+  legacy       read available_copies, then write back available_copies - 1
+  conditional  UPDATE ... WHERE available_copies > 0 RETURNING (book_queries.decrement_available_copies)
+
+For each strategy it reports successful takes, oversold copies (lost updates)
+and takes per second.
+
+Usage (from lms_backend/, against a scratch database with schema.sql applied):
+    python benchmarks/bench_copy_accounting.py --copies 2000 --threads 16
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config  # noqa: E402
+from app.models.book_queries import (  # noqa: E402
+    get_book_by_id,
+    update_book_copies,
+    decrement_available_copies,
+)
+
+BENCH_ISBN = "BENCH-COPIES"
+
+
+def connect():
+    return psycopg2.connect(dsn=Config.DATABASE_URL, cursor_factory=RealDictCursor)
+
+
+def reset_book(copies):
+    conn = connect()
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM books WHERE isbn = %s", (BENCH_ISBN,))
+        cur.execute("""
+            INSERT INTO books (title, author, isbn, total_copies, available_copies)
+            VALUES ('Copy Accounting Benchmark', 'Bench', %s, %s, %s)
+            RETURNING book_id
+        """, (BENCH_ISBN, copies, copies))
+        book_id = cur.fetchone()["book_id"]
+    conn.commit()
+    conn.close()
+    return book_id
+
+
+def take_legacy(conn, book_id):
+    book = get_book_by_id(conn, book_id)
+    if not book or book["available_copies"] <= 0:
+        return False
+    update_book_copies(conn, book_id, book["available_copies"] - 1)
+    return True
+
+
+def take_conditional(conn, book_id):
+    return decrement_available_copies(conn, book_id) is not None
+
+
+def run(strategy, copies, threads):
+    book_id = reset_book(copies)
+    taken = [0] * threads
+
+    def worker(index):
+        conn = connect()
+        try:
+            while True:
+                ok = strategy(conn, book_id)
+                conn.commit()
+                if not ok:
+                    return
+                taken[index] += 1
+        finally:
+            conn.close()
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    total = sum(taken)
+    return total, total - copies, total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--copies", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    if not Config.DATABASE_URL:
+        sys.exit("DATABASE_URL is not configured")
+
+    print(f"{'strategy':<13}{'taken':>8}{'oversold':>10}{'takes/s':>10}")
+    for name, strategy in (("legacy", take_legacy), ("conditional", take_conditional)):
+        total, oversold, rate = run(strategy, args.copies, args.threads)
+        print(f"{name:<13}{total:>8}{oversold:>10}{rate:>10.0f}")
+
+    conn = connect()
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM books WHERE isbn = %s", (BENCH_ISBN,))
+    conn.commit()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Benchmark the student and teacher dashboard queries for a heavy user.
+
+Creates one synthetic student with --borrows historical borrows (a handful
+still open, some overdue, some with unpaid fines) and compares:
+
+  before  the previous multi-query implementations (4 queries for students,
+          3 for teachers), reproduced below
+  after   stats_queries.get_student_stats / get_teacher_stats (one query each)
+
+For each it reports round trips per call and p50/p95 latency.
+
+Usage (from lms_backend/, against a scratch database with schema.sql applied):
+    python benchmarks/bench_dashboards.py --borrows 5000 --iterations 200 --cleanup
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config  # noqa: E402
+from app.models.stats_queries import get_student_stats, get_teacher_stats  # noqa: E402
+
+BENCH_EMAIL = "bench-dashboard@example.com"
+BENCH_ISBN_PREFIX = "BENCH-DASH-"
+OPEN_BORROWS = 12
+
+
+class CountingConn:
+    """Wraps a connection and counts statements sent to the server."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.statements = 0
+
+    def cursor(self, *args, **kwargs):
+        cur = self.conn.cursor(*args, **kwargs)
+        owner = self
+        execute = cur.execute
+
+        def counted(sql, params=None):
+            owner.statements += 1
+            return execute(sql, params)
+
+        cur.execute = counted
+        return cur
+
+
+# =========================
+# PREVIOUS IMPLEMENTATIONS
+# =========================
+def legacy_teacher_stats(conn, user_id):
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            SELECT COUNT(*) AS issued_count
+            FROM borrows WHERE user_id = %s AND borrow_status IN ('ACTIVE', 'OVERDUE')
+        """, (user_id,))
+        issued = cur.fetchone()["issued_count"]
+        cur.execute("""
+            SELECT b.borrow_id, b.book_id, b.due_date, bk.title, bk.author
+            FROM borrows b JOIN books bk ON b.book_id = bk.book_id
+            WHERE b.user_id = %s AND b.borrow_status IN ('ACTIVE', 'OVERDUE')
+              AND b.due_date::date = CURRENT_DATE
+            ORDER BY b.due_date
+        """, (user_id,))
+        due_today = cur.fetchall()
+        cur.execute("""
+            SELECT b.borrow_id, b.book_id, b.due_date, bk.title, bk.author
+            FROM borrows b JOIN books bk ON b.book_id = bk.book_id
+            WHERE b.user_id = %s AND b.borrow_status IN ('ACTIVE', 'OVERDUE')
+              AND b.due_date < NOW()
+            ORDER BY b.due_date
+        """, (user_id,))
+        overdue = cur.fetchall()
+    return {"issued_count": issued, "due_today": due_today, "overdue": overdue}
+
+
+def legacy_student_stats(conn, user_id):
+    soon_end = datetime.utcnow() + timedelta(days=2)
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            SELECT COUNT(*) AS count FROM borrows WHERE user_id = %s AND borrow_status IN ('ACTIVE', 'OVERDUE')
+        """, (user_id,))
+        borrowed = cur.fetchone()["count"]
+        cur.execute("""
+            SELECT b.borrow_id, b.book_id, b.due_date, bk.title, bk.author
+            FROM borrows b JOIN books bk ON b.book_id = bk.book_id
+            WHERE b.user_id = %s AND b.borrow_status IN ('ACTIVE', 'OVERDUE')
+              AND b.due_date >= NOW() AND b.due_date <= %s
+            ORDER BY b.due_date
+        """, (user_id, soon_end))
+        due_soon = cur.fetchall()
+        cur.execute("""
+            SELECT COALESCE(SUM(amount), 0)::float AS total FROM fines WHERE user_id = %s AND paid_status = FALSE
+        """, (user_id,))
+        total_fines = cur.fetchone()["total"] or 0
+        cur.execute("""
+            SELECT COUNT(*) AS count FROM reservations WHERE user_id = %s AND reservation_status = 'ACTIVE'
+        """, (user_id,))
+        active_reservations = cur.fetchone()["count"]
+    return {
+        "borrowed_count": borrowed,
+        "due_soon": due_soon,
+        "total_fines": float(total_fines),
+        "active_reservations": active_reservations,
+    }
+
+
+# =========================
+# DATA
+# =========================
+def seed(conn, borrows):
+    with conn.cursor() as cur:
+        cur.execute("SELECT user_id FROM users WHERE email = %s", (BENCH_EMAIL,))
+        row = cur.fetchone()
+        if row:
+            print(f"Reusing synthetic user {row['user_id']}")
+            return row["user_id"]
+
+        print(f"Seeding one user with {borrows} borrows...")
+        cur.execute("""
+            INSERT INTO users (name, email, password, role_id, status)
+            VALUES ('Dashboard Benchmark', %s, 'x', 3, 'APPROVED')
+            RETURNING user_id
+        """, (BENCH_EMAIL,))
+        user_id = cur.fetchone()["user_id"]
+
+        cur.execute("""
+            INSERT INTO books (title, author, isbn, total_copies, available_copies)
+            SELECT 'Dashboard Book ' || g, 'Bench', %s || g, 50, 50
+            FROM generate_series(1, %s) AS g
+        """, (BENCH_ISBN_PREFIX, OPEN_BORROWS * 4))
+        cur.execute("SELECT book_id FROM books WHERE isbn LIKE %s ORDER BY book_id", (BENCH_ISBN_PREFIX + "%",))
+        book_ids = [r["book_id"] for r in cur.fetchall()]
+
+        # Historical (returned) borrows, every tenth with an unpaid fine
+        cur.execute("""
+            INSERT INTO borrows (user_id, book_id, issue_date, due_date, return_date, borrow_status)
+            SELECT %s, (%s::int[])[1 + g %% %s],
+                   NOW() - (g || ' hours')::interval - INTERVAL '7 days',
+                   NOW() - (g || ' hours')::interval,
+                   NOW() - (g || ' hours')::interval,
+                   'RETURNED'
+            FROM generate_series(1, %s) AS g
+        """, (user_id, book_ids, len(book_ids), borrows - OPEN_BORROWS))
+        cur.execute("""
+            INSERT INTO fines (borrow_id, user_id, amount, paid_status)
+            SELECT borrow_id, user_id, 10, FALSE
+            FROM borrows WHERE user_id = %s AND borrow_id %% 10 = 0
+        """, (user_id,))
+
+        # Open borrows: some overdue, some due today, some due soon
+        for i, book_id in enumerate(book_ids[:OPEN_BORROWS]):
+            cur.execute("""
+                INSERT INTO borrows (user_id, book_id, due_date, borrow_status)
+                VALUES (%s, %s, NOW() + (%s || ' hours')::interval, 'ACTIVE')
+            """, (user_id, book_id, (i - OPEN_BORROWS // 2) * 12))
+        cur.execute("ANALYZE borrows")
+        cur.execute("ANALYZE fines")
+    conn.commit()
+    return user_id
+
+
+def cleanup(conn):
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM users WHERE email = %s", (BENCH_EMAIL,))
+        cur.execute("DELETE FROM books WHERE isbn LIKE %s", (BENCH_ISBN_PREFIX + "%",))
+    conn.commit()
+    print("Removed synthetic user and books")
+
+
+def measure(conn, func, user_id, iterations):
+    counting = CountingConn(conn)
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func(counting, user_id)
+        timings.append((time.perf_counter() - started) * 1000)
+        conn.rollback()
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    return counting.statements / iterations, statistics.median(timings), p95
+
+
+def run(conn, user_id, iterations):
+    cases = [
+        ("student before", legacy_student_stats),
+        ("student after", get_student_stats),
+        ("teacher before", legacy_teacher_stats),
+        ("teacher after", get_teacher_stats),
+    ]
+    print(f"\n{'dashboard':<16}{'round trips':>12}{'p50 ms':>10}{'p95 ms':>10}")
+    for label, func in cases:
+        func(conn, user_id)  # warm up
+        conn.rollback()
+        trips, p50, p95 = measure(conn, func, user_id, iterations)
+        print(f"{label:<16}{trips:>12.0f}{p50:>10.2f}{p95:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--borrows", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--cleanup", action="store_true", help="delete the synthetic user and books afterwards")
+    args = parser.parse_args()
+
+    if not Config.DATABASE_URL:
+        sys.exit("DATABASE_URL is not configured")
+    conn = psycopg2.connect(dsn=Config.DATABASE_URL, cursor_factory=RealDictCursor)
+    try:
+        user_id = seed(conn, args.borrows)
+        run(conn, user_id, args.iterations)
+    finally:
+        if args.cleanup:
+            cleanup(conn)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Write-path overhead of the Idempotency-Key check.
+
+Runs --requests simulated write requests (one conditional UPDATE on a synthetic
+book, then commit) in three modes:
+
+  plain    no Idempotency-Key header
+  keyed    new key per request: claim in the same transaction, then store the response
+  replay   retry of an already-answered key: claim conflict + lookup, route not run
+
+and reports mean and p95 latency per request, plus the overhead of keyed
+over plain. Uses app.services.idempotency_service, i.e. the same statements
+as the @idempotent decorator.
+
+Usage (from lms_backend/, against a scratch database with schema.sql applied):
+    python benchmarks/bench_idempotency.py --requests 2000
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config  # noqa: E402
+from app.services.idempotency_service import (  # noqa: E402
+    key_digest,
+    request_fingerprint,
+    begin_idempotent_request,
+    finish_idempotent_request,
+)
+
+BENCH_ISBN = "BENCH-IDEMPOTENCY"
+BENCH_USER_ID = -1  # keys are scoped by user_id; no users row is needed
+
+
+def connect():
+    return psycopg2.connect(dsn=Config.DATABASE_URL, cursor_factory=RealDictCursor)
+
+
+def setup(conn):
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM books WHERE isbn = %s", (BENCH_ISBN,))
+        cur.execute("DELETE FROM idempotency_keys WHERE user_id = %s", (BENCH_USER_ID,))
+        cur.execute("""
+            INSERT INTO books (title, author, isbn, total_copies, available_copies)
+            VALUES ('Idempotency Benchmark', 'Bench', %s, 1000000, 1000000)
+            RETURNING book_id
+        """, (BENCH_ISBN,))
+        book_id = cur.fetchone()["book_id"]
+    conn.commit()
+    return book_id
+
+
+def cleanup(conn):
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM books WHERE isbn = %s", (BENCH_ISBN,))
+        cur.execute("DELETE FROM idempotency_keys WHERE user_id = %s", (BENCH_USER_ID,))
+    conn.commit()
+
+
+def write(conn, book_id):
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE books SET available_copies = available_copies - 1
+            WHERE book_id = %s AND available_copies > 0
+        """, (book_id,))
+    conn.commit()
+    return {"message": "Book issued successfully"}
+
+
+def run_plain(conn, book_id, keys):
+    for _ in keys:
+        write(conn, book_id)
+        yield
+
+
+def run_keyed(conn, book_id, keys):
+    fingerprint = request_fingerprint("POST", "/borrow/admin/issue?", b'{"book_id": 1}')
+    for key in keys:
+        key_hash = key_digest(key)
+        state, _ = begin_idempotent_request(conn, BENCH_USER_ID, key_hash, fingerprint,
+                                            Config.IDEMPOTENCY_KEY_TTL, Config.IDEMPOTENCY_CLAIM_GRACE)
+        assert state == "new", state
+        body = write(conn, book_id)
+        finish_idempotent_request(conn, BENCH_USER_ID, key_hash, 201, body)
+        yield
+
+
+def run_replay(conn, book_id, keys):
+    fingerprint = request_fingerprint("POST", "/borrow/admin/issue?", b'{"book_id": 1}')
+    for key in keys:
+        state, _ = begin_idempotent_request(conn, BENCH_USER_ID, key_digest(key), fingerprint,
+                                            Config.IDEMPOTENCY_KEY_TTL, Config.IDEMPOTENCY_CLAIM_GRACE)
+        assert state == "replay", state
+        yield
+
+
+def measure(mode, conn, book_id, keys):
+    latencies = []
+    steps = mode(conn, book_id, keys)
+    while True:
+        started = time.perf_counter()
+        try:
+            next(steps)
+        except StopIteration:
+            break
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return sum(latencies) / len(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    if not Config.DATABASE_URL:
+        sys.exit("DATABASE_URL is not configured")
+
+    conn = connect()
+    book_id = setup(conn)
+    keys = [str(uuid.uuid4()) for _ in range(args.requests)]
+    try:
+        results = {}
+        print(f"{'mode':<8}{'mean ms':>10}{'p95 ms':>10}")
+        for name, mode in (("plain", run_plain), ("keyed", run_keyed), ("replay", run_replay)):
+            results[name] = measure(mode, conn, book_id, keys)
+            print(f"{name:<8}{results[name][0]:>10.3f}{results[name][1]:>10.3f}")
+        print(f"keyed overhead: {results['keyed'][0] - results['plain'][0]:.3f} ms per request")
+    finally:
+        cleanup(conn)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Memory use and lookup cost of the in-memory token blocklist.
+
+Revokes --tokens random UUID jtis (expiries spread over the access token
+lifetime) in:
+
+  set           the previous plain set of jti strings (never shrinks)
+  expiring_set  utils.expiring_set.ExpiringSet (time-wheel expiry, memory cap)
+
+and reports memory held (tracemalloc), insert rate, and lookup cost for
+revoked and non-revoked jtis. Needs no database or Redis.
+
+Usage (from lms_backend/):
+    python benchmarks/bench_token_blacklist.py --tokens 1000000
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.expiring_set import ExpiringSet  # noqa: E402
+
+
+def build(kind, jtis, ttls):
+    if kind == "set":
+        store = set()
+        for jti in jtis:
+            store.add(jti)
+    else:
+        store = ExpiringSet(max_entries=len(jtis))
+        for jti, ttl in zip(jtis, ttls):
+            store.add(jti, ttl)
+    return store
+
+
+def measure_memory(kind, jtis, ttls):
+    """Bytes allocated by the store, including the per-token keys it keeps."""
+    keys = [jti.encode().decode() for jti in jtis]  # fresh copies owned by this store only
+    gc.collect()
+    tracemalloc.start()
+    store = build(kind, keys, ttls)
+    memory, _ = tracemalloc.get_traced_memory()
+    del store  # held until measured so its memory is still traced; freed only afterwards
+    tracemalloc.stop()
+    if kind == "set":
+        # the set keeps the jti strings themselves, allocated before tracing started
+        memory += sum(sys.getsizeof(k) for k in keys)
+    return memory
+
+
+def lookup_ns(store, keys):
+    started = time.perf_counter()
+    for key in keys:
+        key in store  # noqa: B015
+    return (time.perf_counter() - started) * 1e9 / len(keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--lifetime", type=int, default=3600, help="access token lifetime in seconds")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    jtis = [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(args.tokens)]
+    ttls = [rng.randint(1, args.lifetime) for _ in range(args.tokens)]
+    revoked = rng.sample(jtis, min(args.lookups, len(jtis)))
+    unknown = [str(uuid.uuid4()) for _ in range(args.lookups)]
+    print(f"{args.tokens} revoked tokens, {args.lookups} lookups of each kind\n")
+    print(f"{'store':<14}{'memory MB':>11}{'B/token':>9}{'inserts/s':>12}{'hit ns':>9}{'miss ns':>9}")
+
+    for kind in ("set", "expiring_set"):
+        memory = measure_memory(kind, jtis, ttls)
+        started = time.perf_counter()
+        store = build(kind, jtis, ttls)
+        elapsed = time.perf_counter() - started
+        hit = lookup_ns(store, revoked)
+        miss = lookup_ns(store, unknown)
+        print(f"{kind:<14}{memory / 2**20:>11.1f}{memory / args.tokens:>9.0f}"
+              f"{args.tokens / elapsed:>12,.0f}{hit:>9.0f}{miss:>9.0f}")
+        del store
+
+
+if __name__ == "__main__":
+    main()
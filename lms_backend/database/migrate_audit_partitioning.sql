@@ -0,0 +1,49 @@
+-- Migration: convert audit_logs into a table range-partitioned by month on created_at
+-- Run once on databases created before partitioning:
+--   1. python init_database.py   (installs lms_ensure_audit_partitions)
+--   2. psql "$DATABASE_URL" -f database/migrate_audit_partitioning.sql
+--   3. python init_database.py   (recreates the audit indexes on every partition)
+-- Takes an exclusive lock on audit_logs for the duration of the copy.
+
+BEGIN;
+
+ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned;
+DROP INDEX IF EXISTS idx_audit_logs_created;
+DROP INDEX IF EXISTS idx_audit_logs_user_created;
+DROP INDEX IF EXISTS idx_audit_logs_action_created;
+DROP INDEX IF EXISTS idx_audit_logs_entity_created;
+
+CREATE TABLE audit_logs (
+    audit_id BIGSERIAL,
+    user_id INTEGER REFERENCES users(user_id) ON DELETE SET NULL,
+    action VARCHAR(100) NOT NULL,
+    entity_type VARCHAR(50),
+    entity_id INTEGER,
+    description TEXT,
+    ip_address VARCHAR(45),
+    user_agent TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (audit_id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- lms_ensure_audit_partitions() comes from schema.sql; cover the oldest existing row
+SELECT lms_ensure_audit_partitions(
+    3,
+    COALESCE((SELECT MIN(created_at)::DATE FROM audit_logs_unpartitioned), CURRENT_DATE)
+);
+
+INSERT INTO audit_logs (audit_id, user_id, action, entity_type, entity_id,
+                        description, ip_address, user_agent, created_at)
+SELECT audit_id, user_id, action, entity_type, entity_id,
+       description, ip_address, user_agent, COALESCE(created_at, CURRENT_TIMESTAMP)
+FROM audit_logs_unpartitioned;
+
+SELECT setval(
+    pg_get_serial_sequence('audit_logs', 'audit_id'),
+    COALESCE((SELECT MAX(audit_id) FROM audit_logs), 0) + 1,
+    false
+);
+
+DROP TABLE audit_logs_unpartitioned;
+
+COMMIT;
@@ -47,6 +47,71 @@ CREATE TABLE IF NOT EXISTS books (
     is_active BOOLEAN DEFAULT TRUE
 );
 
+-- Catalog listing (GET /books): keyset pages on book_id, optionally filtered
+CREATE INDEX IF NOT EXISTS idx_books_active_id
+ON books(book_id)
+WHERE is_active = TRUE;
+
+CREATE INDEX IF NOT EXISTS idx_books_active_category
+ON books(category, book_id)
+WHERE is_active = TRUE;
+
+CREATE INDEX IF NOT EXISTS idx_books_active_author
+ON books(author, book_id)
+WHERE is_active = TRUE;
+
+CREATE INDEX IF NOT EXISTS idx_books_active_available
+ON books(book_id)
+WHERE is_active = TRUE AND available_copies > 0;
+
+-- Catalog search (GET /books/search): weighted full-text vector kept in sync
+-- by Postgres on every INSERT/UPDATE, plus trigram indexes for typo matching
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE books ADD COLUMN IF NOT EXISTS search_vector tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(isbn, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(author, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(category, '')), 'C')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_books_search_vector
+ON books USING GIN (search_vector);
+
+CREATE INDEX IF NOT EXISTS idx_books_title_trgm
+ON books USING GIN (title gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_books_author_trgm
+ON books USING GIN (author gin_trgm_ops);
+
+-- Conditional GET (ETag on GET /books/<id>): bumped by Postgres whenever a
+-- client-visible column of the row changes. The catalog-wide counterpart is the
+-- 'catalog_version' counter in library_counters (see LIBRARY COUNTERS).
+ALTER TABLE books ADD COLUMN IF NOT EXISTS row_version BIGINT NOT NULL DEFAULT 1;
+
+CREATE OR REPLACE FUNCTION lms_books_row_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF (NEW.title, NEW.author, NEW.category, NEW.isbn, NEW.total_copies,
+        NEW.available_copies, NEW.created_at, NEW.is_active)
+       IS DISTINCT FROM
+       (OLD.title, OLD.author, OLD.category, OLD.isbn, OLD.total_copies,
+        OLD.available_copies, OLD.created_at, OLD.is_active) THEN
+        NEW.row_version := OLD.row_version + 1;
+    ELSE
+        NEW.row_version := OLD.row_version;
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_books_row_version ON books;
+CREATE TRIGGER trg_books_row_version
+BEFORE UPDATE ON books
+FOR EACH ROW EXECUTE FUNCTION lms_books_row_version();
+
 
 -- =========================
 -- BORROWS TABLE
@@ -62,11 +127,33 @@ CREATE TABLE IF NOT EXISTS borrows (
         CHECK (borrow_status IN ('PENDING', 'ACTIVE', 'RETURNED', 'REJECTED', 'OVERDUE'))
 );
 
--- Prevent same user borrowing same book twice without returning
-CREATE UNIQUE INDEX IF NOT EXISTS unique_active_borrow
+-- Prevent same user borrowing same book twice without returning.
+-- OVERDUE borrows are still open (set by the scheduled overdue job).
+DROP INDEX IF EXISTS unique_active_borrow;
+CREATE UNIQUE INDEX IF NOT EXISTS unique_open_borrow
 ON borrows(user_id, book_id)
+WHERE borrow_status IN ('ACTIVE', 'OVERDUE');
+
+-- Overdue job: finds ACTIVE borrows past due_date oldest first
+CREATE INDEX IF NOT EXISTS idx_borrows_active_due
+ON borrows(due_date)
 WHERE borrow_status = 'ACTIVE';
 
+-- Student/teacher dashboards: a user's open borrows by due date
+CREATE INDEX IF NOT EXISTS idx_borrows_user_status_due
+ON borrows(user_id, borrow_status, due_date);
+
+-- Admin borrow listing (GET /borrow/admin/all): keyset pages on borrow_id,
+-- newest first, optionally filtered by status, user or book
+CREATE INDEX IF NOT EXISTS idx_borrows_status_id
+ON borrows(borrow_status, borrow_id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_borrows_user_id
+ON borrows(user_id, borrow_id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_borrows_book_id
+ON borrows(book_id, borrow_id DESC);
+
 
 -- =========================
 -- FINE TABLE
@@ -82,6 +169,11 @@ CREATE TABLE IF NOT EXISTS fines (
     CONSTRAINT unique_borrow_fine UNIQUE (borrow_id)
 );
 
+-- Student dashboard: total of a user's unpaid fines
+CREATE INDEX IF NOT EXISTS idx_fines_user_unpaid
+ON fines(user_id)
+WHERE paid_status = FALSE;
+
 
 
 -- =========================
@@ -102,12 +194,20 @@ CREATE UNIQUE INDEX IF NOT EXISTS unique_active_reservation
 ON reservations(user_id, book_id)
 WHERE reservation_status = 'ACTIVE';
 
+-- Reservation expiry sweeper: finds lapsed ACTIVE reservations oldest first
+CREATE INDEX IF NOT EXISTS idx_reservations_active_expiry
+ON reservations(expiry_date)
+WHERE reservation_status = 'ACTIVE';
+
 
 -- =========================
 -- AUDIT LOGS TABLE
 -- =========================
+-- Range-partitioned by month on created_at (audit_logs_yYYYYmMM). Rows outside
+-- every monthly partition land in audit_logs_default. Databases created before
+-- partitioning: run database/migrate_audit_partitioning.sql once.
 CREATE TABLE IF NOT EXISTS audit_logs (
-    audit_id INT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    audit_id BIGSERIAL,
     user_id INTEGER REFERENCES users(user_id) ON DELETE SET NULL,
     action VARCHAR(100) NOT NULL,
     entity_type VARCHAR(50),
@@ -115,6 +215,439 @@ CREATE TABLE IF NOT EXISTS audit_logs (
     description TEXT,
     ip_address VARCHAR(45),
     user_agent TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (audit_id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Create the monthly partitions from p_from's month through p_months_ahead
+-- months after the current one. Returns the number of partitions created.
+-- No-op while audit_logs is still an unpartitioned (pre-migration) table.
+CREATE OR REPLACE FUNCTION lms_ensure_audit_partitions(
+    p_months_ahead INTEGER DEFAULT 3,
+    p_from DATE DEFAULT CURRENT_DATE
+) RETURNS INTEGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_month DATE := date_trunc('month', p_from)::DATE;
+    v_last DATE := (date_trunc('month', CURRENT_DATE) + make_interval(months => p_months_ahead))::DATE;
+    v_name TEXT;
+    v_created INTEGER := 0;
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'audit_logs'::regclass
+    ) THEN
+        RETURN 0;
+    END IF;
+
+    EXECUTE 'CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT';
+
+    WHILE v_month <= v_last LOOP
+        v_name := 'audit_logs_' || to_char(v_month, '"y"YYYY"m"MM');
+        IF to_regclass(v_name) IS NULL THEN
+            -- Built standalone and attached so rows that already fell into the
+            -- default partition for this month are moved instead of blocking it
+            EXECUTE format('CREATE TABLE %I (LIKE audit_logs INCLUDING DEFAULTS)', v_name);
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM audit_logs_default WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved',
+                v_month, (v_month + INTERVAL '1 month')::DATE, v_name
+            );
+            EXECUTE format(
+                'ALTER TABLE audit_logs ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                v_name, v_month, (v_month + INTERVAL '1 month')::DATE
+            );
+            v_created := v_created + 1;
+        END IF;
+        v_month := (v_month + INTERVAL '1 month')::DATE;
+    END LOOP;
+    RETURN v_created;
+END;
+$$;
+
+SELECT lms_ensure_audit_partitions();
+
+-- Admin audit browsing (GET /admin/audit): keyset pages on (created_at, audit_id),
+-- optionally filtered by user, action or entity. Created on every partition.
+CREATE INDEX IF NOT EXISTS idx_audit_logs_created
+ON audit_logs(created_at DESC, audit_id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_audit_logs_user_created
+ON audit_logs(user_id, created_at DESC, audit_id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_audit_logs_action_created
+ON audit_logs(action, created_at DESC, audit_id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_audit_logs_entity_created
+ON audit_logs(entity_type, entity_id, created_at DESC, audit_id DESC);
+
+
+
+-- =========================
+-- JOB RUNS TABLE
+-- =========================
+-- One row per scheduled maintenance run (rows changed, duration, node)
+CREATE TABLE IF NOT EXISTS job_runs (
+    run_id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    job_name VARCHAR(50) NOT NULL,
+    node VARCHAR(100),
+    started_at TIMESTAMP NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    rows_affected INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_runs_job_started
+ON job_runs(job_name, started_at DESC);
+
+
+-- =========================
+-- IDEMPOTENCY KEYS TABLE
+-- =========================
+-- Responses of write requests sent with an Idempotency-Key header, replayed to
+-- retries until expires_at. The key is stored as its SHA-256 digest and the
+-- request (method, path, body) as a 16-byte fingerprint. status_code and
+-- response_body stay NULL while the first request is still running; a claim
+-- still without a response IDEMPOTENCY_CLAIM_GRACE seconds after claimed_at
+-- committed but could not store it, and retries get "already processed".
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    user_id INTEGER NOT NULL,
+    key_hash BYTEA NOT NULL,
+    request_hash BYTEA NOT NULL,
+    status_code SMALLINT,
+    response_body JSONB,
+    claimed_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (user_id, key_hash)
 );
 
+ALTER TABLE idempotency_keys ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMP NOT NULL DEFAULT NOW();
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires
+ON idempotency_keys(expires_at);
+
+
+-- =========================
+-- CIRCULATION FUNCTIONS
+-- =========================
+-- Business-rule failures are raised with SQLSTATE class 'LM'; the message is
+-- user facing and app.models.db.domain_error() turns it into a ValueError.
+
+-- Issue a book in one round trip: conditional copy decrement, duplicate check,
+-- borrow insert and audit row.
+CREATE OR REPLACE FUNCTION lms_issue_book(
+    p_user_id INTEGER,
+    p_book_id INTEGER,
+    p_due_date TIMESTAMP
+) RETURNS INTEGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_borrow_id INTEGER;
+BEGIN
+    UPDATE books
+    SET available_copies = available_copies - 1
+    WHERE book_id = p_book_id AND is_active = TRUE AND available_copies > 0;
+
+    IF NOT FOUND THEN
+        IF EXISTS (SELECT 1 FROM books WHERE book_id = p_book_id AND is_active = TRUE) THEN
+            RAISE EXCEPTION 'Book not available' USING ERRCODE = 'LM002';
+        END IF;
+        RAISE EXCEPTION 'Book not found' USING ERRCODE = 'LM001';
+    END IF;
+
+    IF EXISTS (
+        SELECT 1 FROM borrows
+        WHERE user_id = p_user_id AND book_id = p_book_id
+          AND borrow_status IN ('ACTIVE', 'OVERDUE')
+    ) THEN
+        RAISE EXCEPTION 'User already borrowed this book' USING ERRCODE = 'LM003';
+    END IF;
+
+    INSERT INTO borrows (user_id, book_id, due_date, borrow_status)
+    VALUES (p_user_id, p_book_id, p_due_date, 'ACTIVE')
+    RETURNING borrow_id INTO v_borrow_id;
+
+    INSERT INTO audit_logs (user_id, action, entity_type, entity_id, description)
+    VALUES (p_user_id, 'Borrow Approved', 'BORROW', v_borrow_id,
+            format('Book %s issued to user %s', p_book_id, p_user_id));
+
+    RETURN v_borrow_id;
+END;
+$$;
+
+
+-- Return a book in one round trip: locks the active borrow, marks it returned,
+-- puts the copy back, creates the fine (if late), hands the copy to the oldest
+-- active reservation as a PENDING request, and writes the audit rows.
+-- Returns {"borrow_id", "fine_amount", "fine_id", "auto_assigned_borrow_id"}.
+CREATE OR REPLACE FUNCTION lms_return_book(
+    p_user_id INTEGER,
+    p_book_id INTEGER,
+    p_return_date TIMESTAMP,
+    p_fine_per_day NUMERIC
+) RETURNS JSON
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_borrow_id INTEGER;
+    v_due_date TIMESTAMP;
+    v_fine NUMERIC := 0;
+    v_fine_id INTEGER;
+    v_reservation_id INTEGER;
+    v_reserved_user_id INTEGER;
+    v_auto_borrow_id INTEGER;
+BEGIN
+    SELECT b.borrow_id, b.due_date INTO v_borrow_id, v_due_date
+    FROM borrows b
+    WHERE b.user_id = p_user_id AND b.book_id = p_book_id
+      AND b.borrow_status IN ('ACTIVE', 'OVERDUE')
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'No active borrow found for this book' USING ERRCODE = 'LM004';
+    END IF;
+
+    -- Same rule as fine_service.calculate_fine: whole days late * rate
+    IF p_return_date > v_due_date THEN
+        v_fine := floor(extract(epoch FROM p_return_date - v_due_date) / 86400)::int * p_fine_per_day;
+    END IF;
+
+    UPDATE borrows
+    SET return_date = CURRENT_TIMESTAMP, borrow_status = 'RETURNED'
+    WHERE borrows.borrow_id = v_borrow_id;
+
+    UPDATE books
+    SET available_copies = available_copies + 1
+    WHERE book_id = p_book_id AND is_active = TRUE AND available_copies < total_copies;
+
+    IF v_fine > 0 THEN
+        INSERT INTO fines (borrow_id, user_id, amount, paid_status, created_at)
+        VALUES (v_borrow_id, p_user_id, v_fine, FALSE, NOW())
+        RETURNING fines.fine_id INTO v_fine_id;
+
+        INSERT INTO audit_logs (user_id, action, entity_type, entity_id, description)
+        VALUES
+            (p_user_id, 'Fine Created', 'FINE', v_fine_id,
+             format('Fine %s created for borrow %s, amount Rs %s', v_fine_id, v_borrow_id, v_fine)),
+            (p_user_id, 'Fine Generated', 'FINE', v_fine_id,
+             format('Fine %s generated for borrow %s, amount Rs %s', v_fine_id, v_borrow_id, v_fine));
+    END IF;
+
+    SELECT r.reservation_id, r.user_id INTO v_reservation_id, v_reserved_user_id
+    FROM reservations r
+    WHERE r.book_id = p_book_id AND r.reservation_status = 'ACTIVE'
+      AND (r.expiry_date IS NULL OR r.expiry_date >= NOW())
+    ORDER BY r.reservation_date ASC
+    LIMIT 1
+    FOR UPDATE;
+
+    IF FOUND THEN
+        -- PENDING request, no copy decrement: admin approves later
+        INSERT INTO borrows (user_id, book_id, due_date, borrow_status)
+        VALUES (v_reserved_user_id, p_book_id, CURRENT_TIMESTAMP + INTERVAL '7 days', 'PENDING')
+        RETURNING borrows.borrow_id INTO v_auto_borrow_id;
+
+        UPDATE reservations
+        SET reservation_status = 'FULFILLED'
+        WHERE reservation_id = v_reservation_id;
+
+        INSERT INTO audit_logs (user_id, action, entity_type, entity_id, description)
+        VALUES (v_reserved_user_id, 'Reservation Fulfilled', 'RESERVATION', v_reservation_id,
+                format('Book %s – reservation fulfilled, borrow request created for admin approval', p_book_id));
+    END IF;
+
+    INSERT INTO audit_logs (user_id, action, entity_type, entity_id, description)
+    VALUES (p_user_id, 'Book Returned', 'BORROW', v_borrow_id,
+            format('Book %s returned by user %s', p_book_id, p_user_id));
+
+    RETURN json_build_object(
+        'borrow_id', v_borrow_id,
+        'fine_amount', v_fine,
+        'fine_id', v_fine_id,
+        'auto_assigned_borrow_id', v_auto_borrow_id
+    );
+END;
+$$;
+
+
+
+-- =========================
+-- LIBRARY COUNTERS
+-- =========================
+-- Library-wide totals for the admin dashboard, kept current by statement-level
+-- triggers on borrows, books, users and fines. Each counter is spread over a few
+-- slots (picked by backend pid) so concurrent transactions rarely wait on the
+-- same row; the value is SUM(value) over the counter's slots.
+-- `python manage.py reconcile-counters` recomputes them and reports drift.
+-- 'catalog_version' is not a total but a change counter for the books table;
+-- it has no computed value and reconciliation leaves it alone.
+CREATE TABLE IF NOT EXISTS library_counters (
+    counter_name VARCHAR(50) NOT NULL,
+    slot SMALLINT NOT NULL DEFAULT 0,
+    value NUMERIC(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (counter_name, slot)
+);
+
+-- Counter values computed from scratch (seeding and reconciliation)
+CREATE OR REPLACE FUNCTION lms_compute_counters()
+RETURNS TABLE (counter_name VARCHAR, value NUMERIC)
+LANGUAGE sql STABLE AS $$
+    SELECT 'total_issued_books'::VARCHAR, COUNT(*)::NUMERIC
+    FROM borrows WHERE borrow_status IN ('ACTIVE', 'OVERDUE')
+    UNION ALL
+    SELECT 'total_available_books', COALESCE(SUM(available_copies), 0)
+    FROM books WHERE is_active = TRUE
+    UNION ALL
+    SELECT 'total_students', COUNT(*)
+    FROM users WHERE role_id = 3 AND status = 'APPROVED'
+    UNION ALL
+    SELECT 'total_teachers', COUNT(*)
+    FROM users WHERE role_id = 2 AND status = 'APPROVED'
+    UNION ALL
+    SELECT 'total_fine_collected', COALESCE(SUM(amount), 0)
+    FROM fines WHERE paid_status = TRUE
+$$;
+
+CREATE OR REPLACE FUNCTION lms_bump_counter(p_name VARCHAR, p_delta NUMERIC)
+RETURNS VOID
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF p_delta IS NULL OR p_delta = 0 THEN
+        RETURN;
+    END IF;
+    INSERT INTO library_counters (counter_name, slot, value)
+    VALUES (p_name, pg_backend_pid() % 8, p_delta)
+    ON CONFLICT (counter_name, slot)
+    DO UPDATE SET value = library_counters.value + EXCLUDED.value;
+END;
+$$;
+
+-- Trigger functions read the statement's transition tables: new_rows for
+-- INSERT/UPDATE, old_rows for UPDATE/DELETE.
+CREATE OR REPLACE FUNCTION lms_counters_borrows()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_delta NUMERIC := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT v_delta + COUNT(*) INTO v_delta
+        FROM new_rows WHERE borrow_status IN ('ACTIVE', 'OVERDUE');
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT v_delta - COUNT(*) INTO v_delta
+        FROM old_rows WHERE borrow_status IN ('ACTIVE', 'OVERDUE');
+    END IF;
+    PERFORM lms_bump_counter('total_issued_books', v_delta);
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION lms_counters_books()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_delta NUMERIC := 0;
+    v_changed BOOLEAN;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT v_delta + COALESCE(SUM(available_copies), 0) INTO v_delta
+        FROM new_rows WHERE is_active = TRUE;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT v_delta - COALESCE(SUM(available_copies), 0) INTO v_delta
+        FROM old_rows WHERE is_active = TRUE;
+    END IF;
+    PERFORM lms_bump_counter('total_available_books', v_delta);
+
+    -- catalog_version: +1 per statement that changed any book the catalog shows.
+    -- Transactional, so it moves together with the rows it describes (ETags on GET /books).
+    IF TG_OP = 'INSERT' THEN
+        v_changed := EXISTS (SELECT 1 FROM new_rows);
+    ELSIF TG_OP = 'DELETE' THEN
+        v_changed := EXISTS (SELECT 1 FROM old_rows);
+    ELSE
+        v_changed := EXISTS (
+            SELECT 1 FROM new_rows n JOIN old_rows o ON o.book_id = n.book_id
+            WHERE n.row_version <> o.row_version
+        );
+    END IF;
+    PERFORM lms_bump_counter('catalog_version', v_changed::INT);
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION lms_counters_users()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_students NUMERIC := 0;
+    v_teachers NUMERIC := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT v_students + COUNT(*) FILTER (WHERE role_id = 3),
+               v_teachers + COUNT(*) FILTER (WHERE role_id = 2)
+        INTO v_students, v_teachers
+        FROM new_rows WHERE status = 'APPROVED';
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT v_students - COUNT(*) FILTER (WHERE role_id = 3),
+               v_teachers - COUNT(*) FILTER (WHERE role_id = 2)
+        INTO v_students, v_teachers
+        FROM old_rows WHERE status = 'APPROVED';
+    END IF;
+    PERFORM lms_bump_counter('total_students', v_students);
+    PERFORM lms_bump_counter('total_teachers', v_teachers);
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION lms_counters_fines()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_delta NUMERIC := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT v_delta + COALESCE(SUM(amount), 0) INTO v_delta
+        FROM new_rows WHERE paid_status = TRUE;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT v_delta - COALESCE(SUM(amount), 0) INTO v_delta
+        FROM old_rows WHERE paid_status = TRUE;
+    END IF;
+    PERFORM lms_bump_counter('total_fine_collected', v_delta);
+    RETURN NULL;
+END;
+$$;
+
+-- Transition tables need one trigger per event
+DO $$
+DECLARE
+    v_table TEXT;
+BEGIN
+    FOREACH v_table IN ARRAY ARRAY['borrows', 'books', 'users', 'fines'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_counters_insert ON %I', v_table, v_table);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_counters_update ON %I', v_table, v_table);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_counters_delete ON %I', v_table, v_table);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%s_counters_insert AFTER INSERT ON %I '
+            'REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION lms_counters_%s()',
+            v_table, v_table, v_table
+        );
+        EXECUTE format(
+            'CREATE TRIGGER trg_%s_counters_update AFTER UPDATE ON %I '
+            'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION lms_counters_%s()',
+            v_table, v_table, v_table
+        );
+        EXECUTE format(
+            'CREATE TRIGGER trg_%s_counters_delete AFTER DELETE ON %I '
+            'REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION lms_counters_%s()',
+            v_table, v_table, v_table
+        );
+    END LOOP;
+END;
+$$;
+
+-- Seed once, when the table is first created on an existing database
+INSERT INTO library_counters (counter_name, slot, value)
+SELECT c.counter_name, 0, c.value
+FROM lms_compute_counters() c
+WHERE NOT EXISTS (SELECT 1 FROM library_counters);
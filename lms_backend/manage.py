@@ -0,0 +1,99 @@
+"""
+Maintenance commands for the LMS backend.
+
+    python manage.py worker                 # run scheduled jobs until interrupted
+    python manage.py run-job <job_name>     # run one scheduled job once, e.g. mark_overdue
+    python manage.py reconcile-counters     # report drift in library_counters (--fix to repair)
+    python manage.py import-books <file>    # bulk-load a CSV/NDJSON catalog feed (--on-conflict update)
+"""
+import argparse
+import os
+import sys
+
+from app.models.db import pooled_connection
+from app.services.book_import_service import import_books, ON_CONFLICT_POLICIES
+from app.services.counters_service import reconcile_counters
+from app.utils.import_formats import detect_format
+from app.services.scheduler import build_scheduler
+
+
+def cmd_worker(args):
+    scheduler = build_scheduler()
+    print("Starting worker with jobs:", ", ".join(scheduler.job_names))
+    scheduler.start()
+    try:
+        scheduler.wait()
+    except KeyboardInterrupt:
+        print("Stopping worker...")
+        scheduler.stop()
+
+
+def cmd_run_job(args):
+    scheduler = build_scheduler()
+    if args.job not in scheduler.job_names:
+        print(f"Unknown job '{args.job}'. Available: {', '.join(scheduler.job_names)}")
+        sys.exit(1)
+    result = scheduler.run_once(args.job)
+    print(f"{args.job}: {result} ({scheduler.last_results[args.job]['duration_ms']} ms)")
+
+
+def cmd_reconcile_counters(args):
+    with pooled_connection() as conn:
+        report = reconcile_counters(conn, fix=args.fix)
+    drifted = 0
+    for name, row in report.items():
+        marker = ""
+        if row["drift"]:
+            drifted += 1
+            marker = "  <- fixed" if args.fix else "  <- drift"
+        print(f"{name:<24} stored={row['stored']} actual={row['actual']} drift={row['drift']}{marker}")
+    if drifted and not args.fix:
+        print(f"{drifted} counter(s) drifted. Re-run with --fix to repair.")
+        sys.exit(2)
+
+
+def cmd_import_books(args):
+    with open(args.file, "rb") as f:
+        raw = f.read()
+    fmt = detect_format(args.file, None, args.format)
+    with pooled_connection() as conn:
+        report = import_books(conn, raw, fmt, args.admin_id, on_conflict=args.on_conflict,
+                              source=os.path.basename(args.file))
+    print(f"{report['total_rows']} rows: {report['created']} created, {report['updated']} updated, "
+          f"{report['skipped']} skipped, {report['failed']} rejected")
+    for error in report["errors"][:20]:
+        print(f"  line {error['line']} ({error['isbn']}): {error['errors']}")
+    if report["failed"] > 20:
+        print(f"  ... {report['failed'] - 20} more")
+    if report["failed"]:
+        sys.exit(2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LMS maintenance commands")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("worker", help="run scheduled jobs until interrupted").set_defaults(func=cmd_worker)
+
+    run_job = sub.add_parser("run-job", help="run one scheduled job once")
+    run_job.add_argument("job")
+    run_job.set_defaults(func=cmd_run_job)
+
+    reconcile = sub.add_parser("reconcile-counters", help="recompute library_counters and report drift")
+    reconcile.add_argument("--fix", action="store_true", help="overwrite drifted counters")
+    reconcile.set_defaults(func=cmd_reconcile_counters)
+
+    books = sub.add_parser("import-books", help="bulk-load books from a CSV/NDJSON file")
+    books.add_argument("file")
+    books.add_argument("--format", choices=("csv", "ndjson"), help="default: from the file extension")
+    books.add_argument("--on-conflict", choices=ON_CONFLICT_POLICIES, default="skip",
+                       help="what to do with ISBNs already in the catalog")
+    books.add_argument("--admin-id", type=int, help="user recorded in the audit entry")
+    books.set_defaults(func=cmd_import_books)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,8 +12,11 @@ from app.routes.reservation_routes import reservation_bp
 from app.routes.fine_routes import fine_bp
 from app.routes.audit_routes import audit_bp
 from app.routes.stats_routes import stats_bp
+from app.routes.metrics_routes import metrics_bp
+from app.routes.export_routes import export_bp
 from app.utils.token_blacklist import is_token_blacklisted
 from app.utils.error_handlers import register_error_handlers
+from app.services.scheduler import build_scheduler
 
 
 def create_app():
@@ -71,6 +74,8 @@ def create_app():
     app.register_blueprint(fine_bp, url_prefix="/fine")
     app.register_blueprint(audit_bp, url_prefix="/admin/audit")
     app.register_blueprint(stats_bp, url_prefix="/stats")
+    app.register_blueprint(metrics_bp, url_prefix="/admin/metrics")
+    app.register_blueprint(export_bp, url_prefix="/export")
 
     # ==========================
     # Home Route
@@ -84,6 +89,14 @@ def create_app():
     # ==========================
     register_error_handlers(app)
 
+    # ==========================
+    # In-process background jobs (optional; see manage.py worker)
+    # ==========================
+    if Config.SCHEDULER_ENABLED:
+        scheduler = build_scheduler()
+        scheduler.start()
+        app.extensions["scheduler"] = scheduler
+
     return app
 
 
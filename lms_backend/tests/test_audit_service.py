@@ -0,0 +1,181 @@
+from contextlib import contextmanager
+
+from app.config import Config
+from app.services import audit_service
+from app.services.audit_buffer import AuditBuffer
+
+
+class RecordingConn:
+    def __init__(self):
+        self.statements = []
+        self.committed = False
+
+    class _Cur:
+        def __init__(self, conn):
+            self.conn = conn
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            return False
+
+        def execute(self, sql, params=None):
+            self.conn.statements.append((sql, params))
+
+    def cursor(self, *args, **kwargs):
+        return RecordingConn._Cur(self)
+
+    def commit(self):
+        self.committed = True
+
+
+def test_transactional_mode_inserts_on_callers_connection(monkeypatch):
+    monkeypatch.setattr(Config, "AUDIT_SINK_MODE", "transactional")
+    conn = RecordingConn()
+
+    audit_service.log_action(conn, 1, "User Login", "USER", 1, "login")
+
+    assert len(conn.statements) == 1
+    assert "INSERT INTO audit_logs" in conn.statements[0][0]
+
+
+def test_buffered_mode_queues_except_transactional_entities(monkeypatch):
+    monkeypatch.setattr(Config, "AUDIT_SINK_MODE", "buffered")
+    monkeypatch.setattr(Config, "AUDIT_TRANSACTIONAL_ENTITIES", {"FINE"})
+    buffer = AuditBuffer()
+    monkeypatch.setattr(audit_service, "get_audit_buffer", lambda: buffer)
+    conn = RecordingConn()
+
+    audit_service.log_action(conn, 1, "User Login", "USER", 1, "login")
+    audit_service.log_action(conn, 1, "Fine Paid", "FINE", 9, "paid")
+
+    assert buffer.stats()["pending"] == 1
+    assert len(conn.statements) == 1
+    assert conn.statements[0][1][1] == "Fine Paid"
+
+
+def test_flush_writes_batch_and_requeues_on_failure(monkeypatch):
+    conn = RecordingConn()
+    written = []
+
+    @contextmanager
+    def fake_pool():
+        yield conn
+
+    monkeypatch.setattr('app.services.audit_buffer.pooled_connection', fake_pool)
+    monkeypatch.setattr('app.services.audit_buffer.execute_values',
+                        lambda cur, sql, rows, page_size: written.extend(rows))
+    buffer = AuditBuffer(batch_size=10)
+    buffer.add((1, "A", "USER", 1, "a", None))
+    buffer.add((2, "B", "USER", 2, "b", None))
+
+    assert buffer.flush() == 2
+    assert len(written) == 2 and conn.committed
+    assert buffer.stats()["pending"] == 0
+
+    def broken(cur, sql, rows, page_size):
+        raise Exception("connection refused")
+
+    monkeypatch.setattr('app.services.audit_buffer.execute_values', broken)
+    buffer.add((3, "C", "USER", 3, "c", None))
+    assert buffer.flush() == 0
+    assert buffer.stats()["pending"] == 1
+    assert buffer.stats()["failures"] == 1
+
+
+def test_requeue_after_failed_flush_respects_max_pending(monkeypatch):
+    @contextmanager
+    def fake_pool():
+        yield RecordingConn()
+
+    buffer = AuditBuffer(batch_size=10, max_pending=3)
+
+    def broken(cur, sql, rows, page_size):
+        # entries queued by request threads while the insert was failing
+        buffer.add((4, "D", "USER", 4, "d", None))
+        buffer.add((5, "E", "USER", 5, "e", None))
+        raise Exception("connection refused")
+
+    monkeypatch.setattr('app.services.audit_buffer.pooled_connection', fake_pool)
+    monkeypatch.setattr('app.services.audit_buffer.execute_values', broken)
+    for n in (1, 2, 3):
+        buffer.add((n, "A", "USER", n, "a", None))
+
+    assert buffer.flush() == 0
+    assert buffer.stats()["pending"] == 3
+    assert buffer.stats()["dropped"] == 2
+    assert [entry[0] for entry in buffer._entries] == [3, 4, 5]
+
+
+def test_legacy_page_offsets_in_sql_and_fetches_only_limit_rows(monkeypatch):
+    class Cursor:
+        def __init__(self, conn):
+            self.conn = conn
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, sql, params):
+            self.conn.queries.append((" ".join(sql.split()), params))
+
+        def fetchall(self):
+            limit, offset = self.conn.queries[-1][1][-2:]
+            return [{"audit_id": n} for n in range(offset, offset + limit)]
+
+    class Conn:
+        def __init__(self):
+            self.queries = []
+
+        def cursor(self, cursor_factory=None):
+            return Cursor(self)
+
+    conn = Conn()
+    rows = audit_service.get_audit_logs(conn, limit=20, offset=10_000)
+
+    assert len(rows) == 20
+    assert rows[0]["audit_id"] == 10_000
+    # a single round trip; the database skips the first 10,000 rows
+    assert len(conn.queries) == 1
+    sql, params = conn.queries[0]
+    assert sql.endswith("ORDER BY created_at DESC, audit_id DESC LIMIT %s OFFSET %s")
+    assert params == [20, 10_000]
+
+
+def test_rotation_archives_and_drops_only_expired_partitions(monkeypatch, tmp_path):
+    from datetime import date
+    from app.services import audit_retention_service as retention
+
+    class Conn:
+        def commit(self):
+            pass
+
+        def rollback(self):
+            pass
+
+    dropped = []
+    monkeypatch.setattr(retention, "try_advisory_lock", lambda conn, key: True)
+    monkeypatch.setattr(retention, "advisory_unlock", lambda conn, key: None)
+    monkeypatch.setattr(retention, "record_job_run", lambda *args: None)
+    monkeypatch.setattr(retention, "ensure_audit_partitions", lambda conn, ahead: 1)
+    monkeypatch.setattr(retention, "get_audit_partitions", lambda conn: [
+        (date(2099, 1, 1), "audit_logs_y2099m01"),
+        (date(2001, 2, 1), "audit_logs_y2001m02"),
+        (date(2001, 1, 1), "audit_logs_y2001m01"),
+    ])
+    monkeypatch.setattr(retention, "copy_audit_partition",
+                        lambda conn, name, fileobj: fileobj.write(b"audit_id\n1\n"))
+    monkeypatch.setattr(retention, "drop_audit_partition", lambda conn, name: dropped.append(name))
+
+    result = retention.rotate_audit_partitions(Conn(), retain_months=12, archive_dir=str(tmp_path))
+
+    assert result["created"] == 1
+    assert result["archived"] == ["audit_logs_y2001m01", "audit_logs_y2001m02"]
+    assert dropped == result["archived"]
+    import gzip
+    with gzip.open(tmp_path / "audit_logs_y2001m01.csv.gz") as f:
+        assert f.read() == b"audit_id\n1\n"
+    assert not list(tmp_path.glob("*.part"))
@@ -0,0 +1,133 @@
+import pytest
+
+from app.services import borrow_service, user_service
+from app.utils.batch import parse_ids, batch_response
+
+
+class DummyConn:
+    def __init__(self):
+        self.committed = False
+        self.rolled_back = False
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+def test_parse_ids_dedupes_and_validates():
+    assert parse_ids([3, 1, 3, 2]) == [3, 1, 2]
+    with pytest.raises(ValueError):
+        parse_ids([])
+    with pytest.raises(ValueError):
+        parse_ids([1, "2"])
+    with pytest.raises(ValueError):
+        parse_ids([True])
+    with pytest.raises(ValueError):
+        parse_ids([1, 2, 3], maximum=2)
+
+
+def test_batch_response_keeps_request_order():
+    body = batch_response([2, 1], {1: "approved", 2: "not_found"}, id_key="user_id")
+    assert body["results"] == [{"user_id": 2, "outcome": "not_found"}, {"user_id": 1, "outcome": "approved"}]
+    assert body["summary"] == {"approved": 1, "not_found": 1}
+
+
+def test_approve_users_batch_one_update_and_one_audit_insert(monkeypatch):
+    calls = []
+    monkeypatch.setattr(user_service, "update_users_status",
+                        lambda conn, ids, status, by: calls.append(("update", ids)) or {1, 3})
+    monkeypatch.setattr(user_service, "log_actions",
+                        lambda conn, user_id, action, table_name, entries: calls.append(("audit", entries)))
+    monkeypatch.setattr(user_service, "invalidate_admin_stats", lambda: calls.append(("invalidate",)))
+    conn = DummyConn()
+
+    outcomes = user_service.approve_or_reject_users(conn, [1, 2, 3], "APPROVED", approved_by=9)
+
+    assert outcomes == {1: "approved", 2: "not_found", 3: "approved"}
+    assert [c[0] for c in calls] == ["update", "audit", "invalidate"]
+    assert [record_id for record_id, _ in calls[1][1]] == [1, 3]
+    assert conn.committed
+
+
+def test_approve_borrows_merges_precheck_and_set_based_outcomes(monkeypatch):
+    locked = {
+        10: {"borrow_id": 10, "borrow_status": "PENDING"},
+        11: {"borrow_id": 11, "borrow_status": "PENDING"},
+        12: {"borrow_id": 12, "borrow_status": "ACTIVE"},
+        13: {"borrow_id": 13, "borrow_status": "PENDING"},
+    }
+    audits = []
+    monkeypatch.setattr(borrow_service, "lock_borrows", lambda conn, ids: locked)
+    monkeypatch.setattr(borrow_service, "approve_pending_borrows", lambda conn, ids, due: [
+        {"borrow_id": 10, "user_id": 1, "book_id": 5, "outcome": "approved"},
+        {"borrow_id": 11, "user_id": 2, "book_id": 5, "outcome": "unavailable"},
+        {"borrow_id": 13, "user_id": 3, "book_id": 6, "outcome": "already_borrowed"},
+    ])
+    monkeypatch.setattr(borrow_service, "log_actions",
+                        lambda conn, user_id, action, table_name, entries: audits.extend(entries))
+    monkeypatch.setattr(borrow_service, "invalidate_admin_stats", lambda: None)
+    conn = DummyConn()
+
+    outcomes = borrow_service.approve_borrows(conn, [10, 11, 12, 13, 99], admin_id=1)
+
+    assert outcomes == {10: "approved", 11: "unavailable", 12: "not_pending",
+                        13: "already_borrowed", 99: "not_found"}
+    assert [record_id for record_id, _ in audits] == [10]
+    assert conn.committed
+
+
+def test_reject_borrows_rolls_back_on_error(monkeypatch):
+    monkeypatch.setattr(borrow_service, "lock_borrows",
+                        lambda conn, ids: {1: {"borrow_id": 1, "borrow_status": "PENDING"}})
+
+    def boom(conn, ids):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(borrow_service, "reject_pending_borrows", boom)
+    conn = DummyConn()
+
+    with pytest.raises(RuntimeError):
+        borrow_service.reject_borrows(conn, [1], admin_id=1)
+    assert conn.rolled_back and not conn.committed
+
+
+def test_issue_books_commits_once_and_reports_per_book(monkeypatch):
+    calls = []
+
+    def fake_issue(conn, user_id, book_ids, due_date):
+        calls.append(book_ids)
+        return [
+            {"book_id": 7, "outcome": "issued", "borrow_id": 70},
+            {"book_id": 8, "outcome": "unavailable", "borrow_id": None},
+        ]
+
+    monkeypatch.setattr(borrow_service, "issue_books_batch", fake_issue)
+    monkeypatch.setattr(borrow_service, "invalidate_admin_stats", lambda: calls.append("invalidate"))
+    conn = DummyConn()
+
+    results = borrow_service.issue_books(conn, 3, [7, 8])
+
+    assert results == {7: {"outcome": "issued", "borrow_id": 70},
+                       8: {"outcome": "unavailable", "borrow_id": None}}
+    assert calls == [[7, 8], "invalidate"]
+    assert conn.committed
+
+
+def test_return_books_passes_fine_rate_and_skips_invalidation_when_nothing_returned(monkeypatch):
+    seen = {}
+
+    def fake_return(conn, user_id, book_ids, return_date, fine_per_day):
+        seen["fine_per_day"] = fine_per_day
+        return [{"book_id": 4, "outcome": "not_borrowed", "borrow_id": None, "fine_amount": None,
+                 "fine_id": None, "auto_assigned_borrow_id": None}]
+
+    monkeypatch.setattr(borrow_service, "return_books_batch", fake_return)
+    monkeypatch.setattr(borrow_service, "invalidate_admin_stats",
+                        lambda: pytest.fail("nothing changed, cache must stay"))
+
+    results = borrow_service.return_books(DummyConn(), 3, [4])
+
+    assert results[4]["outcome"] == "not_borrowed"
+    assert seen["fine_per_day"] == borrow_service.FINE_PER_DAY
@@ -0,0 +1,68 @@
+import csv
+
+import pytest
+
+from app.services import book_import_service
+
+
+class DummyConn:
+    def __init__(self):
+        self.committed = False
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+
+NDJSON_UPLOAD = (
+    '{"title": "Dune", "author": "Frank Herbert", "isbn": "9780441013593", "total_copies": 3}\n'
+    'not json\n'
+    '{"title": "Emma", "author": "Jane Austen", "isbn": "9780141439587", "total_copies": "x"}\n'
+).encode()
+
+
+def test_rows_are_staged_raw_and_validated_in_sql(monkeypatch):
+    staged = {}
+    audits = []
+
+    def fake_bulk_import(conn, rows_csv, on_conflict, max_errors):
+        staged["rows"] = list(csv.reader(rows_csv))
+        staged["on_conflict"] = on_conflict
+        return {"created": 1, "updated": 0, "skipped": 0, "failed": 1,
+                "errors": [{"line": 3, "isbn": "9780141439587",
+                            "errors": {"total_copies": ["Must be a whole number"]}}]}
+
+    monkeypatch.setattr(book_import_service, "bulk_import_books", fake_bulk_import)
+    monkeypatch.setattr(book_import_service, "log_action", lambda *args, **kwargs: audits.append(kwargs))
+    monkeypatch.setattr(book_import_service, "invalidate_admin_stats", lambda: None)
+    conn = DummyConn()
+
+    report = book_import_service.import_books(conn, NDJSON_UPLOAD, "ndjson", admin_id=1, source="feed.ndjson")
+
+    # Values go to staging untouched (as text); SQL decides what is valid
+    assert staged["rows"] == [
+        ["1", "Dune", "Frank Herbert", "", "9780441013593", "3", ""],
+        ["3", "Emma", "Jane Austen", "", "9780141439587", "x", ""],
+    ]
+    assert staged["on_conflict"] == "skip"
+    assert report["total_rows"] == 3
+    assert report["created"] == 1 and report["failed"] == 2
+    assert [e["line"] for e in report["errors"]] == [2, 3]
+    assert len(audits) == 1 and "1 created" in audits[0]["description"] and "feed.ndjson" in audits[0]["description"]
+    assert conn.committed
+
+
+def test_unknown_policy_and_empty_upload_are_rejected():
+    with pytest.raises(ValueError):
+        book_import_service.import_books(DummyConn(), b"title\n", "csv", admin_id=1, on_conflict="replace")
+    with pytest.raises(ValueError):
+        book_import_service.import_books(DummyConn(), b"title,author,isbn,total_copies\n", "csv", admin_id=1)
+
+
+def test_row_limit(monkeypatch):
+    monkeypatch.setattr(book_import_service.Config, "BOOK_IMPORT_MAX_ROWS", 2)
+    upload = b"title,author,isbn,total_copies\n" + b"".join(b"T%d,A,%d,1\n" % (i, i) for i in range(3))
+    with pytest.raises(ValueError):
+        book_import_service.import_books(DummyConn(), upload, "csv", admin_id=1)
@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.services import borrow_service
+from app.utils.pagination import encode_cursor
+
+
+class DummyConn:
+    def __init__(self):
+        self.rolled_back = False
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+def make_row(borrow_id):
+    row = {column: None for column in borrow_service.BORROW_LISTING_COLUMNS}
+    row.update(borrow_id=borrow_id, borrow_status="RETURNED", book_title="Dune, Part 1",
+               issue_date=datetime(2024, 3, 1, 9, 30), available_copies=Decimal("2"))
+    return row
+
+
+def test_page_fetches_one_extra_row_and_returns_cursor(monkeypatch):
+    seen = {}
+
+    def fake_list(conn, limit, before_id, **filters):
+        seen.update(limit=limit, before_id=before_id, filters=filters)
+        return [make_row(i) for i in (9, 8, 7)]
+
+    monkeypatch.setattr(borrow_service, "list_borrows", fake_list)
+
+    page = borrow_service.fetch_borrows_page(DummyConn(), limit=2, cursor=encode_cursor(10), status="RETURNED")
+
+    assert [row["borrow_id"] for row in page["items"]] == [9, 8]
+    assert page["next_cursor"] == encode_cursor(8)
+    assert seen == {"limit": 3, "before_id": 10, "filters": {"status": "RETURNED"}}
+
+
+def test_invalid_status_and_cursor_are_rejected():
+    with pytest.raises(ValueError):
+        borrow_service.fetch_borrows_page(DummyConn(), limit=10, status="LOST")
+    with pytest.raises(ValueError):
+        borrow_service.fetch_borrows_page(DummyConn(), limit=10, cursor="not-a-cursor")
+
+
+@pytest.mark.parametrize("fmt", ["json", "csv"])
+def test_export_streams_all_rows_and_ends_transaction(monkeypatch, fmt):
+    monkeypatch.setattr(borrow_service, "iter_borrows",
+                        lambda conn, chunk_size, **filters: (make_row(i) for i in range(1200, 0, -1)))
+    conn = DummyConn()
+
+    chunks = list(borrow_service.export_borrows(conn, fmt))
+    body = "".join(chunks)
+
+    assert len(chunks) >= 3  # 500-row chunks, not one string
+    if fmt == "json":
+        rows = json.loads(body)
+        assert rows[0]["issue_date"] == "2024-03-01T09:30:00"
+        assert rows[0]["available_copies"] == "2"
+    else:
+        rows = list(csv.DictReader(io.StringIO(body)))
+        assert rows[0]["book_title"] == "Dune, Part 1"
+    assert len(rows) == 1200
+    assert conn.rolled_back
+
+
+def test_export_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        borrow_service.export_borrows(DummyConn(), "xml")
@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta
+import pytest
 
 from app.services.borrow_service import issue_book, return_borrowed_book
 
@@ -36,12 +36,7 @@ def test_issue_book_happy_path(monkeypatch):
     conn = DummyConn()
 
     # Monkeypatch dependencies
-    monkeypatch.setattr('app.services.borrow_service.expire_overdue_reservations', lambda c: None)
-    monkeypatch.setattr('app.services.borrow_service.get_book_by_id', lambda c, bid: {'book_id': bid, 'available_copies': 3})
-    monkeypatch.setattr('app.services.borrow_service.get_active_borrow', lambda c, uid, bid: None)
-    monkeypatch.setattr('app.services.borrow_service.update_book_copies', lambda c, bid, n: None)
-    monkeypatch.setattr('app.services.borrow_service.create_borrow', lambda c, uid, bid, due: 101)
-    monkeypatch.setattr('app.services.borrow_service.log_action', lambda *a, **k: None)
+    monkeypatch.setattr('app.services.borrow_service.issue_book_atomic', lambda c, uid, bid, due: 101)
 
     borrow_id = issue_book(conn, user_id=10, book_id=5)
 
@@ -51,25 +46,45 @@ def test_issue_book_happy_path(monkeypatch):
 
 def test_return_borrow_with_fine_and_auto_assign(monkeypatch):
     conn = DummyConn()
+    calls = {}
 
-    # Setup active borrow returned by DAO
-    past_due = datetime.utcnow() - timedelta(days=5)
-    monkeypatch.setattr('app.services.borrow_service.get_active_borrow', lambda c, uid, bid: {'borrow_id': 200, 'due_date': past_due})
-    monkeypatch.setattr('app.services.borrow_service.calculate_fine', lambda due, ret: 25)
-    monkeypatch.setattr('app.services.borrow_service.return_book_record', lambda c, bid: None)
-    monkeypatch.setattr('app.services.borrow_service.get_book_by_id', lambda c, bid: {'book_id': bid, 'available_copies': 2})
-    monkeypatch.setattr('app.services.borrow_service.update_book_copies', lambda c, bid, n: None)
-    monkeypatch.setattr('app.services.borrow_service.create_fine', lambda c, bid, uid, amt: 42)
+    def fake_return(c, uid, bid, return_date, fine_per_day):
+        calls['args'] = (uid, bid, fine_per_day)
+        return {'borrow_id': 200, 'fine_amount': 25, 'fine_id': 42, 'auto_assigned_borrow_id': 303}
 
-    # Reservation exists and leads to auto-assign
-    monkeypatch.setattr('app.services.borrow_service.get_oldest_active_reservation', lambda c, bid: {'reservation_id': 7, 'user_id': 55})
-    monkeypatch.setattr('app.services.borrow_service.create_borrow', lambda c, uid, bid, due: 303)
-    monkeypatch.setattr('app.services.borrow_service.mark_reservation_fulfilled', lambda c, rid: None)
-    monkeypatch.setattr('app.services.borrow_service.log_action', lambda *a, **k: None)
+    monkeypatch.setattr('app.services.borrow_service.return_book_atomic', fake_return)
 
-    result = return_borrowed_book(conn, user_id=11, book_id=5)
+    result = return_borrowed_book(conn, user_id=11, book_id="5")
 
+    assert calls['args'] == (11, 5, 5)
     assert result['fine_amount'] == 25
     assert result['fine_id'] == 42
     assert result['auto_assigned_borrow_id'] == 303
     assert conn.committed is True
+
+
+def test_return_without_active_borrow_rolls_back(monkeypatch):
+    conn = DummyConn()
+
+    def no_active_borrow(c, uid, bid, return_date, fine_per_day):
+        raise ValueError("No active borrow found for this book")
+
+    monkeypatch.setattr('app.services.borrow_service.return_book_atomic', no_active_borrow)
+
+    with pytest.raises(ValueError, match="No active borrow"):
+        return_borrowed_book(conn, user_id=11, book_id=5)
+    assert conn.rolled_back is True
+
+
+def test_issue_book_when_no_copy_left(monkeypatch):
+    conn = DummyConn()
+
+    def no_copy_left(c, uid, bid, due):
+        raise ValueError("Book not available")
+
+    monkeypatch.setattr('app.services.borrow_service.issue_book_atomic', no_copy_left)
+
+    with pytest.raises(ValueError, match="Book not available"):
+        issue_book(conn, user_id=10, book_id=5)
+    assert conn.rolled_back is True
+    assert conn.committed is False
@@ -0,0 +1,67 @@
+from decimal import Decimal
+
+from app.models import stats_queries
+from app.services import counters_service
+
+
+class DummyConn:
+    def __init__(self):
+        self.committed = False
+        self.rolled_back = False
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+def test_admin_stats_read_from_counters(monkeypatch):
+    monkeypatch.setattr(stats_queries, "get_library_counters", lambda conn: {
+        "total_issued_books": Decimal("4.00"),
+        "total_students": Decimal("12.00"),
+        "total_fine_collected": Decimal("35.00"),
+    })
+
+    stats = stats_queries.get_admin_stats(None)
+
+    assert stats == {
+        "total_issued_books": 4,
+        "total_available_books": 0,
+        "total_students": 12,
+        "total_teachers": 0,
+        "total_fine_collected": Decimal("35.00"),
+    }
+
+
+def _patch_counters(monkeypatch, stored, actual, resets):
+    monkeypatch.setattr(counters_service, "lock_library_counters", lambda conn: None)
+    monkeypatch.setattr(counters_service, "get_library_counters", lambda conn: stored)
+    monkeypatch.setattr(counters_service, "compute_library_counters", lambda conn: actual)
+    monkeypatch.setattr(counters_service, "reset_library_counter",
+                        lambda conn, name, value: resets.append((name, value)))
+
+
+def test_reconcile_reports_drift_without_changing_anything(monkeypatch):
+    resets = []
+    _patch_counters(monkeypatch, {"total_issued_books": 5}, {"total_issued_books": 3}, resets)
+    conn = DummyConn()
+
+    report = counters_service.reconcile_counters(conn)
+
+    assert report["total_issued_books"] == {"stored": 5, "actual": 3, "drift": 2}
+    assert report["total_teachers"]["drift"] == 0
+    assert resets == [] and conn.rolled_back and not conn.committed
+
+
+def test_reconcile_fix_resets_only_drifted_counters(monkeypatch):
+    resets = []
+    _patch_counters(monkeypatch,
+                    {"total_issued_books": 5, "total_students": 2},
+                    {"total_issued_books": 3, "total_students": 2}, resets)
+    conn = DummyConn()
+
+    counters_service.reconcile_counters(conn, fix=True)
+
+    assert resets == [("total_issued_books", 3)]
+    assert conn.committed
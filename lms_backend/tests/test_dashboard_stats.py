@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from app.models import stats_queries
+
+
+class OneRowConn:
+    def __init__(self, row):
+        self.row = row
+        self.executed = []
+
+    class _Cur:
+        def __init__(self, conn):
+            self.conn = conn
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            return False
+
+        def execute(self, sql, params=None):
+            self.conn.executed.append((sql, params))
+
+        def fetchone(self):
+            return self.conn.row
+
+    def cursor(self, *args, **kwargs):
+        return OneRowConn._Cur(self)
+
+
+def test_teacher_stats_single_round_trip():
+    conn = OneRowConn({
+        "issued_count": 2,
+        "due_today": [],
+        "overdue": [{"borrow_id": 7, "book_id": 3, "due_date": "2026-03-01T12:00:00.000000",
+                     "title": "T", "author": "A"}],
+    })
+
+    stats = stats_queries.get_teacher_stats(conn, 5)
+
+    assert len(conn.executed) == 1
+    assert conn.executed[0][1] == {"user_id": 5}
+    assert stats["issued_count"] == 2
+    assert stats["overdue"][0]["due_date"] == datetime(2026, 3, 1, 12, 0)
+
+
+def test_student_stats_single_round_trip():
+    conn = OneRowConn({"borrowed_count": 1, "due_soon": [], "total_fines": None, "active_reservations": 3})
+
+    stats = stats_queries.get_student_stats(conn, 5)
+
+    assert len(conn.executed) == 1
+    assert stats == {"borrowed_count": 1, "due_soon": [], "total_fines": 0.0, "active_reservations": 3}
@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+
+from app.models.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConn:
+    def __init__(self, healthy=True):
+        self.closed = 0
+        self.healthy = healthy
+        self.rollbacks = 0
+
+    def close(self):
+        self.closed = 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    class _Cur:
+        def __init__(self, conn):
+            self.conn = conn
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            return False
+
+        def execute(self, *args, **kwargs):
+            if not self.conn.healthy:
+                raise Exception("server closed the connection unexpectedly")
+
+    def cursor(self, *args, **kwargs):
+        return FakeConn._Cur(self)
+
+
+def make_pool(**kwargs):
+    created = []
+
+    def connect():
+        conn = FakeConn()
+        created.append(conn)
+        return conn
+
+    return ConnectionPool(connect, **kwargs), created
+
+
+def test_connection_is_reused_and_rolled_back():
+    pool, created = make_pool(max_size=2)
+
+    conn = pool.getconn()
+    pool.putconn(conn)
+    again = pool.getconn()
+
+    assert again is conn
+    assert len(created) == 1
+    assert conn.rollbacks >= 1
+    assert pool.stats()["in_use"] == 1
+
+
+def test_getconn_times_out_when_exhausted():
+    pool, _ = make_pool(max_size=1, acquire_timeout=0.05)
+    pool.getconn()
+
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_waiter_gets_connection_when_returned():
+    pool, _ = make_pool(max_size=1, acquire_timeout=2)
+    conn = pool.getconn()
+    result = {}
+
+    def waiter():
+        result["conn"] = pool.getconn()
+
+    t = threading.Thread(target=waiter)
+    t.start()
+    time.sleep(0.05)
+    pool.putconn(conn)
+    t.join(1)
+
+    assert result["conn"] is conn
+
+
+def test_unhealthy_connection_is_replaced():
+    pool, created = make_pool(max_size=2)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.healthy = False
+
+    fresh = pool.getconn()
+
+    assert fresh is not conn
+    assert conn.closed
+    assert len(created) == 2
+    assert pool.stats()["health_check_failures"] == 1
+
+
+def test_expired_connection_is_recycled():
+    pool, created = make_pool(max_size=2, max_lifetime=0.01, health_check=False)
+    conn = pool.getconn()
+    time.sleep(0.02)
+    pool.putconn(conn)
+
+    assert conn.closed
+    assert pool.stats()["size"] == 0
+    assert pool.getconn() is created[-1]
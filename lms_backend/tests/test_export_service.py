@@ -0,0 +1,102 @@
+import gzip
+import threading
+
+import pytest
+
+from app.config import Config
+from app.models import export_queries
+from app.services import export_service
+
+
+class FakeConn:
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class FakePool:
+    def __init__(self):
+        self.returned = []
+
+    def getconn(self):
+        return FakeConn()
+
+    def putconn(self, conn, close=False):
+        self.returned.append(close)
+
+
+def fake_copy(rows, started=None, release=None):
+    def copy(conn, sql, params, file):
+        file.write(b"book_id,title\n")
+        for i in range(rows):
+            if started is not None and i == rows // 2:
+                started.set()
+            if release is not None and i == rows // 2:
+                release.wait(5)
+            file.write(f"{i},Title {i}\n".encode())
+    return copy
+
+
+def test_select_picks_columns_and_filters_on_dataset_date():
+    sql, params = export_queries.build_export_select("fines", ["fine_id", "amount"], since="2024-01-01")
+    assert sql.startswith("SELECT f.fine_id AS fine_id, f.amount AS amount FROM fines f")
+    assert "f.created_at >= %s" in sql and params == ["2024-01-01"]
+
+    with pytest.raises(ValueError):
+        export_queries.build_export_select("users", ["password"])
+    with pytest.raises(ValueError):
+        export_queries.build_export_select("audit_logs")
+
+
+def test_csv_export_streams_copy_output_in_chunks(monkeypatch):
+    monkeypatch.setattr(export_service, "copy_csv_to", fake_copy(20000))
+    monkeypatch.setattr(export_service, "COPY_CHUNK_BYTES", 4096)
+    pool = FakePool()
+    monkeypatch.setattr(export_service, "get_pool", lambda: pool)
+
+    stream = export_service.start_export("books", "csv")
+    chunks = list(stream)
+
+    body = b"".join(chunks).decode().splitlines()
+    assert len(chunks) > 10
+    assert body[0] == "book_id,title" and body[-1] == "19999,Title 19999"
+    assert len(body) == 20001
+    assert pool.returned == [False]
+    assert export_service.get_export_stats()["active"] == 0
+
+
+def test_closing_mid_export_stops_copy_and_discards_connection(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(export_service, "copy_csv_to", fake_copy(200000, release=release))
+    monkeypatch.setattr(export_service, "COPY_CHUNK_BYTES", 1024)
+    monkeypatch.setattr(Config, "EXPORT_QUEUE_CHUNKS", 2)
+    pool = FakePool()
+    monkeypatch.setattr(export_service, "get_pool", lambda: pool)
+
+    stream = export_service.start_export("books", "csv")
+    next(stream)
+    release.set()
+    stream.close()
+
+    assert pool.returned == [True]
+    assert not any(t.name == "export-copy" for t in threading.enumerate())
+
+
+def test_concurrent_exports_are_capped(monkeypatch):
+    monkeypatch.setattr(Config, "EXPORT_MAX_CONCURRENT", 1)
+    monkeypatch.setattr(export_service, "_slots", None)
+
+    first = export_service.start_export("users", "ndjson")
+    with pytest.raises(export_service.ExportBusyError):
+        export_service.start_export("users", "ndjson")
+    first.close()  # never iterated: still frees the slot
+    export_service.start_export("users", "ndjson").close()
+    monkeypatch.setattr(export_service, "_slots", None)
+
+
+def test_gzip_chunks_round_trip():
+    parts = [f"{i},row\n".encode() for i in range(5000)]
+    compressed = b"".join(export_service.gzip_chunks(iter(parts)))
+    assert gzip.decompress(compressed) == b"".join(parts)
@@ -0,0 +1,111 @@
+from flask import Flask, jsonify, request
+from werkzeug.datastructures import MultiDict
+
+from app.config import Config
+from app.services import book_service
+from app.utils import decorators
+from app.utils.http_cache import args_digest
+
+
+class DummyConn:
+    def __init__(self):
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def make_app(monkeypatch, versions):
+    """versions: {"catalog": n, book_id: row_version} standing in for the database."""
+    monkeypatch.setattr(book_service, "get_catalog_version", lambda conn: versions["catalog"])
+    monkeypatch.setattr(book_service, "get_book_row_version", lambda conn, book_id: versions.get(book_id))
+    monkeypatch.setattr(decorators, "get_db", lambda: DummyConn())
+    monkeypatch.setattr(Config, "CACHE_CONTROL_BOOKS", "public, no-cache")
+    monkeypatch.setattr(Config, "CACHE_CONTROL_BOOK_DETAIL", "public, max-age=60")
+
+    app = Flask(__name__)
+    calls = []
+
+    @app.route("/books/")
+    @decorators.conditional(lambda conn: book_service.catalog_etag(conn, request.args), "CACHE_CONTROL_BOOKS")
+    def books():
+        calls.append("list")
+        return jsonify([{"book_id": 1}]), 200
+
+    @app.route("/books/<int:book_id>")
+    @decorators.conditional(book_service.book_etag, "CACHE_CONTROL_BOOK_DETAIL")
+    def book(book_id):
+        calls.append(book_id)
+        if book_id not in versions:
+            return jsonify({"error": "Book not found"}), 404
+        return jsonify({"book_id": book_id}), 200
+
+    return app, calls
+
+
+def test_matching_etag_gets_304_without_running_the_view(monkeypatch):
+    app, calls = make_app(monkeypatch, {"catalog": 4})
+    client = app.test_client()
+
+    first = client.get("/books/?limit=10")
+    again = client.get("/books/?limit=10", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "public, no-cache"
+    assert again.status_code == 304
+    assert again.data == b""
+    assert again.headers["ETag"] == first.headers["ETag"]
+    assert again.headers["Cache-Control"] == "public, no-cache"
+    assert calls == ["list"]
+
+
+def test_catalog_change_or_other_query_changes_the_etag(monkeypatch):
+    versions = {"catalog": 4}
+    app, calls = make_app(monkeypatch, versions)
+    client = app.test_client()
+
+    etag = client.get("/books/?limit=10").headers["ETag"]
+    other_page = client.get("/books/?limit=20", headers={"If-None-Match": etag})
+    versions["catalog"] = 5
+    after_change = client.get("/books/?limit=10", headers={"If-None-Match": etag})
+
+    assert other_page.status_code == after_change.status_code == 200
+    assert after_change.headers["ETag"] != etag
+    assert calls == ["list", "list", "list"]
+
+
+def test_book_detail_uses_row_version_and_its_own_policy(monkeypatch):
+    versions = {"catalog": 1, 7: 3}
+    app, calls = make_app(monkeypatch, versions)
+    client = app.test_client()
+
+    first = client.get("/books/7")
+    cached = client.get("/books/7", headers={"If-None-Match": f'W/"x", {first.headers["ETag"]}'})
+    versions[7] = 4
+    changed = client.get("/books/7", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.headers["ETag"] == '"book-7-3"'
+    assert first.headers["Cache-Control"] == "public, max-age=60"
+    assert cached.status_code == 304
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] == '"book-7-4"'
+    assert calls == [7, 7]
+
+
+def test_unknown_book_and_errors_are_not_tagged(monkeypatch):
+    app, calls = make_app(monkeypatch, {"catalog": 1})
+    client = app.test_client()
+
+    missing = client.get("/books/9", headers={"If-None-Match": "*"})
+
+    assert missing.status_code == 404
+    assert "ETag" not in missing.headers
+    assert "Cache-Control" not in missing.headers
+    assert calls == [9]
+
+
+def test_args_digest_ignores_parameter_order():
+    a = MultiDict([("limit", "10"), ("category", "Fiction")])
+    b = MultiDict([("category", "Fiction"), ("limit", "10")])
+    assert args_digest(a) == args_digest(b)
+    assert args_digest(a) != args_digest(MultiDict([("limit", "10")]))
@@ -0,0 +1,159 @@
+import time
+
+from flask import Flask, jsonify
+
+from app.config import Config
+from app.services import idempotency_service
+from app.utils import decorators
+
+
+class DummyConn:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakeStore:
+    """In-memory stand-in for the idempotency_keys table."""
+
+    def __init__(self):
+        self.rows = {}
+
+    def claim(self, conn, user_id, key_hash, request_hash, ttl):
+        if (user_id, key_hash) in self.rows:
+            return False
+        self.rows[(user_id, key_hash)] = {
+            "request_hash": request_hash, "status_code": None, "response_body": None,
+            "claimed_at": time.monotonic(),
+        }
+        return True
+
+    def get(self, conn, user_id, key_hash, grace):
+        row = self.rows.get((user_id, key_hash))
+        if row is None:
+            return None
+        lost = row["status_code"] is None and time.monotonic() - row["claimed_at"] > grace
+        return dict(row, response_lost=lost)
+
+    def save(self, conn, user_id, key_hash, status_code, body):
+        self.rows[(user_id, key_hash)].update(status_code=status_code, response_body=body)
+
+
+def make_app(monkeypatch, store, conn):
+    monkeypatch.setattr(idempotency_service, "claim_idempotency_key", store.claim)
+    monkeypatch.setattr(idempotency_service, "get_idempotency_record", store.get)
+    monkeypatch.setattr(idempotency_service, "save_idempotent_response", store.save)
+    monkeypatch.setattr(decorators, "get_db", lambda: conn)
+    monkeypatch.setattr(decorators, "get_jwt_identity", lambda: {"id": 7})
+
+    app = Flask(__name__)
+    calls = []
+
+    @app.route("/pay/<int:fine_id>", methods=["POST"])
+    @decorators.idempotent
+    def pay(fine_id):
+        calls.append(fine_id)
+        if fine_id == 0:
+            return jsonify({"error": "Fine not found"}), 400
+        return jsonify({"message": "Fine paid successfully", "call": len(calls)}), 201
+
+    return app, calls
+
+
+def test_retry_with_same_key_replays_stored_response(monkeypatch):
+    store, conn = FakeStore(), DummyConn()
+    app, calls = make_app(monkeypatch, store, conn)
+    client = app.test_client()
+
+    first = client.post("/pay/5", json={"note": "desk"}, headers={"Idempotency-Key": "abc"})
+    retry = client.post("/pay/5", json={"note": "desk"}, headers={"Idempotency-Key": "abc"})
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.get_json() == first.get_json() == {"message": "Fine paid successfully", "call": 1}
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert calls == [5]
+
+
+def test_key_reused_for_different_request_is_refused(monkeypatch):
+    store, conn = FakeStore(), DummyConn()
+    app, calls = make_app(monkeypatch, store, conn)
+    client = app.test_client()
+
+    client.post("/pay/5", headers={"Idempotency-Key": "abc"})
+    other = client.post("/pay/6", headers={"Idempotency-Key": "abc"})
+
+    assert other.status_code == 422
+    assert calls == [5]
+
+
+def test_unfinished_first_request_answers_409(monkeypatch):
+    store, conn = FakeStore(), DummyConn()
+    app, calls = make_app(monkeypatch, store, conn)
+    fingerprint = idempotency_service.request_fingerprint("POST", "/pay/5?", b"")
+    store.claim(conn, 7, idempotency_service.key_digest("abc"), fingerprint, 60)
+
+    response = app.test_client().post("/pay/5", headers={"Idempotency-Key": "abc"})
+
+    assert response.status_code == 409
+    assert response.headers["Retry-After"] == "1"
+    assert calls == []
+
+
+def test_failed_save_still_returns_the_committed_response_and_is_never_rerun(monkeypatch):
+    store, conn = FakeStore(), DummyConn()
+    app, calls = make_app(monkeypatch, store, conn)
+    client = app.test_client()
+
+    def broken_save(*args):
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(idempotency_service, "save_idempotent_response", broken_save)
+    monkeypatch.setattr(Config, "IDEMPOTENCY_CLAIM_GRACE", 30)
+    first = client.post("/pay/5", headers={"Idempotency-Key": "abc"})
+
+    assert first.status_code == 201
+    assert first.get_json() == {"message": "Fine paid successfully", "call": 1}
+    assert conn.rollbacks == 1
+
+    # Within the grace period the claim still looks in progress; after it, retries get a
+    # stable "already processed" answer and the payment is not made again
+    assert client.post("/pay/5", headers={"Idempotency-Key": "abc"}).status_code == 409
+    monkeypatch.setattr(Config, "IDEMPOTENCY_CLAIM_GRACE", 0)
+    retries = [client.post("/pay/5", headers={"Idempotency-Key": "abc"}) for _ in range(2)]
+
+    assert [r.status_code for r in retries] == [200, 200]
+    assert retries[0].get_json() == retries[1].get_json()
+    assert "already processed" in retries[0].get_json()["message"]
+    assert retries[0].headers["Idempotent-Replayed"] == "true"
+    assert calls == [5]
+
+
+def test_error_responses_are_not_stored_and_requests_without_key_pass_through(monkeypatch):
+    store, conn = FakeStore(), DummyConn()
+    app, calls = make_app(monkeypatch, store, conn)
+    client = app.test_client()
+
+    failed = client.post("/pay/0", headers={"Idempotency-Key": "k1"})
+    assert failed.status_code == 400
+    assert conn.rollbacks == 1
+    assert all(row["status_code"] is None for row in store.rows.values())
+
+    client.post("/pay/5")
+    client.post("/pay/5")
+    assert calls == [0, 5, 5]
+
+
+def test_purge_deletes_in_batches(monkeypatch):
+    batches = iter([1000, 1000, 3])
+    monkeypatch.setattr(idempotency_service, "purge_expired_idempotency_keys",
+                        lambda conn, batch_size: next(batches))
+    conn = DummyConn()
+
+    assert idempotency_service.purge_idempotency_keys(conn, batch_size=1000) == 2003
+    assert conn.commits == 3
@@ -0,0 +1,46 @@
+from app.services.overdue_service import mark_overdue_borrows
+
+
+class DummyConn:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def patch_lock(monkeypatch, acquired):
+    events = []
+    monkeypatch.setattr('app.services.overdue_service.try_advisory_lock', lambda c, key: acquired)
+    monkeypatch.setattr('app.services.overdue_service.advisory_unlock', lambda c, key: events.append("unlock"))
+    monkeypatch.setattr('app.services.overdue_service.record_job_run', lambda c, *args: events.append(args))
+    return events
+
+
+def test_marks_in_chunks_and_records_run(monkeypatch):
+    conn = DummyConn()
+    events = patch_lock(monkeypatch, acquired=True)
+    chunks = iter([10, 10, 4])
+    monkeypatch.setattr('app.services.overdue_service._mark_overdue_chunk', lambda c, n: next(chunks))
+
+    result = mark_overdue_borrows(conn, chunk_size=10)
+
+    assert result["updated"] == 24
+    assert result["chunks"] == 3
+    job_name, node, started_at, duration_ms, rows = events[0]
+    assert job_name == "mark_overdue" and rows == 24
+    assert events[-1] == "unlock"
+
+
+def test_skips_when_another_node_holds_the_lock(monkeypatch):
+    conn = DummyConn()
+    events = patch_lock(monkeypatch, acquired=False)
+
+    result = mark_overdue_borrows(conn)
+
+    assert result["skipped"] is True
+    assert events == []
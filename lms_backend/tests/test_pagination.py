@@ -0,0 +1,92 @@
+from datetime import datetime
+
+import pytest
+
+from app.services.book_service import fetch_books_page
+from app.utils.pagination import encode_cursor, decode_cursor, parse_limit, parse_optional, parse_page
+
+
+def test_cursor_round_trip_is_stable():
+    token = encode_cursor(42)
+    assert token == encode_cursor(42)
+    assert decode_cursor(token) == [42]
+
+
+def test_decode_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_parse_limit_clamps_to_maximum():
+    assert parse_limit(None) == 50
+    assert parse_limit("500", maximum=200) == 200
+    with pytest.raises(ValueError):
+        parse_limit("0")
+
+
+def test_parse_page_gives_clean_errors():
+    assert parse_page(None) == 1
+    assert parse_page("3") == 3
+    with pytest.raises(ValueError, match="^page must be an integer$"):
+        parse_page("two")
+    with pytest.raises(ValueError, match="^page must be at least 1$"):
+        parse_page("0")
+
+
+def test_parse_optional_skips_missing_and_names_bad_values():
+    args = {"user_id": "7", "book_id": "", "since": "yesterday"}
+    assert parse_optional(args, "user_id", int) == 7
+    assert parse_optional(args, "book_id", int) is None
+    assert parse_optional(args, "status", str.upper) is None
+    with pytest.raises(ValueError, match="Invalid value for since: yesterday"):
+        parse_optional(args, "since", datetime.fromisoformat)
+
+
+def test_books_page_sets_next_cursor_only_when_more_rows(monkeypatch):
+    calls = []
+
+    def fake_list_books(conn, limit, after_id, category, author, available, fields):
+        calls.append((limit, after_id))
+        return [{"book_id": i} for i in range(after_id or 0, (after_id or 0) + 3)][:limit]
+
+    monkeypatch.setattr('app.services.book_service.list_books', fake_list_books)
+
+    page = fetch_books_page(None, limit=2)
+    assert [b["book_id"] for b in page["items"]] == [0, 1]
+    assert decode_cursor(page["next_cursor"]) == [1]
+    assert calls[-1] == (3, None)
+
+    last = fetch_books_page(None, limit=5, cursor=page["next_cursor"])
+    assert last["next_cursor"] is None
+    assert calls[-1] == (6, 1)
+
+
+def test_books_page_rejects_unknown_fields():
+    with pytest.raises(ValueError):
+        fetch_books_page(None, limit=10, fields=["password"])
+
+
+def test_audit_page_cursor_encodes_created_at_and_id(monkeypatch):
+    from datetime import datetime
+    from app.services.audit_service import fetch_audit_logs_page
+
+    seen = {}
+    rows = [
+        {"audit_id": 9, "created_at": datetime(2026, 3, 1, 12, 0)},
+        {"audit_id": 8, "created_at": datetime(2026, 3, 1, 11, 0)},
+        {"audit_id": 7, "created_at": datetime(2026, 3, 1, 10, 0)},
+    ]
+
+    def fake_list(conn, limit, before, **filters):
+        seen["before"] = before
+        seen["filters"] = filters
+        return rows[:limit]
+
+    monkeypatch.setattr('app.services.audit_service.list_audit_logs', fake_list)
+
+    page = fetch_audit_logs_page(None, limit=2, user_id=4)
+    assert [r["audit_id"] for r in page["items"]] == [9, 8]
+    assert seen["filters"] == {"user_id": 4}
+
+    fetch_audit_logs_page(None, limit=2, cursor=page["next_cursor"])
+    assert seen["before"] == (datetime(2026, 3, 1, 11, 0), 8)
@@ -0,0 +1,82 @@
+import pytest
+
+from app.services.password_hasher import PasswordHasher, HashingBusyError
+
+CHEAP_METHOD = "pbkdf2:sha256:1000"
+
+
+def test_inline_hash_and_verify_use_configured_method():
+    hasher = PasswordHasher(workers=0, method=CHEAP_METHOD, salt_length=8)
+
+    pwhash = hasher.hash("secret")
+
+    assert pwhash.startswith("pbkdf2:sha256:1000$")
+    assert hasher.verify(pwhash, "secret")
+    assert not hasher.verify(pwhash, "wrong")
+    assert hasher.stats()["latency_ms"]["samples"] == 3
+
+
+def test_pool_hashes_in_worker_process():
+    hasher = PasswordHasher(workers=1, max_queue=1, timeout=30, method=CHEAP_METHOD)
+    try:
+        assert hasher.verify(hasher.hash("secret"), "secret")
+        assert hasher.stats()["in_flight"] == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_saturated_queue_fails_fast():
+    hasher = PasswordHasher(workers=1, max_queue=0, method=CHEAP_METHOD)
+    hasher._slots.acquire()  # the only slot is taken by another request
+
+    with pytest.raises(HashingBusyError) as exc:
+        hasher.hash("secret")
+
+    assert exc.value.retry_after >= 1
+    assert hasher.stats()["rejected"] == 1
+
+
+def test_imports_hash_one_at_a_time(monkeypatch):
+    import threading
+    import time
+    from app.services import password_hasher
+
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def slow_batch(passwords, method, salt_length):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return [f"hash:{p}" for p in passwords]
+
+    monkeypatch.setattr(password_hasher, "_hash_batch", slow_batch)
+    hasher = PasswordHasher(workers=0, method=CHEAP_METHOD)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(hasher.hash_many(["a", "b"], workers=0)))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [["hash:a", "hash:b"]] * 3
+    assert peak[0] == 1
+
+
+def test_pool_that_cannot_start_falls_back_to_inline(monkeypatch, capsys):
+    from app.services import password_hasher
+
+    def no_shm(*args, **kwargs):
+        raise OSError(38, "Function not implemented")
+
+    monkeypatch.setattr(password_hasher, "ProcessPoolExecutor", no_shm)
+    hasher = PasswordHasher(workers=2, method=CHEAP_METHOD)
+
+    assert hasher.verify(hasher.hash("secret"), "secret")
+    assert hasher.stats()["workers"] == 0
+    assert hasher.stats()["in_flight"] == 0
+    assert capsys.readouterr().out.count("hashing inline") == 1
@@ -0,0 +1,34 @@
+from app.services.reservation_service import sweep_expired_reservations
+
+
+class DummyConn:
+    def __init__(self):
+        self.commits = 0
+        self.rolled_back = False
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+def test_sweep_runs_batches_until_a_short_one(monkeypatch):
+    conn = DummyConn()
+    batches = iter([100, 100, 37])
+    monkeypatch.setattr('app.services.reservation_service.expire_overdue_reservations', lambda c, n: next(batches))
+
+    expired = sweep_expired_reservations(conn, batch_size=100)
+
+    assert expired == 237
+    assert conn.commits == 3
+
+
+def test_sweep_respects_max_batches(monkeypatch):
+    conn = DummyConn()
+    monkeypatch.setattr('app.services.reservation_service.expire_overdue_reservations', lambda c, n: n)
+
+    expired = sweep_expired_reservations(conn, batch_size=50, max_batches=2)
+
+    assert expired == 100
+    assert conn.commits == 2
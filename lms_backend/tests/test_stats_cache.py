@@ -0,0 +1,52 @@
+import time
+
+from app.services import stats_service
+from app.utils.cache import TTLCache
+
+
+def test_ttl_cache_expires_and_evicts_lru(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('app.utils.cache.time.monotonic', lambda: now[0])
+    cache = TTLCache(ttl=10, max_entries=2)
+
+    cache.set("a", 0)
+    now[0] += 4
+    assert cache.get("a") == (0, 4)
+
+    cache.set("b", 1)
+    cache.set("c", 2)
+    assert cache.get("a") is None  # least recently used, evicted
+
+    now[0] += 11
+    assert cache.get("b") is None  # expired
+    assert cache.stats()["evictions"] == 1
+
+
+def test_admin_stats_served_from_cache_until_invalidated(monkeypatch):
+    calls = []
+
+    def fake_stats(conn):
+        calls.append(conn)
+        return {"total_issued_books": len(calls)}
+
+    monkeypatch.setattr(stats_service, "get_admin_stats", fake_stats)
+    monkeypatch.setattr(stats_service, "_admin_stats_cache", TTLCache(ttl=30, max_entries=1))
+
+    stats, age = stats_service.get_admin_stats_cached("conn")
+    assert stats == {"total_issued_books": 1} and age is None
+
+    stats, age = stats_service.get_admin_stats_cached("conn")
+    assert stats == {"total_issued_books": 1} and age is not None
+    assert len(calls) == 1
+
+    stats_service.invalidate_admin_stats()
+    stats, age = stats_service.get_admin_stats_cached("conn")
+    assert stats == {"total_issued_books": 2} and age is None
+
+
+def test_zero_ttl_disables_cache(monkeypatch):
+    monkeypatch.setattr(stats_service, "get_admin_stats", lambda conn: {"n": time.monotonic()})
+    monkeypatch.setattr(stats_service, "_admin_stats_cache", TTLCache(ttl=0, max_entries=1))
+
+    assert stats_service.get_admin_stats_cached(None)[1] is None
+    assert stats_service.get_admin_stats_cached(None)[1] is None
@@ -0,0 +1,86 @@
+from app.utils import token_blacklist
+from app.utils.cache import TTLCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.keys = {}
+        self.exists_calls = 0
+
+    def exists(self, key):
+        self.exists_calls += 1
+        return 1 if key in self.keys else 0
+
+    def setex(self, key, ttl, value):
+        self.keys[key] = ttl
+
+    def set(self, key, value):
+        self.keys[key] = None
+
+
+def _use_fake_redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(token_blacklist, "_get_redis_client", lambda: client)
+    monkeypatch.setattr(token_blacklist, "_local_cache", TTLCache(ttl=300, max_entries=100))
+    return client
+
+
+def test_lookups_are_served_from_local_cache(monkeypatch):
+    client = _use_fake_redis(monkeypatch)
+
+    assert token_blacklist.is_token_blacklisted("a") is False
+    assert token_blacklist.is_token_blacklisted("a") is False
+    assert client.exists_calls == 1
+
+    token_blacklist.add_token_to_blacklist("a", expires=60)
+    assert client.keys["token_blacklist:a"] == 60
+    # the local negative entry is replaced on revocation, no Redis call needed
+    assert token_blacklist.is_token_blacklisted("a") is True
+    assert client.exists_calls == 1
+
+    stats = token_blacklist.get_blacklist_stats()
+    assert stats["local_cache"]["hits"] == 2
+    assert stats["redis_latency_ms"]["samples"] >= 2
+
+
+def test_negative_answers_expire_quickly(monkeypatch):
+    client = _use_fake_redis(monkeypatch)
+    now = [100.0]
+    monkeypatch.setattr('app.utils.cache.time.monotonic', lambda: now[0])
+
+    assert token_blacklist.is_token_blacklisted("b") is False
+    client.keys["token_blacklist:b"] = 60  # revoked by another node
+    now[0] += token_blacklist.TOKEN_CACHE_NEGATIVE_TTL + 0.1
+
+    assert token_blacklist.is_token_blacklisted("b") is True
+    assert client.exists_calls == 2
+
+
+def test_expiring_set_honours_ttl_and_cap():
+    from app.utils.expiring_set import ExpiringSet
+
+    now = [1000.0]
+    store = ExpiringSet(max_entries=2, default_ttl=600, resolution=60, clock=lambda: now[0])
+    store.add("short", ttl=30)
+    store.add("long", ttl=3600)
+    assert "short" in store and "long" in store
+
+    store.add("newest", ttl=3600)  # over the cap: the entry closest to expiry goes first
+    assert "short" not in store
+    assert len(store) == 2 and store.stats()["evicted"] == 1
+
+    now[0] += 3700
+    assert "long" not in store
+    assert len(store) == 0 and store.stats()["expired"] == 2
+
+
+def test_uuid_jtis_are_stored_compactly():
+    from app.utils.expiring_set import ExpiringSet, compact_key
+
+    jti = "0b7c5c4e-8f8e-4d6a-9c43-6f1f0d1a2b3c"
+    assert compact_key(jti) == bytes.fromhex(jti.replace("-", ""))
+    assert compact_key("not-a-uuid") == "not-a-uuid"
+
+    store = ExpiringSet()
+    store.add(jti)
+    assert jti in store
@@ -0,0 +1,86 @@
+from app.config import Config
+from app.services import user_import_service
+
+
+class DummyConn:
+    def __init__(self):
+        self.committed = False
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+
+CSV_UPLOAD = (
+    "name,email,password,role_id,phone\n"
+    "Asha Gurung,asha@example.com,secret1,3,\n"
+    "Bo,bo@example.com,secret2,3,\n"                   # name too short
+    "Chen Li,chen@example.com,secret3,3,9800000000\n"
+    "Asha Again,asha@example.com,secret4,3,\n"        # duplicate in file
+    "Dev Admin,dev@example.com,secret5,1,\n"          # admin role
+    "Eve Known,eve@example.com,secret6,2,\n"          # already registered
+).encode()
+
+
+def test_import_reports_errors_per_line_and_loads_the_rest(monkeypatch):
+    monkeypatch.setattr(Config, "USER_IMPORT_HASH_WORKERS", 0)
+    loaded = {}
+    audits = []
+
+    monkeypatch.setattr(user_import_service, "get_existing_emails",
+                        lambda conn, emails: {"eve@example.com"} & set(emails))
+    monkeypatch.setattr(user_import_service, "hash_passwords",
+                        lambda passwords, workers: [f"hash:{p}" for p in passwords])
+
+    def fake_bulk_insert(conn, rows, status, approved_by):
+        loaded["rows"] = rows
+        loaded["status"] = status
+        return {row[2]: 100 + i for i, row in enumerate(rows)}
+
+    monkeypatch.setattr(user_import_service, "bulk_insert_users", fake_bulk_insert)
+    monkeypatch.setattr(user_import_service, "log_action", lambda *args, **kwargs: audits.append(kwargs))
+    conn = DummyConn()
+
+    report = user_import_service.import_users(conn, CSV_UPLOAD, "csv", admin_id=1)
+
+    assert report["total_rows"] == 6
+    assert report["created"] == 2
+    assert [e["line"] for e in report["errors"]] == [3, 5, 6, 7]
+    assert "name" in report["errors"][0]["errors"]
+    assert report["errors"][3]["errors"] == {"email": ["Email already exists"]}
+
+    assert [row[2] for row in loaded["rows"]] == ["asha@example.com", "chen@example.com"]
+    assert loaded["rows"][0][3] == "hash:secret1"
+    assert loaded["rows"][1][5] == "9800000000"
+    assert loaded["status"] == "APPROVED"
+    assert len(audits) == 1 and "2 created" in audits[0]["description"]
+    assert conn.committed
+
+
+def test_values_longer_than_their_columns_are_line_errors():
+    long_email = "a" * 121 + "@example.com"
+    records = [
+        (2, {"name": "Asha Gurung", "email": long_email, "password": "secret1", "role_id": "3"}, None),
+        (3, {"name": "Chen Li", "email": "chen@example.com", "password": "secret3", "role_id": "3",
+             "phone": "9" * 21}, None),
+        (4, {"name": "Dev Rai", "email": "dev@example.com", "password": "secret4", "role_id": "3"}, None),
+    ]
+
+    valid, errors = user_import_service._validate(records)
+
+    assert [line_no for line_no, _ in valid] == [4]
+    assert [(e["line"], list(e["errors"])) for e in errors] == [(2, ["email"]), (3, ["phone"])]
+
+
+def test_ndjson_parse_errors_are_reported():
+    from app.utils.import_formats import read_records
+
+    raw = b'{"name": "Asha Gurung"}\nnot json\n\n[1, 2]\n'
+
+    lines = [(line_no, error) for line_no, _, error in read_records(raw, "ndjson")]
+
+    assert lines[0] == (1, None)
+    assert lines[1][0] == 2 and lines[1][1].startswith("Invalid JSON")
+    assert lines[2] == (4, "Each line must be a JSON object")